@@ -1,10 +1,9 @@
 import psycopg2
-from psycopg2.extras import execute_values
-from datetime import datetime, timedelta
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
 from config import DATABASE
+from ingest.workstation_rollup import ensure_rollup
 
 CREATE_TABLE_SQL = '''
 CREATE TABLE IF NOT EXISTS packing_daily_summary (
@@ -22,16 +21,16 @@ INSERT INTO packing_daily_summary (
 )
 SELECT
     CASE
-        WHEN EXTRACT(DOW FROM history_station_end_time) = 6 THEN DATE(history_station_end_time) - INTERVAL '1 day'  -- Saturday to Friday
-        WHEN EXTRACT(DOW FROM history_station_end_time) = 0 THEN DATE(history_station_end_time) - INTERVAL '2 days'  -- Sunday to Friday
-        ELSE DATE(history_station_end_time)
+        WHEN EXTRACT(DOW FROM date) = 6 THEN date - 1  -- Saturday to Friday
+        WHEN EXTRACT(DOW FROM date) = 0 THEN date - 2  -- Sunday to Friday
+        ELSE date
     END AS pack_date,
     model,
     pn AS part_number,
-    COUNT(*) AS packed_count
-FROM workstation_master_log
+    SUM(part_count) AS packed_count
+FROM workstation_rollup_hourly
 WHERE workstation_name = 'PACKING'
-  AND history_station_passing_status = 'Pass'
+  AND passing_status = 'Pass'
 GROUP BY pack_date, model, part_number
 ORDER BY model, part_number, pack_date
 ON CONFLICT (pack_date, model, part_number) DO UPDATE SET
@@ -53,6 +52,7 @@ def main():
             print("Creating packing_daily_summary table with primary key if not exists...")
             cur.execute(CREATE_TABLE_SQL)
             conn.commit()
+            ensure_rollup(conn)
 
             print("Aggregating all historical packing data...")
             cur.execute(AGGREGATE_SQL)
@@ -2,11 +2,15 @@
 """
 Aggregate workstation data for P-Chart analysis on a daily basis.
 Groups by part number, model, workstation, and service flow to track pass/fail counts.
+
+Reads the hourly workstation rollup (ingest/workstation_rollup.py), not
+the master log. Incremental: each run upserts only the dates refreshed in
+the rollup since the last run. The first run, an empty table or --rebuild
+re-aggregates all history, replacing the rows in one transaction.
 """
+import argparse
 import psycopg2
 import logging
-from datetime import datetime
-import pandas as pd
 import sys
 import os
 # Add Fox_ETL directory to path to find config.py
@@ -18,6 +22,11 @@ while current_dir != '/':
         break
     current_dir = os.path.dirname(current_dir)
 from config import DATABASE
+from ingest.dirty_partitions import register_consumer, format_dates
+from ingest.workstation_rollup import ROLLUP_TABLE, claim_rollup_dates, ensure_rollup
+
+CONSUMER = 'aggregate_pchart_all_time'
+TABLE = 'workstation_pchart_daily'
 
 # Setup simple console logging
 logging.basicConfig(
@@ -53,70 +62,141 @@ def create_pchart_table(conn):
     cursor.close()
     logging.info('Table check/creation complete.')
 
-def aggregate_daily_data(conn):
-    """Aggregate workstation data on a daily basis"""
-    cursor = conn.cursor()
-    logging.info('Starting daily aggregation...')
-    
-    # Clear existing data
-    cursor.execute("TRUNCATE TABLE workstation_pchart_daily;")
-    
-    # Aggregate query - Updated to match TPY script logic
-    query = """
-    INSERT INTO workstation_pchart_daily (
-        date,
-        pn,
-        model,
-        workstation_name,
-        service_flow,
-        total_count,
-        pass_count,
-        fail_count
-    )
+# Shared by the incremental upsert and the rebuild: one row per (date, pn, model, workstation, flow)
+AGGREGATE_SELECT = """
     SELECT 
-        DATE(history_station_end_time) as date,
+        date,
         pn,
         model,
         workstation_name,
         service_flow,
-        COUNT(*) as total_count,
-        COUNT(CASE WHEN history_station_passing_status = 'Pass' THEN 1 END) as pass_count,
-        COUNT(CASE WHEN history_station_passing_status != 'Pass' THEN 1 END) as fail_count
-    FROM workstation_master_log
-    WHERE history_station_end_time IS NOT NULL
-        AND service_flow NOT IN ('NC Sort', 'RO')
+        SUM(part_count) as total_count,
+        SUM(CASE WHEN passing_status = 'Pass' THEN part_count ELSE 0 END) as pass_count,
+        SUM(CASE WHEN passing_status != 'Pass' THEN part_count ELSE 0 END) as fail_count
+    FROM workstation_rollup_hourly
+    WHERE service_flow NOT IN ('NC Sort', 'RO')
         AND service_flow IS NOT NULL
+        {dates_filter}
     GROUP BY 
-        DATE(history_station_end_time),
+        date,
         pn,
         model,
         workstation_name,
         service_flow
-    ORDER BY 
-        DATE(history_station_end_time),
+"""
+
+DATES_FILTER = "AND date = ANY(%s::date[])"
+
+def upsert_dates(cursor, dates, table=TABLE):
+    """Recompute the given dates into table; returns rows affected"""
+    cursor.execute(f"""
+    INSERT INTO {table} (
+        date,
         pn,
-        workstation_name;
-    """
-    
-    cursor.execute(query)
-    rows_affected = cursor.rowcount
+        model,
+        workstation_name,
+        service_flow,
+        total_count,
+        pass_count,
+        fail_count
+    )
+    {AGGREGATE_SELECT.format(dates_filter=DATES_FILTER)}
+    ON CONFLICT (date, pn, workstation_name, service_flow) 
+    DO UPDATE SET
+        total_count = EXCLUDED.total_count,
+        pass_count = EXCLUDED.pass_count,
+        fail_count = EXCLUDED.fail_count,
+        model = EXCLUDED.model;
+    """, (dates,))
+    return cursor.rowcount
+
+def aggregate_daily_data(conn):
+    """Upsert the dates refreshed in the workstation rollup since the last run"""
+    dates = claim_rollup_dates(conn, CONSUMER)
+    if not dates:
+        logging.info('No new workstation data since the last run.')
+        conn.commit()
+        return 0
+    cursor = conn.cursor()
+    logging.info(f'Starting incremental aggregation for {format_dates(dates)}...')
+    rows_affected = upsert_dates(cursor, dates)
+    # The dirty dates are cleared by this same commit
     conn.commit()
     cursor.close()
     
     logging.info(f'Aggregation complete. {rows_affected} rows affected.')
     return rows_affected
 
+def rebuild_all_time(conn):
+    """
+    Re-aggregate the whole workstation rollup into the table, replacing
+    every row in one transaction. Readers keep the old rows until it
+    commits, so the P-chart page never sees an empty or half-built table.
+    """
+    cursor = conn.cursor()
+    logging.info(f'Rebuilding {TABLE} from the full {ROLLUP_TABLE}...')
+    cursor.execute(f"DELETE FROM {TABLE}")
+    cursor.execute(f"""
+    INSERT INTO {TABLE} (
+        date,
+        pn,
+        model,
+        workstation_name,
+        service_flow,
+        total_count,
+        pass_count,
+        fail_count
+    )
+    {AGGREGATE_SELECT.format(dates_filter='')}
+    """)
+    rows_affected = cursor.rowcount
+    # Commit the long build before claiming, so loaders marking dates are not held up by the claim
+    conn.commit()
+
+    # Dates refreshed while building: claim and recompute them in one short transaction
+    dates = claim_rollup_dates(conn, CONSUMER)
+    if dates:
+        logging.info(f'Catching up {format_dates(dates)} refreshed during the rebuild...')
+        upsert_dates(cursor, dates)
+    conn.commit()
+    cursor.close()
+
+    logging.info(f'Rebuild complete. {rows_affected} rows written.')
+    return rows_affected
+
+def needs_rebuild(conn):
+    """A first run (nothing was marked for this consumer yet) or an empty table starts from scratch"""
+    ensure_rollup(conn)
+    if register_consumer(conn, CONSUMER, ROLLUP_TABLE):
+        return True
+    cursor = conn.cursor()
+    cursor.execute(f"SELECT NOT EXISTS (SELECT 1 FROM {TABLE})")
+    empty = cursor.fetchone()[0]
+    cursor.close()
+    return empty
+
+def run(conn, rebuild=False):
+    """Incremental by default; a full rebuild when asked for or when there is no history to build on"""
+    create_pchart_table(conn)
+    if rebuild or needs_rebuild(conn):
+        return rebuild_all_time(conn)
+    return aggregate_daily_data(conn)
+
 def main():
+    parser = argparse.ArgumentParser(description="Aggregate workstation_pchart_daily over all history")
+    parser.add_argument('--rebuild', action='store_true', help='Re-aggregate every date')
+    args = parser.parse_args()
+
     logging.info("="*50)
-    logging.info("Starting P-Chart daily aggregation process...")
+    logging.info("Starting P-Chart all-time aggregation process...")
     
+    conn = None
     try:
         conn = connect_to_db()
-        create_pchart_table(conn)
-        rows_affected = aggregate_daily_data(conn)
+        rows_affected = run(conn, rebuild=args.rebuild)
         
         logging.info("Successfully aggregated data:")
-        logging.info(f"   - {rows_affected:,} daily records created")
+        logging.info(f"   - {rows_affected:,} daily records processed")
         
     except Exception as e:
         logging.error(f"Error during aggregation: {str(e)}")
@@ -129,4 +209,4 @@ def main():
         logging.info("="*50)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
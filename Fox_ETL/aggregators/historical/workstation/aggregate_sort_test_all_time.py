@@ -1,5 +1,4 @@
 import psycopg2
-from datetime import datetime, timedelta
 import sys
 import os
 # Add Fox_ETL directory to path to find config.py
@@ -11,6 +10,7 @@ while current_dir != '/':
         break
     current_dir = os.path.dirname(current_dir)
 from config import DATABASE
+from ingest.workstation_rollup import ensure_rollup
 
 AGGREGATE_SQL = '''
 SELECT
@@ -20,12 +20,12 @@ SELECT
     ELSE NULL
   END AS sort_code,
   CASE
-    WHEN EXTRACT(DOW FROM history_station_end_time) = 6 THEN DATE(history_station_end_time) - INTERVAL '1 day'
-    WHEN EXTRACT(DOW FROM history_station_end_time) = 0 THEN DATE(history_station_end_time) - INTERVAL '2 days'
-    ELSE DATE(history_station_end_time)
+    WHEN EXTRACT(DOW FROM date) = 6 THEN date - 1
+    WHEN EXTRACT(DOW FROM date) = 0 THEN date - 2
+    ELSE date
   END AS test_date,
-  COUNT(*) AS test_count
-FROM workstation_master_log
+  SUM(part_count) AS test_count
+FROM workstation_rollup_hourly
 WHERE workstation_name = 'TEST'
   AND model IN ('Tesla SXM4', 'Tesla SXM5')
 GROUP BY sort_code, test_date
@@ -35,6 +35,7 @@ ORDER BY sort_code, test_date;
 def main():
     conn = psycopg2.connect(**DATABASE)
     try:
+        ensure_rollup(conn)
         with conn.cursor() as cur:
             print("Aggregating all historical TEST data...")
 
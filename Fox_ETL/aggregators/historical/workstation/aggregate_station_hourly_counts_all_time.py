@@ -1,5 +1,5 @@
+import argparse
 import psycopg2
-from datetime import datetime
 import sys
 import os
 # Add Fox_ETL directory to path to find config.py
@@ -11,6 +11,7 @@ while current_dir != '/':
         break
     current_dir = os.path.dirname(current_dir)
 from config import DATABASE
+from ingest.workstation_rollup import ensure_rollup
 
 def create_summary_table(conn):
     with conn.cursor() as cur:
@@ -25,43 +26,70 @@ def create_summary_table(conn):
         """)
     conn.commit()
 
-def aggregate_station_hourly_counts():
+# One statement over the whole rollup; rows whose count did not change are left alone
+UPSERT_SQL = """
+    WITH hourly AS (
+        SELECT
+            date,
+            hour,
+            workstation_name,
+            SUM(part_count) AS part_count
+        FROM
+            workstation_rollup_hourly
+        GROUP BY
+            date,
+            hour,
+            workstation_name
+    ),
+    upserted AS (
+        INSERT INTO station_hourly_summary (date, hour, workstation_name, part_count)
+        SELECT date, hour, workstation_name, part_count FROM hourly
+        ON CONFLICT (date, hour, workstation_name)
+        DO UPDATE SET part_count = EXCLUDED.part_count
+        WHERE station_hourly_summary.part_count IS DISTINCT FROM EXCLUDED.part_count
+        RETURNING 1
+    )
+    SELECT
+        (SELECT COUNT(*) FROM hourly),
+        (SELECT COUNT(*) FROM upserted),
+        (SELECT COUNT(DISTINCT workstation_name) FROM hourly),
+        (SELECT MIN(date) FROM hourly),
+        (SELECT MAX(date) FROM hourly);
+"""
+
+def print_hourly(cur):
+    cur.execute("""
+        SELECT date, hour, workstation_name, part_count
+        FROM station_hourly_summary
+        ORDER BY date, hour, workstation_name;
+    """)
+    print(f"{'Date':<12} {'Hour':<4} {'Station':<16} {'Count':<6}")
+    print("-" * 40)
+    for date, hour, station, count in cur.fetchall():
+        print(f"{date} {hour:>2}   {station:<16} {count:<6}")
+
+def run(conn, quiet=True):
+    """Upsert every hourly count on conn and commit; quiet skips the per-hour table"""
+    create_summary_table(conn)
+    ensure_rollup(conn)
+    with conn.cursor() as cur:
+        cur.execute(UPSERT_SQL)
+        groups, changed, stations, first, last = cur.fetchone()
+        conn.commit()
+        if not quiet:
+            print_hourly(cur)
+    print(f"\nAggregated data has been saved to station_hourly_summary table: {groups} hourly records "
+          f"({changed} new or changed) for {stations} stations from {first} to {last}.")
+
+def aggregate_station_hourly_counts(quiet=True):
     conn = psycopg2.connect(**DATABASE)
     try:
-        create_summary_table(conn)
-        with conn.cursor() as cur:
-            cur.execute("""
-                SELECT
-                    DATE(history_station_end_time) AS date,
-                    EXTRACT(HOUR FROM history_station_end_time)::int AS hour,
-                    workstation_name,
-                    COUNT(*) AS part_count
-                FROM
-                    workstation_master_log
-                WHERE
-                    history_station_end_time IS NOT NULL
-                GROUP BY
-                    DATE(history_station_end_time),
-                    EXTRACT(HOUR FROM history_station_end_time),
-                    workstation_name
-                ORDER BY
-                    date, hour, workstation_name;
-            """)
-            results = cur.fetchall()
-            print(f"{'Date':<12} {'Hour':<4} {'Station':<16} {'Count':<6}")
-            print("-" * 40)
-            for date, hour, station, count in results:
-                print(f"{date} {hour:>2}   {station:<16} {count:<6}")
-                cur.execute("""
-                    INSERT INTO station_hourly_summary (date, hour, workstation_name, part_count)
-                    VALUES (%s, %s, %s, %s)
-                    ON CONFLICT (date, hour, workstation_name)
-                    DO UPDATE SET part_count = EXCLUDED.part_count;
-                """, (date, hour, station, count))
-        conn.commit()
-        print("\nAggregated data has been saved to station_hourly_summary table.")
+        run(conn, quiet=quiet)
     finally:
         conn.close()
 
 if __name__ == "__main__":
-    aggregate_station_hourly_counts() 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Upsert station_hourly_summary over all history")
+    parser.add_argument('--verbose', action='store_true', help='Also print every hourly record (default: summary only)')
+    args = parser.parse_args()
+    aggregate_station_hourly_counts(quiet=not args.verbose)
@@ -1,15 +1,5 @@
 import psycopg2
 from psycopg2.extras import execute_values
-<<<<<<< HEAD
-
-DB_CONFIG = {
-    'host': 'localhost',
-    'database': 'fox_db',
-    'user': 'gpu_user',
-    'password': '',
-    'port': '5432'
-}
-=======
 import sys
 import os
 # Add Fox_ETL directory to path to find config.py
@@ -21,7 +11,9 @@ while current_dir != '/':
         break
     current_dir = os.path.dirname(current_dir)
 from config import DATABASE
->>>>>>> origin/main
+from ingest.dirty_partitions import claim_dirty_dates, format_dates
+
+CONSUMER = 'aggregate_fixture_performance_daily'
 
 CREATE_TABLE_SQL = '''
 CREATE TABLE IF NOT EXISTS fixture_performance_daily (
@@ -39,7 +31,7 @@ CREATE TABLE IF NOT EXISTS fixture_performance_daily (
 
 AGGREGATE_SQL = '''
 SELECT
-    DATE(history_station_end_time) AS day,
+    d.day AS day,
     fixture_no,
     model,
     pn,
@@ -48,11 +40,11 @@ SELECT
     COUNT(CASE WHEN history_station_passing_status = 'Pass' THEN 1 END) AS pass,
     COUNT(CASE WHEN history_station_passing_status = 'Fail' THEN 1 END) AS fail
 FROM testboard_master_log
-WHERE history_station_end_time IS NOT NULL
-    AND history_station_end_time >= CURRENT_DATE - INTERVAL '6 days'
-    AND history_station_end_time <= CURRENT_DATE
-GROUP BY day, fixture_no, model, pn, workstation_name
-ORDER BY day DESC, fail DESC;
+JOIN unnest(%s::date[]) AS d(day)
+    ON history_station_end_time >= d.day
+    AND history_station_end_time < d.day + 1
+GROUP BY d.day, fixture_no, model, pn, workstation_name
+ORDER BY d.day DESC, fail DESC;
 '''
 
 INSERT_SQL = '''
@@ -65,32 +57,40 @@ ON CONFLICT (day, fixture_no, model, pn, workstation_name) DO UPDATE SET
     total = EXCLUDED.total;
 '''
 
-def main():
-<<<<<<< HEAD
-    conn = psycopg2.connect(**DB_CONFIG)
-=======
-    conn = psycopg2.connect(**DATABASE)
->>>>>>> origin/main
-    try:
-        with conn.cursor() as cur:
-            print("Creating fixture_performance_daily table if not exists...")
-            cur.execute(CREATE_TABLE_SQL)
+def run(conn):
+    """Upsert fixture performance for the dirty testboard dates on conn. Commits; errors propagate."""
+    with conn.cursor() as cur:
+        print("Creating fixture_performance_daily table if not exists...")
+        cur.execute(CREATE_TABLE_SQL)
+        conn.commit()
+
+        # Only the dates loaders marked dirty; cleared by the commit below
+        dates = claim_dirty_dates(conn, CONSUMER, 'testboard_master_log')
+        if not dates:
             conn.commit()
+            print("No new testboard data since the last run.")
+            return
 
-            print("Aggregating fixture performance data from testboard_master_log (last 7 days)...")
-            cur.execute(AGGREGATE_SQL)
-            rows = cur.fetchall()
-            print(f"Aggregated {len(rows)} rows.")
+        print(f"Aggregating fixture performance data from testboard_master_log ({format_dates(dates)})...")
+        cur.execute(AGGREGATE_SQL, (dates,))
+        rows = cur.fetchall()
+        print(f"Aggregated {len(rows)} rows.")
 
-            if rows:
-                values = [(
-                    r[0], r[1], r[2], r[3], r[4], r[6], r[7], r[5]
-                ) for r in rows]
-                execute_values(cur, INSERT_SQL, values)
-                conn.commit()
-                print("Recent fixture performance aggregation complete and upserted.")
-            else:
-                print("No data to aggregate for the last 7 days.")
+        if rows:
+            values = [(
+                r[0], r[1], r[2], r[3], r[4], r[6], r[7], r[5]
+            ) for r in rows]
+            execute_values(cur, INSERT_SQL, values)
+            conn.commit()
+            print("Recent fixture performance aggregation complete and upserted.")
+        else:
+            conn.commit()
+            print(f"No data to aggregate for {format_dates(dates)}.")
+
+def main():
+    conn = psycopg2.connect(**DATABASE)
+    try:
+        run(conn)
     except Exception as e:
         print(f"Error: {e}")
         conn.rollback()
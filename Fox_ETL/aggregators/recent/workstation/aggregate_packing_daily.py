@@ -1,26 +1,6 @@
 #!/usr/bin/env python3
 import psycopg2
-from psycopg2.extras import execute_values
-<<<<<<< HEAD
-
-DB_CONFIG = {
-    'host': 'localhost',
-    'database': 'fox_db',
-    'user': 'gpu_user',
-    'password': '',
-    'port': '5432'
-}
-
-CREATE_TABLE_SQL = '''
-CREATE TABLE IF NOT EXISTS packing_daily_summary (
-    pack_date DATE NOT NULL,
-    model TEXT NOT NULL,
-    part_number TEXT NOT NULL,
-    packed_count INTEGER NOT NULL,
-    PRIMARY KEY (pack_date, model, part_number)
-);
-'''
-=======
+from datetime import timedelta
 import sys
 import os
 # Add Fox_ETL directory to path to find config.py
@@ -33,9 +13,22 @@ while current_dir != '/':
     current_dir = os.path.dirname(current_dir)
 
 from config import DATABASE
->>>>>>> origin/main
+from ingest.dirty_partitions import format_dates
+from ingest.workstation_rollup import claim_rollup_dates
 
-TRUNCATE_TABLE_SQL = 'TRUNCATE TABLE packing_daily_summary;'
+CONSUMER = 'aggregate_packing_daily'
+
+CREATE_TABLE_SQL = '''
+CREATE TABLE IF NOT EXISTS packing_daily_summary (
+    pack_date DATE NOT NULL,
+    model TEXT NOT NULL,
+    part_number TEXT NOT NULL,
+    packed_count INTEGER NOT NULL,
+    PRIMARY KEY (pack_date, model, part_number)
+);
+'''
+
+DELETE_SQL = 'DELETE FROM packing_daily_summary WHERE pack_date = ANY(%s::date[]);'
 
 AGGREGATE_SQL = '''
 INSERT INTO packing_daily_summary (
@@ -43,50 +36,56 @@ INSERT INTO packing_daily_summary (
 )
 SELECT
     CASE
-        WHEN EXTRACT(DOW FROM history_station_end_time) = 6 THEN DATE(history_station_end_time) - INTERVAL '1 day'  -- Saturday to Friday
-        WHEN EXTRACT(DOW FROM history_station_end_time) = 0 THEN DATE(history_station_end_time) - INTERVAL '2 days'  -- Sunday to Friday
-        ELSE DATE(history_station_end_time)
+        WHEN EXTRACT(DOW FROM date) = 6 THEN date - 1  -- Saturday to Friday
+        WHEN EXTRACT(DOW FROM date) = 0 THEN date - 2  -- Sunday to Friday
+        ELSE date
     END AS pack_date,
     model,
     pn AS part_number,
-    COUNT(*) AS packed_count
-FROM workstation_master_log
-WHERE workstation_name = 'PACKING'
-  AND history_station_passing_status = 'Pass'
-  AND history_station_end_time >= CURRENT_DATE - INTERVAL '7 days'
+    SUM(part_count) AS packed_count
+FROM workstation_rollup_hourly
+WHERE date = ANY(%s::date[])
+  AND workstation_name = 'PACKING'
+  AND passing_status = 'Pass'
 GROUP BY pack_date, model, part_number
 ORDER BY model, part_number, pack_date;
 '''
 
-INSERT_SQL = '''
-INSERT INTO packing_daily_summary (
-    pack_date, model, part_number, packed_count
-) VALUES %s
-ON CONFLICT (pack_date, model, part_number) DO UPDATE SET
-    packed_count = EXCLUDED.packed_count;
-'''
+def pack_date(day):
+    """Saturday and Sunday packs count for the Friday before (same rule as AGGREGATE_SQL)"""
+    return day - timedelta(days=max(day.weekday() - 4, 0))
 
-def main():
-<<<<<<< HEAD
-    conn = psycopg2.connect(**DB_CONFIG)
-=======
-    conn = psycopg2.connect(**DATABASE)
->>>>>>> origin/main
-    try:
-        with conn.cursor() as cur:
-            print("Creating packing_daily_summary table with primary key if not exists...")
-            cur.execute(CREATE_TABLE_SQL)
-            conn.commit()
+def pack_days(pack):
+    """Dates whose packs count for pack date `pack`"""
+    return [pack + timedelta(days=n) for n in range(3 if pack.weekday() == 4 else 1)]
 
-            print("Truncating packing_daily_summary table...")
-            cur.execute(TRUNCATE_TABLE_SQL)
-            conn.commit()
+def run(conn):
+    """Rebuild the pack dates touched by dirty workstation dates on conn. Commits; errors propagate."""
+    with conn.cursor() as cur:
+        print("Creating packing_daily_summary table with primary key if not exists...")
+        cur.execute(CREATE_TABLE_SQL)
+        conn.commit()
 
-            print("Aggregating all packing data from workstation_master_log with business rule for weekends...")
-            cur.execute(AGGREGATE_SQL)
+        # A dirty Saturday changes Friday's total, so rebuild whole pack dates
+        dirty = claim_rollup_dates(conn, CONSUMER)
+        if not dirty:
             conn.commit()
-            rows_affected = cur.rowcount
-            print(f"Aggregated and inserted {rows_affected} records.")
+            print("No new workstation data since the last run.")
+            return
+        packs = sorted({pack_date(day) for day in dirty})
+        days = [day for pack in packs for day in pack_days(pack)]
+
+        print(f"Rebuilding packing totals for {format_dates(packs)} with business rule for weekends...")
+        cur.execute(DELETE_SQL, (packs,))
+        cur.execute(AGGREGATE_SQL, (days,))
+        rows_affected = cur.rowcount
+        conn.commit()
+        print(f"Aggregated and inserted {rows_affected} records.")
+
+def main():
+    conn = psycopg2.connect(**DATABASE)
+    try:
+        run(conn)
     except Exception as e:
         print(f"Error: {e}")
         conn.rollback()
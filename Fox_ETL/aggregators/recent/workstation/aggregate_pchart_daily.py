@@ -1,14 +1,10 @@
 #!/usr/bin/env python3
 """
-Aggregate workstation data for P-Chart analysis for the last 7 days.
+Aggregate workstation data for P-Chart analysis for the dates loaders marked dirty.
 Groups by part number, model, workstation, and service flow to track pass/fail counts.
 """
 import psycopg2
 import logging
-from datetime import datetime
-import pandas as pd
-<<<<<<< HEAD
-=======
 import sys
 import os
 # Add Fox_ETL directory to path to find config.py
@@ -20,29 +16,21 @@ while current_dir != '/':
         break
     current_dir = os.path.dirname(current_dir)
 from config import DATABASE
->>>>>>> origin/main
+from ingest.dirty_partitions import format_dates
+from ingest.workstation_rollup import claim_rollup_dates
+
+CONSUMER = 'aggregate_pchart_daily'
 
 # Setup simple console logging
 logging.basicConfig(
     level=logging.INFO,
-<<<<<<< HEAD
     format='%(asctime)s - %(levelname)s - %(message)s'
-=======
-    format='%(levelname)s - %(message)s'
->>>>>>> origin/main
 )
 
 def connect_to_db():
     """Establish database connection"""
-<<<<<<< HEAD
     logging.info('🔌 Connecting to database...')
-    return psycopg2.connect(
-        host="localhost",
-        database="fox_db",
-        user="gpu_user",
-        password="",
-        port="5432"
-    )
+    return psycopg2.connect(**DATABASE)
 
 def create_pchart_table(conn):
     """Create the P-Chart aggregation table if it doesn't exist"""
@@ -66,35 +54,18 @@ def create_pchart_table(conn):
     conn.commit()
     cursor.close()
     logging.info('Table check/creation complete.')
-=======
-    return psycopg2.connect(**DATABASE)
-
-def create_pchart_table(conn):
-    """Create pchart_daily table if it doesn't exist"""
-    cursor = conn.cursor()
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS pchart_daily (
-            date DATE NOT NULL,
-            pn TEXT NOT NULL,
-            model TEXT NOT NULL,
-            workstation_name TEXT NOT NULL,
-            service_flow TEXT NOT NULL,
-            total_count INTEGER NOT NULL DEFAULT 0,
-            pass_count INTEGER NOT NULL DEFAULT 0,
-            fail_count INTEGER NOT NULL DEFAULT 0,
-            PRIMARY KEY (date, pn, model, workstation_name, service_flow)
-        );
-    """)
-    conn.commit()
-    cursor.close()
->>>>>>> origin/main
 
 def aggregate_daily_data(conn):
-    """Aggregate workstation data for the last 7 days"""
+    """Recompute the dirty dates of the workstation rollup; they are cleared in the same commit"""
+    dates = claim_rollup_dates(conn, CONSUMER)
+    if not dates:
+        logging.info('No new workstation data since the last run.')
+        conn.commit()
+        return 0
     cursor = conn.cursor()
-    logging.info('Starting 7-day window aggregation...')
+    logging.info(f'Starting aggregation for {format_dates(dates)}...')
     
-    # Aggregate query with 7-day window
+    # Aggregate only the dirty dates from the hourly rollup (ingest/workstation_rollup.py)
     query = """
     INSERT INTO workstation_pchart_daily (
         date,
@@ -107,28 +78,26 @@ def aggregate_daily_data(conn):
         fail_count
     )
     SELECT 
-        DATE(history_station_end_time) as date,
+        date,
         pn,
         model,
         workstation_name,
         service_flow,
-        COUNT(*) as total_count,
-        COUNT(CASE WHEN history_station_passing_status = 'Pass' THEN 1 END) as pass_count,
-        COUNT(CASE WHEN history_station_passing_status != 'Pass' THEN 1 END) as fail_count
-    FROM workstation_master_log
-    WHERE history_station_end_time IS NOT NULL
+        SUM(part_count) as total_count,
+        SUM(CASE WHEN passing_status = 'Pass' THEN part_count ELSE 0 END) as pass_count,
+        SUM(CASE WHEN passing_status != 'Pass' THEN part_count ELSE 0 END) as fail_count
+    FROM workstation_rollup_hourly
+    WHERE date = ANY(%s::date[])
         AND service_flow NOT IN ('NC Sort', 'RO')
         AND service_flow IS NOT NULL
-        AND history_station_end_time >= CURRENT_DATE - INTERVAL '6 days'
-        AND history_station_end_time <= CURRENT_DATE
     GROUP BY 
-        DATE(history_station_end_time),
+        date,
         pn,
         model,
         workstation_name,
         service_flow
     ORDER BY 
-        DATE(history_station_end_time),
+        date,
         pn,
         workstation_name
     ON CONFLICT (date, pn, workstation_name, service_flow) 
@@ -139,7 +108,7 @@ def aggregate_daily_data(conn):
         model = EXCLUDED.model;
     """
     
-    cursor.execute(query)
+    cursor.execute(query, (dates,))
     rows_affected = cursor.rowcount
     conn.commit()
     cursor.close()
@@ -147,14 +116,19 @@ def aggregate_daily_data(conn):
     logging.info(f'Aggregation complete. {rows_affected} rows affected.')
     return rows_affected
 
+def run(conn):
+    """Create the table if needed and aggregate the dirty dates on conn; returns rows affected"""
+    create_pchart_table(conn)
+    return aggregate_daily_data(conn)
+
 def main():
     logging.info("="*50)
-    logging.info("Starting P-Chart daily aggregation process (last 7 days)...")
+    logging.info("Starting P-Chart daily aggregation process (dirty dates)...")
     
+    conn = None
     try:
         conn = connect_to_db()
-        create_pchart_table(conn)
-        rows_affected = aggregate_daily_data(conn)
+        rows_affected = run(conn)
         
         logging.info("Successfully aggregated data:")
         logging.info(f"   - {rows_affected:,} daily records processed")
@@ -1,15 +1,5 @@
 import psycopg2
 from datetime import datetime, timedelta
-<<<<<<< HEAD
-
-DB_CONFIG = {
-    'host': 'localhost',
-    'database': 'fox_db',
-    'user': 'gpu_user',
-    'password': '',
-    'port': '5432'
-}
-=======
 import sys
 import os
 # Add Fox_ETL directory to path to find config.py
@@ -21,7 +11,7 @@ while current_dir != '/':
         break
     current_dir = os.path.dirname(current_dir)
 from config import DATABASE
->>>>>>> origin/main
+from ingest.workstation_rollup import ensure_rollup
 
 AGGREGATE_SQL = '''
 SELECT
@@ -31,46 +21,47 @@ SELECT
     ELSE NULL
   END AS sort_code,
   CASE
-    WHEN EXTRACT(DOW FROM history_station_end_time) = 6 THEN DATE(history_station_end_time) - INTERVAL '1 day'
-    WHEN EXTRACT(DOW FROM history_station_end_time) = 0 THEN DATE(history_station_end_time) - INTERVAL '2 days'
-    ELSE DATE(history_station_end_time)
+    WHEN EXTRACT(DOW FROM date) = 6 THEN date - 1
+    WHEN EXTRACT(DOW FROM date) = 0 THEN date - 2
+    ELSE date
   END AS test_date,
-  COUNT(*) AS test_count
-FROM workstation_master_log
+  SUM(part_count) AS test_count
+FROM workstation_rollup_hourly
 WHERE workstation_name = 'TEST'
   AND model IN ('Tesla SXM4', 'Tesla SXM5')
-  AND history_station_end_time >= %s
-  AND history_station_end_time < %s
+  AND date >= %s
+  AND date < %s
 GROUP BY sort_code, test_date
 ORDER BY sort_code, test_date;
 '''
 
+def run(conn):
+    """Print the last week of TEST counts per sort code from the hourly rollup (nothing is written)"""
+    ensure_rollup(conn)
+    with conn.cursor() as cur:
+        today = datetime.utcnow().date()
+        start_date = today - timedelta(days=6)
+        end_date = today + timedelta(days=1)  
+        print(f"Aggregating TEST data from {start_date} to {end_date - timedelta(days=1)} (inclusive)...")
+
+        cur.execute(AGGREGATE_SQL, (start_date, end_date))
+        rows = cur.fetchall()
+        print(f"Aggregated {len(rows)} rows.")
+
+        sort_data = {'506': {}, '520': {}}
+        for sort_code, test_date, test_count in rows:
+            if sort_code in sort_data:
+                date_str = f"{test_date.month}/{test_date.day}/{test_date.year}"
+                sort_data[sort_code][date_str] = test_count
+        print("\nSORT data for frontend:")
+        print(sort_data)
+
 def main():
-<<<<<<< HEAD
-    conn = psycopg2.connect(**DB_CONFIG)
-=======
     conn = psycopg2.connect(**DATABASE)
->>>>>>> origin/main
     try:
-        with conn.cursor() as cur:
-            today = datetime.utcnow().date()
-            start_date = today - timedelta(days=6)
-            end_date = today + timedelta(days=1)  
-            print(f"Aggregating TEST data from {start_date} to {end_date - timedelta(days=1)} (inclusive)...")
-
-            cur.execute(AGGREGATE_SQL, (start_date, end_date))
-            rows = cur.fetchall()
-            print(f"Aggregated {len(rows)} rows.")
-
-            sort_data = {'506': {}, '520': {}}
-            for sort_code, test_date, test_count in rows:
-                if sort_code in sort_data:
-                    date_str = f"{test_date.month}/{test_date.day}/{test_date.year}"
-                    sort_data[sort_code][date_str] = test_count
-            print("\nSORT data for frontend:")
-            print(sort_data)
+        run(conn)
     finally:
         conn.close()
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
\ No newline at end of file
@@ -1,15 +1,5 @@
+import argparse
 import psycopg2
-from datetime import datetime
-<<<<<<< HEAD
-
-DB_CONFIG = {
-    'host': 'localhost',
-    'database': 'fox_db',
-    'user': 'gpu_user',
-    'password': '',
-    'port': '5432'
-}
-=======
 import sys
 import os
 # Add Fox_ETL directory to path to find config.py
@@ -21,7 +11,10 @@ while current_dir != '/':
         break
     current_dir = os.path.dirname(current_dir)
 from config import DATABASE
->>>>>>> origin/main
+from ingest.dirty_partitions import format_dates
+from ingest.workstation_rollup import claim_rollup_dates
+
+CONSUMER = 'aggregate_station_hourly_counts_daily'
 
 def create_summary_table(conn):
     with conn.cursor() as cur:
@@ -36,56 +29,79 @@ def create_summary_table(conn):
         """)
     conn.commit()
 
-def aggregate_station_hourly_counts():
-<<<<<<< HEAD
-    conn = psycopg2.connect(**DB_CONFIG)
-=======
+# One statement: group the rollup, upsert, and report what changed.
+# Rows whose count did not change are left alone (no dead tuples)
+UPSERT_SQL = """
+    WITH hourly AS (
+        SELECT
+            date,
+            hour,
+            workstation_name,
+            SUM(part_count) AS part_count
+        FROM
+            workstation_rollup_hourly
+        WHERE
+            date = ANY(%s::date[])
+        GROUP BY
+            date,
+            hour,
+            workstation_name
+    ),
+    upserted AS (
+        INSERT INTO station_hourly_summary (date, hour, workstation_name, part_count)
+        SELECT date, hour, workstation_name, part_count FROM hourly
+        ON CONFLICT (date, hour, workstation_name)
+        DO UPDATE SET part_count = EXCLUDED.part_count
+        WHERE station_hourly_summary.part_count IS DISTINCT FROM EXCLUDED.part_count
+        RETURNING 1
+    )
+    SELECT
+        (SELECT COUNT(*) FROM hourly),
+        (SELECT COUNT(*) FROM upserted),
+        (SELECT COUNT(DISTINCT workstation_name) FROM hourly),
+        (SELECT COALESCE(SUM(part_count), 0) FROM hourly);
+"""
+
+def print_hourly(cur, dates):
+    cur.execute("""
+        SELECT date, hour, workstation_name, part_count
+        FROM station_hourly_summary
+        WHERE date = ANY(%s::date[])
+        ORDER BY date, hour, workstation_name;
+    """, (dates,))
+    print(f"{'Date':<12} {'Hour':<4} {'Station':<16} {'Count':<6}")
+    print("-" * 40)
+    for date, hour, station, count in cur.fetchall():
+        print(f"{date} {hour:>2}   {station:<16} {count:<6}")
+
+def run(conn, quiet=True):
+    """Upsert hourly counts for the dirty workstation dates on conn and commit; quiet skips the per-hour table"""
+    create_summary_table(conn)
+    # Only the dates refreshed in the hourly rollup; cleared by the commit below
+    dates = claim_rollup_dates(conn, CONSUMER)
+    if not dates:
+        conn.commit()
+        print("No new workstation data since the last run.")
+        return
+    with conn.cursor() as cur:
+        print(f"Processing data for {format_dates(dates)}...")
+        cur.execute(UPSERT_SQL, (dates,))
+        groups, changed, stations, parts = cur.fetchone()
+        conn.commit()
+        if not quiet:
+            print_hourly(cur, dates)
+        print(f"\nSaved {groups} hourly records ({changed} new or changed) for {stations} stations, "
+              f"{parts} parts, {format_dates(dates)}.")
+
+def aggregate_station_hourly_counts(quiet=True):
     conn = psycopg2.connect(**DATABASE)
->>>>>>> origin/main
     try:
-        create_summary_table(conn)
-        with conn.cursor() as cur:
-            cur.execute("""
-                WITH recent_data AS (
-                    SELECT
-                        DATE(history_station_end_time) AS date,
-                        EXTRACT(HOUR FROM history_station_end_time)::int AS hour,
-                        workstation_name,
-                        COUNT(*) AS part_count
-                    FROM
-                        workstation_master_log
-                    WHERE
-                        history_station_end_time IS NOT NULL
-                        AND history_station_end_time >= CURRENT_DATE - INTERVAL '6 days'
-                        AND history_station_end_time <= CURRENT_DATE
-                    GROUP BY
-                        DATE(history_station_end_time),
-                        EXTRACT(HOUR FROM history_station_end_time),
-                        workstation_name
-                    ORDER BY
-                        date, hour, workstation_name
-                )
-                SELECT * FROM recent_data;
-            """)
-            results = cur.fetchall()
-            
-            print("Processing data for the last 7 days...")
-            print(f"{'Date':<12} {'Hour':<4} {'Station':<16} {'Count':<6}")
-            print("-" * 40)
-            
-            for date, hour, station, count in results:
-                print(f"{date} {hour:>2}   {station:<16} {count:<6}")
-                cur.execute("""
-                    INSERT INTO station_hourly_summary (date, hour, workstation_name, part_count)
-                    VALUES (%s, %s, %s, %s)
-                    ON CONFLICT (date, hour, workstation_name)
-                    DO UPDATE SET part_count = EXCLUDED.part_count;
-                """, (date, hour, station, count))
-            
-            conn.commit()
-            print(f"\nProcessed and saved {len(results)} hourly records from the last 7 days.")
+        run(conn, quiet=quiet)
     finally:
         conn.close()
 
 if __name__ == "__main__":
-    aggregate_station_hourly_counts()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Upsert station_hourly_summary for the dirty workstation dates")
+    parser.add_argument('--verbose', action='store_true', help='Also print every hourly record (default: summary only)')
+    args = parser.parse_args()
+    aggregate_station_hourly_counts(quiet=not args.verbose)
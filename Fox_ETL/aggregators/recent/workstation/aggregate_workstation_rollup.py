@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+import argparse
+import psycopg2
+import sys
+import os
+# Add Fox_ETL directory to path to find config.py
+current_dir = os.path.dirname(os.path.abspath(__file__))
+while current_dir != '/':
+    config_path = os.path.join(current_dir, 'config.py')
+    if os.path.exists(config_path):
+        sys.path.insert(0, current_dir)
+        break
+    current_dir = os.path.dirname(current_dir)
+
+from config import DATABASE
+from ingest.dirty_partitions import format_dates
+from ingest.workstation_rollup import ROLLUP_TABLE, update_rollup
+
+def run(conn, rebuild=False):
+    """Bring workstation_rollup_hourly up to date on conn; every workstation aggregate reads it. Commits."""
+    rows, dates = update_rollup(conn, rebuild=rebuild)
+    if dates is None:
+        print(f"Built {ROLLUP_TABLE}: {rows} rows for all dates.")
+    elif not dates:
+        print("No new workstation data since the last run.")
+    else:
+        print(f"Refreshed {ROLLUP_TABLE} for {format_dates(dates)}: {rows} rows.")
+
+def main():
+    parser = argparse.ArgumentParser(description="Refresh the hourly workstation rollup from workstation_master_log")
+    parser.add_argument('--rebuild', action='store_true', help='Rebuild every date instead of the dirty ones')
+    args = parser.parse_args()
+    conn = psycopg2.connect(**DATABASE)
+    try:
+        run(conn, rebuild=args.rebuild)
+    except Exception as e:
+        print(f"Error: {e}")
+        conn.rollback()
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,4 @@
 import psycopg2
-import json
 from datetime import datetime, timedelta
 import argparse
 import sys
@@ -13,6 +12,8 @@ while current_dir != '/':
         break
     current_dir = os.path.dirname(current_dir)
 from config import DATABASE
+from ingest.dirty_partitions import format_dates
+from ingest.workstation_rollup import ensure_rollup, claim_rollup_dates
 
 def get_week_bounds(target_date):
     """Get the Monday (start) and Sunday (end) of the week containing target_date"""
@@ -26,295 +27,379 @@ def get_week_id(target_date):
     year, week_num, _ = target_date.isocalendar()
     return f"{year}-W{week_num:02d}"
 
-def calculate_weekly_starters_for_date(target_date):
+def calculate_weekly_starters_for_date(conn, target_date):
     """Get all parts that STARTED during the week containing target_date"""
     week_start, week_end = get_week_bounds(target_date)
     week_id = get_week_id(target_date)
     
     print(f"Week {week_id}: {week_start.strftime('%Y-%m-%d')} to {week_end.strftime('%Y-%m-%d')}")
     
-    conn = psycopg2.connect(**DATABASE)
-    try:
-        with conn.cursor() as cur:
-            start_date = week_start
-            end_date = week_end + timedelta(days=1)  
-            
-            cur.execute("""
-                WITH first_activity AS (
-                    SELECT 
-                        sn,
-                        model,
-                        MIN(history_station_end_time) as first_activity_time
-                    FROM workstation_master_log
-                    WHERE service_flow NOT IN ('NC Sort', 'RO')
-                        AND service_flow IS NOT NULL
-                    GROUP BY sn, model
-                )
+    with conn.cursor() as cur:
+        start_date = week_start
+        end_date = week_end + timedelta(days=1)  
+        
+        cur.execute("""
+            WITH first_activity AS (
                 SELECT 
+                    sn,
                     model,
-                    COUNT(*) as count,
-                    ARRAY_AGG(sn) as parts
-                FROM first_activity
-                WHERE first_activity_time >= %s 
-                    AND first_activity_time < %s
-                GROUP BY model
-                ORDER BY model;
-            """, (start_date, end_date))
-            
-            results = cur.fetchall()
-            
-            total_starters = 0
-            week_starters = []
-            by_model = {}
-            
-            for model, count, parts in results:
-                total_starters += count
-                week_starters.extend(parts)
-                by_model[model] = count
-                print(f"    {model}: {count} parts")
-            
-            print(f"Week starters: {total_starters} parts")
-            
-            return {
-                "weekId": week_id,
-                "weekStart": week_start,
-                "weekEnd": week_end,
-                "totalStarters": total_starters,
-                "weekStarters": week_starters,
-                "byModel": by_model
-            }
-    finally:
-        conn.close()
+                    MIN(history_station_end_time) as first_activity_time
+                FROM workstation_master_log
+                WHERE service_flow NOT IN ('NC Sort', 'RO')
+                    AND service_flow IS NOT NULL
+                GROUP BY sn, model
+            )
+            SELECT 
+                model,
+                COUNT(*) as count,
+                ARRAY_AGG(sn) as parts
+            FROM first_activity
+            WHERE first_activity_time >= %s 
+                AND first_activity_time < %s
+            GROUP BY model
+            ORDER BY model;
+        """, (start_date, end_date))
+        
+        results = cur.fetchall()
+        
+        total_starters = 0
+        week_starters = []
+        by_model = {}
+        
+        for model, count, parts in results:
+            total_starters += count
+            week_starters.extend(parts)
+            by_model[model] = count
+            print(f"    {model}: {count} parts")
+        
+        print(f"Week starters: {total_starters} parts")
+        
+        return {
+            "weekId": week_id,
+            "weekStart": week_start,
+            "weekEnd": week_end,
+            "totalStarters": total_starters,
+            "weekStarters": week_starters,
+            "byModel": by_model
+        }
 
-def calculate_daily_completions_from_week_starters(target_date, week_starters_list):
+def calculate_daily_completions_from_week_starters(conn, target_date, week_starters_list):
     """Of the parts that started this week, how many completed on target_date?"""
     start_date = target_date
     end_date = target_date + timedelta(days=1)
     
     print(f"Daily completions on {target_date.strftime('%Y-%m-%d')} from week starters...")
     
-    conn = psycopg2.connect(**DATABASE)
-    try:
-        with conn.cursor() as cur:
-            if not week_starters_list:
-                print(f"No week starters to check")
-                return {
-                    "completedToday": 0,
-                    "firstPassToday": 0,
-                    "dailyFPY": 0.0,
-                    "byModel": {}
-                }
-            
-            cur.execute("""
-                WITH completion_check AS (
-                    SELECT 
-                        sn,
-                        model,
-                        COUNT(CASE WHEN workstation_name = 'PACKING' THEN 1 END) as reached_packing,
-                        COUNT(CASE WHEN history_station_passing_status != 'Pass' THEN 1 END) as failure_count
-                    FROM workstation_master_log
-                    WHERE sn = ANY(%s)
-                        AND history_station_end_time >= %s 
-                        AND history_station_end_time < %s
-                        AND service_flow NOT IN ('NC Sort', 'RO')
-                        AND service_flow IS NOT NULL
-                    GROUP BY sn, model
-                )
-                SELECT 
-                    model,
-                    COUNT(*) as completed_today,
-                    COUNT(CASE WHEN reached_packing > 0 AND failure_count = 0 THEN 1 END) as first_pass_today
-                FROM completion_check
-                WHERE reached_packing > 0
-                GROUP BY model;
-            """, (week_starters_list, start_date, end_date))
-            
-            results = cur.fetchall()
-            
-            completed_today = 0
-            first_pass_today = 0
-            by_model = {}
-            
-            for model, completed, first_pass in results:
-                completed_today += completed
-                first_pass_today += first_pass
-                by_model[model] = {"completed": completed, "firstPass": first_pass}
-            
-            daily_fpy = (first_pass_today / completed_today * 100) if completed_today > 0 else 0
-            
-            print(f"Completed today: {completed_today} parts")
-            print(f"First pass today: {first_pass_today} parts ({daily_fpy:.2f}% FPY)")
-            
-            for model, counts in by_model.items():
-                model_fpy = (counts['firstPass'] / counts['completed'] * 100) if counts['completed'] > 0 else 0
-                print(f"    {model}: {counts['firstPass']}/{counts['completed']} = {model_fpy:.1f}% FPY")
-            
+    with conn.cursor() as cur:
+        if not week_starters_list:
+            print(f"No week starters to check")
             return {
-                "completedToday": completed_today,
-                "firstPassToday": first_pass_today,
-                "dailyFPY": round(daily_fpy, 2),
-                "byModel": by_model
+                "completedToday": 0,
+                "firstPassToday": 0,
+                "dailyFPY": 0.0,
+                "byModel": {}
             }
-    finally:
-        conn.close()
-
-def aggregate_daily_tpy_for_date(target_date):
-    """Aggregate daily TPY metrics for a specific date"""
-    print(f"\nAGGREGATING DAILY TPY FOR: {target_date.strftime('%Y-%m-%d')}")
-    print("=" * 60)
-    
-    conn = psycopg2.connect(**DATABASE)
-    try:
-        with conn.cursor() as cur:
-            week_data = calculate_weekly_starters_for_date(target_date)
-            
-            daily_completions = calculate_daily_completions_from_week_starters(
-                target_date, 
-                week_data['weekStarters']
-            )
-            
-            start_date = target_date
-            end_date = target_date + timedelta(days=1)
-            
-            cur.execute("""
+        
+        cur.execute("""
+            WITH completion_check AS (
                 SELECT 
+                    sn,
                     model,
-                    workstation_name,
-                    COUNT(*) as total_parts,
-                    COUNT(CASE WHEN history_station_passing_status = 'Pass' THEN 1 END) as passed_parts,
-                    COUNT(CASE WHEN history_station_passing_status != 'Pass' THEN 1 END) as failed_parts
-                FROM workstation_master_log 
-                WHERE history_station_end_time >= %s 
+                    COUNT(CASE WHEN workstation_name = 'PACKING' THEN 1 END) as reached_packing,
+                    COUNT(CASE WHEN history_station_passing_status != 'Pass' THEN 1 END) as failure_count
+                FROM workstation_master_log
+                WHERE sn = ANY(%s)
+                    AND history_station_end_time >= %s 
                     AND history_station_end_time < %s
                     AND service_flow NOT IN ('NC Sort', 'RO')
                     AND service_flow IS NOT NULL
-                GROUP BY model, workstation_name
-                HAVING COUNT(*) >= 1
-                ORDER BY model, total_parts DESC;
-            """, (start_date, end_date))
-            
-            results = cur.fetchall()
-            
-            inserted_count = 0
-            for model, workstation, total, passed, failed in results:
-                throughput_yield = (passed / total * 100) if total > 0 else 0
-                
-                cur.execute("""
-                    INSERT INTO daily_tpy_metrics 
-                        (date_id, model, workstation_name, total_parts, passed_parts, failed_parts, throughput_yield,
-                         week_id, week_start, week_end, total_starters)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                    ON CONFLICT (date_id, model, workstation_name) 
-                    DO UPDATE SET
-                        total_parts = EXCLUDED.total_parts,
-                        passed_parts = EXCLUDED.passed_parts,
-                        failed_parts = EXCLUDED.failed_parts,
-                        throughput_yield = EXCLUDED.throughput_yield,
-                        week_id = EXCLUDED.week_id,
-                        week_start = EXCLUDED.week_start,
-                        week_end = EXCLUDED.week_end,
-                        total_starters = EXCLUDED.total_starters,
-                        created_at = NOW();
-                """, (target_date, model, workstation, total, passed, failed, round(throughput_yield, 2),
-                      week_data['weekId'], week_data['weekStart'], week_data['weekEnd'], week_data['totalStarters']))
-                
-                inserted_count += 1
-                print(f"    {model} {workstation}: {passed}/{total} = {throughput_yield:.1f}%")
-            
-            conn.commit()
-            
-            print(f"\nDaily TPY aggregation complete!")
-            print(f"  Inserted/Updated {inserted_count} station-model combinations")
-            print(f"  Daily FPY: {daily_completions['dailyFPY']:.1f}%")
-            print(f"  Date: {target_date.strftime('%Y-%m-%d')}")
-            
-            return {
-                "date": target_date,
-                "insertedCount": inserted_count,
-                "dailyFPY": daily_completions['dailyFPY'],
-                "completedToday": daily_completions['completedToday'],
-                "weekData": week_data
-            }
-            
-    finally:
-        conn.close()
+                GROUP BY sn, model
+            )
+            SELECT 
+                model,
+                COUNT(*) as completed_today,
+                COUNT(CASE WHEN reached_packing > 0 AND failure_count = 0 THEN 1 END) as first_pass_today
+            FROM completion_check
+            WHERE reached_packing > 0
+            GROUP BY model;
+        """, (week_starters_list, start_date, end_date))
+        
+        results = cur.fetchall()
+        
+        completed_today = 0
+        first_pass_today = 0
+        by_model = {}
+        
+        for model, completed, first_pass in results:
+            completed_today += completed
+            first_pass_today += first_pass
+            by_model[model] = {"completed": completed, "firstPass": first_pass}
+        
+        daily_fpy = (first_pass_today / completed_today * 100) if completed_today > 0 else 0
+        
+        print(f"Completed today: {completed_today} parts")
+        print(f"First pass today: {first_pass_today} parts ({daily_fpy:.2f}% FPY)")
+        
+        for model, counts in by_model.items():
+            model_fpy = (counts['firstPass'] / counts['completed'] * 100) if counts['completed'] > 0 else 0
+            print(f"    {model}: {counts['firstPass']}/{counts['completed']} = {model_fpy:.1f}% FPY")
+        
+        return {
+            "completedToday": completed_today,
+            "firstPassToday": first_pass_today,
+            "dailyFPY": round(daily_fpy, 2),
+            "byModel": by_model
+        }
 
-def get_all_available_dates():
-    """Get all unique dates when actual testing occurred"""
-    print("Finding all dates with actual test activity...")
+def aggregate_daily_tpy_for_date(conn, target_date):
+    """Aggregate daily TPY metrics for a specific date"""
+    print(f"\nAGGREGATING DAILY TPY FOR: {target_date.strftime('%Y-%m-%d')}")
+    print("=" * 60)
     
-    conn = psycopg2.connect(**DATABASE)
-    try:
-        with conn.cursor() as cur:
+    with conn.cursor() as cur:
+        week_data = calculate_weekly_starters_for_date(conn, target_date)
+        
+        daily_completions = calculate_daily_completions_from_week_starters(conn, 
+            target_date, 
+            week_data['weekStarters']
+        )
+        
+        # Station yields come from the hourly rollup (ingest/workstation_rollup.py)
+        cur.execute("""
+            SELECT 
+                model,
+                workstation_name,
+                SUM(part_count) as total_parts,
+                SUM(CASE WHEN passing_status = 'Pass' THEN part_count ELSE 0 END) as passed_parts,
+                SUM(CASE WHEN passing_status != 'Pass' THEN part_count ELSE 0 END) as failed_parts
+            FROM workstation_rollup_hourly 
+            WHERE date = %s
+                AND service_flow NOT IN ('NC Sort', 'RO')
+                AND service_flow IS NOT NULL
+            GROUP BY model, workstation_name
+            HAVING SUM(part_count) >= 1
+            ORDER BY model, total_parts DESC;
+        """, (target_date,))
+        
+        results = cur.fetchall()
+        
+        inserted_count = 0
+        for model, workstation, total, passed, failed in results:
+            throughput_yield = (passed / total * 100) if total > 0 else 0
+            
             cur.execute("""
-                SELECT DISTINCT DATE(history_station_end_time) as test_date
-                FROM workstation_master_log
-                WHERE history_station_end_time IS NOT NULL
-                    AND service_flow NOT IN ('NC Sort', 'RO')
-                    AND service_flow IS NOT NULL
-                ORDER BY test_date;
-            """)
+                INSERT INTO daily_tpy_metrics 
+                    (date_id, model, workstation_name, total_parts, passed_parts, failed_parts, throughput_yield,
+                     week_id, week_start, week_end, total_starters)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                ON CONFLICT (date_id, model, workstation_name) 
+                DO UPDATE SET
+                    total_parts = EXCLUDED.total_parts,
+                    passed_parts = EXCLUDED.passed_parts,
+                    failed_parts = EXCLUDED.failed_parts,
+                    throughput_yield = EXCLUDED.throughput_yield,
+                    week_id = EXCLUDED.week_id,
+                    week_start = EXCLUDED.week_start,
+                    week_end = EXCLUDED.week_end,
+                    total_starters = EXCLUDED.total_starters,
+                    created_at = NOW();
+            """, (target_date, model, workstation, total, passed, failed, round(throughput_yield, 2),
+                  week_data['weekId'], week_data['weekStart'], week_data['weekEnd'], week_data['totalStarters']))
             
-            dates = [row[0] for row in cur.fetchall()]
-            print(f"  Found {len(dates)} dates with test activity from {dates[0]} to {dates[-1]}")
-            return dates
-    finally:
-        conn.close()
+            inserted_count += 1
+            print(f"    {model} {workstation}: {passed}/{total} = {throughput_yield:.1f}%")
+        
+        conn.commit()
+        
+        print(f"\nDaily TPY aggregation complete!")
+        print(f"  Inserted/Updated {inserted_count} station-model combinations")
+        print(f"  Daily FPY: {daily_completions['dailyFPY']:.1f}%")
+        print(f"  Date: {target_date.strftime('%Y-%m-%d')}")
+        
+        return {
+            "date": target_date,
+            "insertedCount": inserted_count,
+            "dailyFPY": daily_completions['dailyFPY'],
+            "completedToday": daily_completions['completedToday'],
+            "weekData": week_data
+        }
+        
+
+CONSUMER = 'aggregate_tpy_all_time_daily'
+
+# daily_tpy_metrics for many dates in one statement. The station yields come
+# from the hourly rollup; the week's starters from one first-activity pass
+# over the master log (a part starts in the week of its first activity),
+# shared by every date instead of repeated per date
+DAILY_TPY_SQL = """
+    WITH first_activity AS (
+        SELECT 
+            sn,
+            model,
+            MIN(history_station_end_time) as first_activity_time
+        FROM workstation_master_log
+        WHERE service_flow NOT IN ('NC Sort', 'RO')
+            AND service_flow IS NOT NULL
+            {starters_filter}
+        GROUP BY sn, model
+    ),
+    week_starters AS (
+        SELECT 
+            DATE_TRUNC('week', first_activity_time)::date as week_start,
+            COUNT(*) as total_starters
+        FROM first_activity
+        GROUP BY 1
+    ),
+    stations AS (
+        SELECT 
+            date as date_id,
+            model,
+            workstation_name,
+            SUM(part_count) as total_parts,
+            SUM(CASE WHEN passing_status = 'Pass' THEN part_count ELSE 0 END) as passed_parts,
+            SUM(CASE WHEN passing_status != 'Pass' THEN part_count ELSE 0 END) as failed_parts
+        FROM workstation_rollup_hourly
+        {weeks_join}
+        WHERE service_flow NOT IN ('NC Sort', 'RO')
+            AND service_flow IS NOT NULL
+        GROUP BY date, model, workstation_name
+        HAVING SUM(part_count) >= 1
+    ),
+    upserted AS (
+        INSERT INTO daily_tpy_metrics 
+            (date_id, model, workstation_name, total_parts, passed_parts, failed_parts, throughput_yield,
+             week_id, week_start, week_end, total_starters)
+        SELECT 
+            s.date_id,
+            s.model,
+            s.workstation_name,
+            s.total_parts,
+            s.passed_parts,
+            s.failed_parts,
+            ROUND(s.passed_parts * 100.0 / s.total_parts, 2),
+            TO_CHAR(s.date_id, 'IYYY-"W"IW'),
+            DATE_TRUNC('week', s.date_id)::date,
+            DATE_TRUNC('week', s.date_id)::date + 6,
+            COALESCE(w.total_starters, 0)
+        FROM stations s
+        LEFT JOIN week_starters w ON w.week_start = DATE_TRUNC('week', s.date_id)::date
+        ON CONFLICT (date_id, model, workstation_name) 
+        DO UPDATE SET
+            total_parts = EXCLUDED.total_parts,
+            passed_parts = EXCLUDED.passed_parts,
+            failed_parts = EXCLUDED.failed_parts,
+            throughput_yield = EXCLUDED.throughput_yield,
+            week_id = EXCLUDED.week_id,
+            week_start = EXCLUDED.week_start,
+            week_end = EXCLUDED.week_end,
+            total_starters = EXCLUDED.total_starters,
+            created_at = NOW()
+        RETURNING date_id
+    )
+    SELECT COUNT(*), COUNT(DISTINCT date_id), MIN(date_id), MAX(date_id) FROM upserted;
+"""
+
+# Incremental: only the given weeks. A part that starts in a week was active
+# in it, so the first-activity pass only needs those parts
+WEEKS_JOIN = """
+        JOIN unnest(%(weeks)s::date[]) AS w(week_start)
+            ON date >= w.week_start
+            AND date < w.week_start + 7
+"""
+
+STARTERS_FILTER = """
+            AND sn IN (
+                SELECT sn FROM workstation_master_log
+                JOIN unnest(%(weeks)s::date[]) AS w(week_start)
+                    ON history_station_end_time >= w.week_start
+                    AND history_station_end_time < w.week_start + 7
+            )
+"""
+
+def upsert_daily_tpy(conn, weeks=None):
+    """
+    Recompute daily_tpy_metrics for every date in weeks (Monday dates), or
+    all dates when None. Returns (rows, dates, first, last); the caller commits.
+    """
+    with conn.cursor() as cur:
+        if weeks is None:
+            cur.execute(DAILY_TPY_SQL.format(starters_filter='', weeks_join=''))
+        else:
+            cur.execute(DAILY_TPY_SQL.format(starters_filter=STARTERS_FILTER, weeks_join=WEEKS_JOIN),
+                        {'weeks': list(weeks)})
+        return cur.fetchone()
+
+def aggregate_daily_tpy_metrics_incremental(conn):
+    """Recompute the weeks of the dates refreshed in the rollup since the last run (the recent scheduler)"""
+    # Cleared by the commit below
+    dates = claim_rollup_dates(conn, CONSUMER)
+    if not dates:
+        conn.commit()
+        print("No new workstation data since the last run.")
+        return
+    # total_starters is per week, so every date of a touched week is recomputed
+    weeks = sorted({get_week_bounds(day)[0] for day in dates})
+    print(f"Recomputing daily TPY for {len(weeks)} week(s) touched by {format_dates(dates)}...")
+    rows, date_count, first, last = upsert_daily_tpy(conn, weeks)
+    conn.commit()
+    print(f"Upserted {rows} station-model rows for {date_count} dates ({first} to {last})")
 
-def aggregate_daily_tpy_metrics_all_time():
-    """Aggregate daily TPY metrics for all historical dates"""
+def aggregate_daily_tpy_metrics_all_time(conn):
+    """Aggregate daily TPY metrics for all historical dates in one statement"""
     print("DAILY TPY METRICS ALL-TIME AGGREGATOR")
     print("=" * 50)
     
-    # Get all available dates
-    all_dates = get_all_available_dates()
+    rows, date_count, first, last = upsert_daily_tpy(conn)
+    conn.commit()
     
-    if not all_dates:
+    if not rows:
         print("No valid dates found in the dataset")
         return
     
-    print(f"\nProcessing ALL {len(all_dates)} historical dates...")
-    
-    success_count = 0
-    error_count = 0
-    
-    for i, target_date in enumerate(all_dates, 1):
-        try:
-            print(f"\nProcessing {i}/{len(all_dates)}: {target_date.strftime('%Y-%m-%d')}")
-            print("-" * 50)
-            
-            result = aggregate_daily_tpy_for_date(target_date)
-            success_count += 1
-            
-        except Exception as e:
-            print(f"ERROR processing {target_date.strftime('%Y-%m-%d')}: {str(e)}")
-            error_count += 1
-    
     print(f"\nDAILY TPY ALL-TIME AGGREGATION COMPLETE!")
-    print(f"Successfully processed: {success_count} dates")
-    print(f"Errors: {error_count} dates")
+    print(f"Upserted {rows} station-model rows for {date_count} dates from {first} to {last}")
     
     # Show sample results
+    with conn.cursor() as cur:
+        cur.execute("SELECT COUNT(*) FROM daily_tpy_metrics")
+        total_records = cur.fetchone()[0]
+        print(f"Total records in daily_tpy_metrics: {total_records}")
+        
+        if total_records > 0:
+            cur.execute("""
+                SELECT date_id, model, workstation_name, throughput_yield 
+                FROM daily_tpy_metrics 
+                ORDER BY date_id DESC, throughput_yield DESC 
+                LIMIT 5;
+            """)
+            sample_results = cur.fetchall()
+            print(f"\nSAMPLE RESULTS:")
+            for date_id, model, station, yield_pct in sample_results:
+                print(f"  {date_id} {model} {station}: {yield_pct:.1f}%")
+
+def run(conn, all_dates=False):
+    """Entry point for the aggregation worker: the touched weeks (or all dates) on a borrowed connection"""
+    ensure_rollup(conn)
+    if all_dates:
+        aggregate_daily_tpy_metrics_all_time(conn)
+    else:
+        aggregate_daily_tpy_metrics_incremental(conn)
+
+def main():
+    parser = argparse.ArgumentParser(description="Aggregate daily_tpy_metrics (all dates by default)")
+    parser.add_argument('--incremental', action='store_true', help='Only the weeks with new workstation data')
+    parser.add_argument('--date', type=lambda value: datetime.strptime(value, '%Y-%m-%d').date(),
+                        help='Recompute one date (YYYY-MM-DD) with the detailed starters/FPY report')
+    args = parser.parse_args()
     conn = psycopg2.connect(**DATABASE)
     try:
-        with conn.cursor() as cur:
-            cur.execute("SELECT COUNT(*) FROM daily_tpy_metrics")
-            total_records = cur.fetchone()[0]
-            print(f"Total records in daily_tpy_metrics: {total_records}")
-            
-            if total_records > 0:
-                cur.execute("""
-                    SELECT date_id, model, workstation_name, throughput_yield 
-                    FROM daily_tpy_metrics 
-                    ORDER BY date_id DESC, throughput_yield DESC 
-                    LIMIT 5;
-                """)
-                sample_results = cur.fetchall()
-                print(f"\nSAMPLE RESULTS:")
-                for date_id, model, station, yield_pct in sample_results:
-                    print(f"  {date_id} {model} {station}: {yield_pct:.1f}%")
+        if args.date:
+            ensure_rollup(conn)
+            aggregate_daily_tpy_for_date(conn, args.date)
+        else:
+            run(conn, all_dates=not args.incremental)
     finally:
         conn.close()
 
 if __name__ == "__main__":
-    aggregate_daily_tpy_metrics_all_time() 
\ No newline at end of file
+    main() 
\ No newline at end of file
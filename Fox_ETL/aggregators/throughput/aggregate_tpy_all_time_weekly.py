@@ -2,7 +2,6 @@
 import psycopg2
 import json
 from datetime import datetime, timedelta
-import argparse
 import sys
 import os
 # Add Fox_ETL directory to path to find config.py
@@ -14,6 +13,7 @@ while current_dir != '/':
         break
     current_dir = os.path.dirname(current_dir)
 from config import DATABASE
+from ingest.workstation_rollup import ensure_rollup
 
 def get_week_bounds(target_date):
     """Get the Monday (start) and Sunday (end) of the week containing target_date"""
@@ -40,123 +40,115 @@ def get_week_date_range(week_id):
     
     return week_start.date(), week_end.date()
 
-def calculate_weekly_first_pass_yield_from_raw(week_start, week_end):
+def calculate_weekly_first_pass_yield_from_raw(conn, week_start, week_end):
     """Calculate WEEKLY first pass yield using raw data"""
-    conn = psycopg2.connect(**DATABASE)
-    try:
-        with conn.cursor() as cur:
-            cur.execute("""
-                WITH part_analysis AS (
-                    SELECT 
-                        sn,
-                        model,
-                        COUNT(CASE WHEN workstation_name = 'PACKING' THEN 1 END) as reached_packing,
-                        COUNT(CASE WHEN history_station_passing_status != 'Pass' THEN 1 END) as failure_count
-                    FROM workstation_master_log
-                    WHERE history_station_end_time >= %s 
-                        AND history_station_end_time < %s
-                        AND service_flow NOT IN ('NC Sort', 'RO')
-                        AND service_flow IS NOT NULL
-                    GROUP BY sn, model
-                )
-                SELECT 
-                    COUNT(*) as parts_started,
-                    COUNT(CASE WHEN reached_packing > 0 AND failure_count = 0 THEN 1 END) as first_pass_success,
-                    COUNT(CASE WHEN reached_packing > 0 THEN 1 END) as parts_completed,
-                    COUNT(CASE WHEN failure_count > 0 THEN 1 END) as parts_failed,
-                    COUNT(CASE WHEN reached_packing = 0 AND failure_count = 0 THEN 1 END) as parts_stuck_in_limbo
-                FROM part_analysis;
-            """, (week_start, week_end + timedelta(days=1)))
-            
-            result = cur.fetchone()
-            if result and result[0] > 0:
-                parts_started, first_pass_success, parts_completed, parts_failed, parts_stuck = result
-                traditional_fpy = (first_pass_success / parts_started * 100) if parts_started > 0 else 0
-                active_parts = parts_completed + parts_failed
-                completed_only_fpy = (first_pass_success / active_parts * 100) if active_parts > 0 else 0
-                
-                return {
-                    "traditional": {
-                        "partsStarted": parts_started,
-                        "firstPassSuccess": first_pass_success,
-                        "firstPassYield": round(traditional_fpy, 2)
-                    },
-                    "completedOnly": {
-                        "activeParts": active_parts,
-                        "firstPassSuccess": first_pass_success,
-                        "firstPassYield": round(completed_only_fpy, 2)
-                    },
-                    "breakdown": {
-                        "partsCompleted": parts_completed,
-                        "partsFailed": parts_failed,
-                        "partsStuckInLimbo": parts_stuck,
-                        "totalParts": parts_started
-                    }
-                }
-            else:
-                return {
-                    "traditional": {"partsStarted": 0, "firstPassSuccess": 0, "firstPassYield": 0},
-                    "completedOnly": {"activeParts": 0, "firstPassSuccess": 0, "firstPassYield": 0},
-                    "breakdown": {"partsCompleted": 0, "partsFailed": 0, "partsStuckInLimbo": 0, "totalParts": 0}
-                }
-    finally:
-        conn.close()
-
-def calculate_model_specific_throughput_yields(week_start, week_end):
-    """Calculate MODEL-SPECIFIC throughput yields from raw data"""
-    conn = psycopg2.connect(**DATABASE)
-    try:
-        with conn.cursor() as cur:
-            cur.execute("""
+    with conn.cursor() as cur:
+        cur.execute("""
+            WITH part_analysis AS (
                 SELECT 
+                    sn,
                     model,
-                    workstation_name,
-                    COUNT(*) as total_parts,
-                    COUNT(CASE WHEN history_station_passing_status = 'Pass' THEN 1 END) as passed_parts,
-                    COUNT(CASE WHEN history_station_passing_status != 'Pass' THEN 1 END) as failed_parts
-                FROM workstation_master_log 
+                    COUNT(CASE WHEN workstation_name = 'PACKING' THEN 1 END) as reached_packing,
+                    COUNT(CASE WHEN history_station_passing_status != 'Pass' THEN 1 END) as failure_count
+                FROM workstation_master_log
                 WHERE history_station_end_time >= %s 
                     AND history_station_end_time < %s
                     AND service_flow NOT IN ('NC Sort', 'RO')
                     AND service_flow IS NOT NULL
-                    AND (model IN ('Tesla SXM4', 'Tesla SXM5') OR model = 'SXM6')
-                GROUP BY model, workstation_name
-                HAVING COUNT(*) >= 1
-                ORDER BY model, total_parts DESC;
-            """, (week_start, week_end + timedelta(days=1)))
-            
-            results = cur.fetchall()
-            model_specific_yields = {"overall": {}}
+                GROUP BY sn, model
+            )
+            SELECT 
+                COUNT(*) as parts_started,
+                COUNT(CASE WHEN reached_packing > 0 AND failure_count = 0 THEN 1 END) as first_pass_success,
+                COUNT(CASE WHEN reached_packing > 0 THEN 1 END) as parts_completed,
+                COUNT(CASE WHEN failure_count > 0 THEN 1 END) as parts_failed,
+                COUNT(CASE WHEN reached_packing = 0 AND failure_count = 0 THEN 1 END) as parts_stuck_in_limbo
+            FROM part_analysis;
+        """, (week_start, week_end + timedelta(days=1)))
+        
+        result = cur.fetchone()
+        if result and result[0] > 0:
+            parts_started, first_pass_success, parts_completed, parts_failed, parts_stuck = result
+            traditional_fpy = (first_pass_success / parts_started * 100) if parts_started > 0 else 0
+            active_parts = parts_completed + parts_failed
+            completed_only_fpy = (first_pass_success / active_parts * 100) if active_parts > 0 else 0
             
-            for model, station, total, passed, failed in results:
-                throughput_yield = (passed / total * 100) if total > 0 else 0
-                
-                if model not in model_specific_yields:
-                    model_specific_yields[model] = {}
-                
-                model_specific_yields[model][station] = {
-                    "totalParts": total,
-                    "passedParts": passed,
-                    "failedParts": failed,
-                    "throughputYield": round(throughput_yield, 2)
+            return {
+                "traditional": {
+                    "partsStarted": parts_started,
+                    "firstPassSuccess": first_pass_success,
+                    "firstPassYield": round(traditional_fpy, 2)
+                },
+                "completedOnly": {
+                    "activeParts": active_parts,
+                    "firstPassSuccess": first_pass_success,
+                    "firstPassYield": round(completed_only_fpy, 2)
+                },
+                "breakdown": {
+                    "partsCompleted": parts_completed,
+                    "partsFailed": parts_failed,
+                    "partsStuckInLimbo": parts_stuck,
+                    "totalParts": parts_started
                 }
-                
-                if station not in model_specific_yields["overall"]:
-                    model_specific_yields["overall"][station] = {"totalParts": 0, "passedParts": 0, "failedParts": 0}
-                
-                model_specific_yields["overall"][station]["totalParts"] += total
-                model_specific_yields["overall"][station]["passedParts"] += passed
-                model_specific_yields["overall"][station]["failedParts"] += failed
+            }
+        else:
+            return {
+                "traditional": {"partsStarted": 0, "firstPassSuccess": 0, "firstPassYield": 0},
+                "completedOnly": {"activeParts": 0, "firstPassSuccess": 0, "firstPassYield": 0},
+                "breakdown": {"partsCompleted": 0, "partsFailed": 0, "partsStuckInLimbo": 0, "totalParts": 0}
+            }
+
+def calculate_model_specific_throughput_yields(conn, week_start, week_end):
+    """Calculate MODEL-SPECIFIC throughput yields from the hourly workstation rollup"""
+    with conn.cursor() as cur:
+        cur.execute("""
+            SELECT 
+                model,
+                workstation_name,
+                SUM(part_count) as total_parts,
+                SUM(CASE WHEN passing_status = 'Pass' THEN part_count ELSE 0 END) as passed_parts,
+                SUM(CASE WHEN passing_status != 'Pass' THEN part_count ELSE 0 END) as failed_parts
+            FROM workstation_rollup_hourly 
+            WHERE date >= %s 
+                AND date < %s
+                AND service_flow NOT IN ('NC Sort', 'RO')
+                AND service_flow IS NOT NULL
+                AND (model IN ('Tesla SXM4', 'Tesla SXM5') OR model = 'SXM6')
+            GROUP BY model, workstation_name
+            HAVING SUM(part_count) >= 1
+            ORDER BY model, total_parts DESC;
+        """, (week_start, week_end + timedelta(days=1)))
+        
+        results = cur.fetchall()
+        model_specific_yields = {"overall": {}}
+        
+        for model, station, total, passed, failed in results:
+            throughput_yield = (passed / total * 100) if total > 0 else 0
             
-            for station in model_specific_yields["overall"]:
-                total = model_specific_yields["overall"][station]["totalParts"]
-                passed = model_specific_yields["overall"][station]["passedParts"]
-                throughput_yield = (passed / total * 100) if total > 0 else 0
-                model_specific_yields["overall"][station]["throughputYield"] = round(throughput_yield, 2)
+            if model not in model_specific_yields:
+                model_specific_yields[model] = {}
             
-            return model_specific_yields
-    finally:
-        conn.close()
+            model_specific_yields[model][station] = {
+                "totalParts": total,
+                "passedParts": passed,
+                "failedParts": failed,
+                "throughputYield": round(throughput_yield, 2)
+            }
+            
+            if station not in model_specific_yields["overall"]:
+                model_specific_yields["overall"][station] = {"totalParts": 0, "passedParts": 0, "failedParts": 0}
+            
+            model_specific_yields["overall"][station]["totalParts"] += total
+            model_specific_yields["overall"][station]["passedParts"] += passed
+            model_specific_yields["overall"][station]["failedParts"] += failed
+        
+        for station in model_specific_yields["overall"]:
+            total = model_specific_yields["overall"][station]["totalParts"]
+            passed = model_specific_yields["overall"][station]["passedParts"]
+            throughput_yield = (passed / total * 100) if total > 0 else 0
+            model_specific_yields["overall"][station]["throughputYield"] = round(throughput_yield, 2)
+        
+        return model_specific_yields
 
 def calculate_hardcoded_tpy(model_yields):
     """Calculate hardcoded 4-station TPY"""
@@ -231,192 +223,183 @@ def calculate_dynamic_tpy(model_yields):
     
     return dynamic_tpy
 
-def aggregate_weekly_tpy_for_week(week_id):
+def aggregate_weekly_tpy_for_week(conn, week_id):
     """Aggregate weekly TPY metrics for a specific week"""
     print(f"\nAGGREGATING WEEKLY TPY FOR: {week_id}")
     print("=" * 60)
     
     week_start, week_end = get_week_date_range(week_id)
     
-    weekly_first_pass_yield = calculate_weekly_first_pass_yield_from_raw(week_start, week_end)
+    weekly_first_pass_yield = calculate_weekly_first_pass_yield_from_raw(conn, week_start, week_end)
     
-    model_specific_yields = calculate_model_specific_throughput_yields(week_start, week_end)
+    model_specific_yields = calculate_model_specific_throughput_yields(conn, week_start, week_end)
     
     hardcoded_tpy = calculate_hardcoded_tpy(model_specific_yields)
     
     dynamic_tpy = calculate_dynamic_tpy(model_specific_yields)
     
-    conn = psycopg2.connect(**DATABASE)
-    try:
-        with conn.cursor() as cur:
-            cur.execute("""
-                SELECT 
-                    SUM(total_parts) as total_parts,
-                    SUM(passed_parts) as passed_parts
-                FROM daily_tpy_metrics 
-                WHERE date_id >= %s AND date_id <= %s
-            """, (week_start, week_end))
-            
-            daily_result = cur.fetchone()
-            total_parts_overall = daily_result[0] if daily_result[0] else 0
-            total_passed_parts = daily_result[1] if daily_result[1] else 0
-            overall_yield = (total_passed_parts / total_parts_overall * 100) if total_parts_overall > 0 else 0
-            
-            weekly_station_metrics = model_specific_yields["overall"]
-            avg_throughput_yield = round(sum(s["throughputYield"] for s in weekly_station_metrics.values()) / len(weekly_station_metrics), 2) if weekly_station_metrics else 0
-            
-            best_station = None
-            worst_station = None
-            if weekly_station_metrics:
-                best_station = max(weekly_station_metrics.items(), key=lambda x: x[1]["throughputYield"])
-                worst_station = min(weekly_station_metrics.items(), key=lambda x: x[1]["throughputYield"])
-            
-            # Insert main weekly metrics
-            cur.execute("""
-                INSERT INTO weekly_tpy_metrics (
-                    week_id, week_start, week_end, days_in_week,
-                    weekly_first_pass_yield_traditional_parts_started,
-                    weekly_first_pass_yield_traditional_first_pass_success,
-                    weekly_first_pass_yield_traditional_first_pass_yield,
-                    weekly_first_pass_yield_completed_only_active_parts,
-                    weekly_first_pass_yield_completed_only_first_pass_success,
-                    weekly_first_pass_yield_completed_only_first_pass_yield,
-                    weekly_first_pass_yield_breakdown_parts_completed,
-                    weekly_first_pass_yield_breakdown_parts_failed,
-                    weekly_first_pass_yield_breakdown_parts_stuck_in_limbo,
-                    weekly_first_pass_yield_breakdown_total_parts,
-                    weekly_overall_yield_total_parts,
-                    weekly_overall_yield_completed_parts,
-                    weekly_overall_yield_overall_yield,
-                    weekly_throughput_yield_station_metrics,
-                    weekly_throughput_yield_average_yield,
-                    total_stations,
-                    best_station_name,
-                    best_station_yield,
-                    worst_station_name,
-                    worst_station_yield
-                ) VALUES (
-                    %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
-                ) ON CONFLICT (week_id) DO UPDATE SET
-                    week_start = EXCLUDED.week_start,
-                    week_end = EXCLUDED.week_end,
-                    days_in_week = EXCLUDED.days_in_week,
-                    weekly_first_pass_yield_traditional_parts_started = EXCLUDED.weekly_first_pass_yield_traditional_parts_started,
-                    weekly_first_pass_yield_traditional_first_pass_success = EXCLUDED.weekly_first_pass_yield_traditional_first_pass_success,
-                    weekly_first_pass_yield_traditional_first_pass_yield = EXCLUDED.weekly_first_pass_yield_traditional_first_pass_yield,
-                    weekly_first_pass_yield_completed_only_active_parts = EXCLUDED.weekly_first_pass_yield_completed_only_active_parts,
-                    weekly_first_pass_yield_completed_only_first_pass_success = EXCLUDED.weekly_first_pass_yield_completed_only_first_pass_success,
-                    weekly_first_pass_yield_completed_only_first_pass_yield = EXCLUDED.weekly_first_pass_yield_completed_only_first_pass_yield,
-                    weekly_first_pass_yield_breakdown_parts_completed = EXCLUDED.weekly_first_pass_yield_breakdown_parts_completed,
-                    weekly_first_pass_yield_breakdown_parts_failed = EXCLUDED.weekly_first_pass_yield_breakdown_parts_failed,
-                    weekly_first_pass_yield_breakdown_parts_stuck_in_limbo = EXCLUDED.weekly_first_pass_yield_breakdown_parts_stuck_in_limbo,
-                    weekly_first_pass_yield_breakdown_total_parts = EXCLUDED.weekly_first_pass_yield_breakdown_total_parts,
-                    weekly_overall_yield_total_parts = EXCLUDED.weekly_overall_yield_total_parts,
-                    weekly_overall_yield_completed_parts = EXCLUDED.weekly_overall_yield_completed_parts,
-                    weekly_overall_yield_overall_yield = EXCLUDED.weekly_overall_yield_overall_yield,
-                    weekly_throughput_yield_station_metrics = EXCLUDED.weekly_throughput_yield_station_metrics,
-                    weekly_throughput_yield_average_yield = EXCLUDED.weekly_throughput_yield_average_yield,
-                    total_stations = EXCLUDED.total_stations,
-                    best_station_name = EXCLUDED.best_station_name,
-                    best_station_yield = EXCLUDED.best_station_yield,
-                    worst_station_name = EXCLUDED.worst_station_name,
-                    worst_station_yield = EXCLUDED.worst_station_yield;
-            """, (
-                week_id, week_start, week_end, 7,  # days_in_week = 7
-                weekly_first_pass_yield["traditional"]["partsStarted"],
-                weekly_first_pass_yield["traditional"]["firstPassSuccess"],
-                weekly_first_pass_yield["traditional"]["firstPassYield"],
-                weekly_first_pass_yield["completedOnly"]["activeParts"],
-                weekly_first_pass_yield["completedOnly"]["firstPassSuccess"],
-                weekly_first_pass_yield["completedOnly"]["firstPassYield"],
-                weekly_first_pass_yield["breakdown"]["partsCompleted"],
-                weekly_first_pass_yield["breakdown"]["partsFailed"],
-                weekly_first_pass_yield["breakdown"]["partsStuckInLimbo"],
-                weekly_first_pass_yield["breakdown"]["totalParts"],
-                total_parts_overall,
-                total_passed_parts,
-                round(overall_yield, 2),
-                json.dumps(weekly_station_metrics),
-                avg_throughput_yield,
-                len(weekly_station_metrics),
-                best_station[0] if best_station else None,
-                best_station[1]["throughputYield"] if best_station else None,
-                worst_station[0] if worst_station else None,
-                worst_station[1]["throughputYield"] if worst_station else None
-            ))
+    with conn.cursor() as cur:
+        cur.execute("""
+            SELECT 
+                SUM(total_parts) as total_parts,
+                SUM(passed_parts) as passed_parts
+            FROM daily_tpy_metrics 
+            WHERE date_id >= %s AND date_id <= %s
+        """, (week_start, week_end))
+        
+        daily_result = cur.fetchone()
+        total_parts_overall = daily_result[0] if daily_result[0] else 0
+        total_passed_parts = daily_result[1] if daily_result[1] else 0
+        overall_yield = (total_passed_parts / total_parts_overall * 100) if total_parts_overall > 0 else 0
+        
+        weekly_station_metrics = model_specific_yields["overall"]
+        avg_throughput_yield = round(sum(s["throughputYield"] for s in weekly_station_metrics.values()) / len(weekly_station_metrics), 2) if weekly_station_metrics else 0
+        
+        best_station = None
+        worst_station = None
+        if weekly_station_metrics:
+            best_station = max(weekly_station_metrics.items(), key=lambda x: x[1]["throughputYield"])
+            worst_station = min(weekly_station_metrics.items(), key=lambda x: x[1]["throughputYield"])
+        
+        # Insert main weekly metrics
+        cur.execute("""
+            INSERT INTO weekly_tpy_metrics (
+                week_id, week_start, week_end, days_in_week,
+                weekly_first_pass_yield_traditional_parts_started,
+                weekly_first_pass_yield_traditional_first_pass_success,
+                weekly_first_pass_yield_traditional_first_pass_yield,
+                weekly_first_pass_yield_completed_only_active_parts,
+                weekly_first_pass_yield_completed_only_first_pass_success,
+                weekly_first_pass_yield_completed_only_first_pass_yield,
+                weekly_first_pass_yield_breakdown_parts_completed,
+                weekly_first_pass_yield_breakdown_parts_failed,
+                weekly_first_pass_yield_breakdown_parts_stuck_in_limbo,
+                weekly_first_pass_yield_breakdown_total_parts,
+                weekly_overall_yield_total_parts,
+                weekly_overall_yield_completed_parts,
+                weekly_overall_yield_overall_yield,
+                weekly_throughput_yield_station_metrics,
+                weekly_throughput_yield_average_yield,
+                total_stations,
+                best_station_name,
+                best_station_yield,
+                worst_station_name,
+                worst_station_yield
+            ) VALUES (
+                %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
+            ) ON CONFLICT (week_id) DO UPDATE SET
+                week_start = EXCLUDED.week_start,
+                week_end = EXCLUDED.week_end,
+                days_in_week = EXCLUDED.days_in_week,
+                weekly_first_pass_yield_traditional_parts_started = EXCLUDED.weekly_first_pass_yield_traditional_parts_started,
+                weekly_first_pass_yield_traditional_first_pass_success = EXCLUDED.weekly_first_pass_yield_traditional_first_pass_success,
+                weekly_first_pass_yield_traditional_first_pass_yield = EXCLUDED.weekly_first_pass_yield_traditional_first_pass_yield,
+                weekly_first_pass_yield_completed_only_active_parts = EXCLUDED.weekly_first_pass_yield_completed_only_active_parts,
+                weekly_first_pass_yield_completed_only_first_pass_success = EXCLUDED.weekly_first_pass_yield_completed_only_first_pass_success,
+                weekly_first_pass_yield_completed_only_first_pass_yield = EXCLUDED.weekly_first_pass_yield_completed_only_first_pass_yield,
+                weekly_first_pass_yield_breakdown_parts_completed = EXCLUDED.weekly_first_pass_yield_breakdown_parts_completed,
+                weekly_first_pass_yield_breakdown_parts_failed = EXCLUDED.weekly_first_pass_yield_breakdown_parts_failed,
+                weekly_first_pass_yield_breakdown_parts_stuck_in_limbo = EXCLUDED.weekly_first_pass_yield_breakdown_parts_stuck_in_limbo,
+                weekly_first_pass_yield_breakdown_total_parts = EXCLUDED.weekly_first_pass_yield_breakdown_total_parts,
+                weekly_overall_yield_total_parts = EXCLUDED.weekly_overall_yield_total_parts,
+                weekly_overall_yield_completed_parts = EXCLUDED.weekly_overall_yield_completed_parts,
+                weekly_overall_yield_overall_yield = EXCLUDED.weekly_overall_yield_overall_yield,
+                weekly_throughput_yield_station_metrics = EXCLUDED.weekly_throughput_yield_station_metrics,
+                weekly_throughput_yield_average_yield = EXCLUDED.weekly_throughput_yield_average_yield,
+                total_stations = EXCLUDED.total_stations,
+                best_station_name = EXCLUDED.best_station_name,
+                best_station_yield = EXCLUDED.best_station_yield,
+                worst_station_name = EXCLUDED.worst_station_name,
+                worst_station_yield = EXCLUDED.worst_station_yield;
+        """, (
+            week_id, week_start, week_end, 7,  # days_in_week = 7
+            weekly_first_pass_yield["traditional"]["partsStarted"],
+            weekly_first_pass_yield["traditional"]["firstPassSuccess"],
+            weekly_first_pass_yield["traditional"]["firstPassYield"],
+            weekly_first_pass_yield["completedOnly"]["activeParts"],
+            weekly_first_pass_yield["completedOnly"]["firstPassSuccess"],
+            weekly_first_pass_yield["completedOnly"]["firstPassYield"],
+            weekly_first_pass_yield["breakdown"]["partsCompleted"],
+            weekly_first_pass_yield["breakdown"]["partsFailed"],
+            weekly_first_pass_yield["breakdown"]["partsStuckInLimbo"],
+            weekly_first_pass_yield["breakdown"]["totalParts"],
+            total_parts_overall,
+            total_passed_parts,
+            round(overall_yield, 2),
+            json.dumps(weekly_station_metrics),
+            avg_throughput_yield,
+            len(weekly_station_metrics),
+            best_station[0] if best_station else None,
+            best_station[1]["throughputYield"] if best_station else None,
+            worst_station[0] if worst_station else None,
+            worst_station[1]["throughputYield"] if worst_station else None
+        ))
 
-            # Insert model-specific metrics
-            for model_name, model_data in hardcoded_tpy.items():
-                if model_data["stations"]:  # Only insert if we have data for this model
-                    cur.execute("""
-                        INSERT INTO weekly_tpy_model_metrics (
-                            week_id,
-                            model,
-                            hardcoded_stations,
-                            hardcoded_tpy,
-                            dynamic_stations,
-                            dynamic_tpy,
-                            dynamic_station_count
-                        ) VALUES (%s, %s, %s, %s, %s, %s, %s)
-                        ON CONFLICT (week_id, model) DO UPDATE SET
-                            hardcoded_stations = EXCLUDED.hardcoded_stations,
-                            hardcoded_tpy = EXCLUDED.hardcoded_tpy,
-                            dynamic_stations = EXCLUDED.dynamic_stations,
-                            dynamic_tpy = EXCLUDED.dynamic_tpy,
-                            dynamic_station_count = EXCLUDED.dynamic_station_count;
-                    """, (
+        # Insert model-specific metrics
+        for model_name, model_data in hardcoded_tpy.items():
+            if model_data["stations"]:  # Only insert if we have data for this model
+                cur.execute("""
+                    INSERT INTO weekly_tpy_model_metrics (
                         week_id,
-                        f"Tesla {model_name}" if model_name != "SXM6" else "SXM6",
-                        json.dumps(model_data["stations"]),
-                        model_data["tpy"],
-                        json.dumps(dynamic_tpy[model_name]["stations"]),
-                        dynamic_tpy[model_name]["tpy"],
-                        dynamic_tpy[model_name]["stationCount"]
-                    ))
+                        model,
+                        hardcoded_stations,
+                        hardcoded_tpy,
+                        dynamic_stations,
+                        dynamic_tpy,
+                        dynamic_station_count
+                    ) VALUES (%s, %s, %s, %s, %s, %s, %s)
+                    ON CONFLICT (week_id, model) DO UPDATE SET
+                        hardcoded_stations = EXCLUDED.hardcoded_stations,
+                        hardcoded_tpy = EXCLUDED.hardcoded_tpy,
+                        dynamic_stations = EXCLUDED.dynamic_stations,
+                        dynamic_tpy = EXCLUDED.dynamic_tpy,
+                        dynamic_station_count = EXCLUDED.dynamic_station_count;
+                """, (
+                    week_id,
+                    f"Tesla {model_name}" if model_name != "SXM6" else "SXM6",
+                    json.dumps(model_data["stations"]),
+                    model_data["tpy"],
+                    json.dumps(dynamic_tpy[model_name]["stations"]),
+                    dynamic_tpy[model_name]["tpy"],
+                    dynamic_tpy[model_name]["stationCount"]
+                ))
 
-            conn.commit()
-            print(f"\nWeekly TPY aggregation complete for {week_id}!")
-            
-    finally:
-        conn.close()
+        conn.commit()
+        print(f"\nWeekly TPY aggregation complete for {week_id}!")
+        
 
-def get_all_available_weeks():
+def get_all_available_weeks(conn):
     """Get all unique weeks when actual testing occurred"""
     print("Finding all weeks with test activity...")
     
-    conn = psycopg2.connect(**DATABASE)
-    try:
-        with conn.cursor() as cur:
-            cur.execute("""
-                SELECT DISTINCT DATE(history_station_end_time) as test_date
-                FROM workstation_master_log
-                WHERE history_station_end_time IS NOT NULL
-                    AND service_flow NOT IN ('NC Sort', 'RO')
-                    AND service_flow IS NOT NULL
-                ORDER BY test_date;
-            """)
-            
-            dates = [row[0] for row in cur.fetchall()]
-            if not dates:
-                return []
-            
-            weeks = set()
-            for date in dates:
-                weeks.add(get_week_id(date))
-            
-            weeks = sorted(list(weeks))
-            print(f"  Found {len(weeks)} weeks with test activity from {weeks[0]} to {weeks[-1]}")
-            return weeks
-    finally:
-        conn.close()
+    with conn.cursor() as cur:
+        cur.execute("""
+            SELECT DISTINCT date as test_date
+            FROM workstation_rollup_hourly
+            WHERE service_flow NOT IN ('NC Sort', 'RO')
+                AND service_flow IS NOT NULL
+            ORDER BY test_date;
+        """)
+        
+        dates = [row[0] for row in cur.fetchall()]
+        if not dates:
+            return []
+        
+        weeks = set()
+        for date in dates:
+            weeks.add(get_week_id(date))
+        
+        weeks = sorted(list(weeks))
+        print(f"  Found {len(weeks)} weeks with test activity from {weeks[0]} to {weeks[-1]}")
+        return weeks
 
-def aggregate_weekly_tpy_metrics_all_time():
+def aggregate_weekly_tpy_metrics_all_time(conn):
     """Aggregate weekly TPY metrics for all historical dates"""
     print("WEEKLY TPY METRICS ALL-TIME AGGREGATOR")
     print("=" * 50)
     
     # Get all available weeks
-    all_weeks = get_all_available_weeks()
+    all_weeks = get_all_available_weeks(conn)
     
     if not all_weeks:
         print("No valid weeks found in the dataset")
@@ -432,16 +415,29 @@ def aggregate_weekly_tpy_metrics_all_time():
             print(f"\nProcessing {i}/{len(all_weeks)}: {week_id}")
             print("-" * 50)
             
-            aggregate_weekly_tpy_for_week(week_id)
+            aggregate_weekly_tpy_for_week(conn, week_id)
             success_count += 1
             
         except Exception as e:
             print(f"ERROR processing {week_id}: {str(e)}")
+            conn.rollback()
             error_count += 1
     
     print(f"\nWEEKLY TPY ALL-TIME AGGREGATION COMPLETE!")
     print(f"Successfully processed: {success_count} weeks")
     print(f"Errors: {error_count} weeks")
 
+def run(conn):
+    """Entry point for the aggregation worker: every week on a borrowed connection"""
+    ensure_rollup(conn)
+    aggregate_weekly_tpy_metrics_all_time(conn)
+
+def main():
+    conn = psycopg2.connect(**DATABASE)
+    try:
+        run(conn)
+    finally:
+        conn.close()
+
 if __name__ == "__main__":
-    aggregate_weekly_tpy_metrics_all_time()
\ No newline at end of file
+    main()
\ No newline at end of file
@@ -0,0 +1,166 @@
+"""
+Parallel historical backfill with a per-file checkpoint manifest.
+
+Worker processes parse report files and encode their rows as COPY payloads;
+the parent process is the single writer that stages each payload and inserts
+the new rows. Every file is recorded in backfill_manifest by content hash in
+the same transaction as its rows, so a re-run skips files that are already
+loaded (even if they were renamed or moved) and a crashed run resumes with
+the first file that was not committed.
+"""
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from ingest.bulk_copy import encode_text, copy_encoded
+from ingest.change_notify import notify_change
+from ingest.master_logs import MASTER_LOG_COLUMNS, create_stage, stage_table_name, insert_new_from_stage
+from ingest.report_cache import file_content_hash
+
+MANIFEST_TABLE = 'backfill_manifest'
+
+
+def default_workers():
+    return max(1, (os.cpu_count() or 2) - 1)
+
+
+def ensure_manifest(conn):
+    with conn.cursor() as cur:
+        cur.execute(f"""
+            CREATE TABLE IF NOT EXISTS {MANIFEST_TABLE} (
+                id SERIAL PRIMARY KEY,
+                table_name VARCHAR(100) NOT NULL,
+                content_hash CHAR(64) NOT NULL,
+                file_path TEXT NOT NULL,
+                row_count INTEGER,
+                inserted_count INTEGER,
+                status VARCHAR(20) NOT NULL,
+                error TEXT,
+                parse_seconds REAL,
+                write_seconds REAL,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                UNIQUE (table_name, content_hash)
+            )
+        """)
+    conn.commit()
+
+
+def loaded_hashes(conn, table):
+    with conn.cursor() as cur:
+        cur.execute(f"SELECT content_hash FROM {MANIFEST_TABLE} WHERE table_name = %s AND status = 'loaded'", (table,))
+        return {row[0] for row in cur.fetchall()}
+
+
+def record_manifest(conn, table, content_hash, file_path, status, row_count=None, inserted_count=None,
+                    error=None, parse_seconds=None, write_seconds=None):
+    with conn.cursor() as cur:
+        cur.execute(f"""
+            INSERT INTO {MANIFEST_TABLE}
+                (table_name, content_hash, file_path, row_count, inserted_count, status, error, parse_seconds, write_seconds)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+            ON CONFLICT (table_name, content_hash) DO UPDATE SET
+                file_path = EXCLUDED.file_path,
+                row_count = EXCLUDED.row_count,
+                inserted_count = EXCLUDED.inserted_count,
+                status = EXCLUDED.status,
+                error = EXCLUDED.error,
+                parse_seconds = EXCLUDED.parse_seconds,
+                write_seconds = EXCLUDED.write_seconds,
+                updated_at = CURRENT_TIMESTAMP
+        """, (table, content_hash, file_path, row_count, inserted_count, status, error, parse_seconds, write_seconds))
+
+
+def _parse_job(parse_file, file_path):
+    """Runs in a worker: parse one file and encode its rows for COPY."""
+    start = time.perf_counter()
+    rows = parse_file(file_path)
+    payload = encode_text(rows).getvalue()
+    return len(rows), payload, time.perf_counter() - start
+
+
+def _write_file(conn, table, columns, file_path, content_hash, row_count, payload, parse_seconds,
+                create, insert, log):
+    start = time.perf_counter()
+    create(conn)
+    copy_encoded(conn, stage_table_name(table), columns, payload, row_count, log=log)
+    inserted = insert(conn)
+    if inserted:
+        notify_change(conn, table, rows=inserted)
+    record_manifest(conn, table, content_hash, file_path, 'loaded', row_count, inserted,
+                    parse_seconds=round(parse_seconds, 3), write_seconds=round(time.perf_counter() - start, 3))
+    conn.commit()
+    return inserted
+
+
+def run_backfill(conn, table, files, parse_file, columns=None, workers=None, force=False, log=print,
+                 create=None, insert=None):
+    """
+    Load files into table, parsing them on `workers` processes.
+
+    parse_file(path) must be a picklable (module-level) function returning
+    row tuples in `columns` order (MASTER_LOG_COLUMNS[table] by default).
+    create(conn) makes the stage and insert(conn) moves it into table,
+    returning rows inserted; both default to the master log row_hash path.
+    Files whose content hash is already 'loaded' in the manifest are skipped
+    unless force is set. Returns a dict of totals.
+    """
+    columns = columns or MASTER_LOG_COLUMNS[table]
+    create = create or (lambda c: create_stage(c, table, columns))
+    insert = insert or (lambda c: insert_new_from_stage(c, table, columns))
+    workers = workers or default_workers()
+    ensure_manifest(conn)
+    totals = {'files': len(files), 'skipped': 0, 'loaded': 0, 'failed': 0, 'rows': 0, 'inserted': 0}
+    started = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        hashes = list(pool.map(file_content_hash, files, chunksize=16))
+        done_hashes = set() if force else loaded_hashes(conn, table)
+
+        todo = []
+        seen = set()
+        for file_path, content_hash in zip(files, hashes):
+            if content_hash in done_hashes or content_hash in seen:
+                totals['skipped'] += 1
+                continue
+            seen.add(content_hash)
+            todo.append((file_path, content_hash))
+        log(f"{table}: {len(files):,} files, {totals['skipped']:,} already loaded or duplicate, {len(todo):,} to load on {workers} workers")
+
+        # Keep a bounded number of parsed payloads in flight so memory stays flat
+        queue = iter(todo)
+        pending = {}
+
+        def fill():
+            while len(pending) < workers * 2:
+                job = next(queue, None)
+                if job is None:
+                    return
+                pending[pool.submit(_parse_job, parse_file, job[0])] = job
+
+        fill()
+        while pending:
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                file_path, content_hash = pending.pop(future)
+                done = totals['loaded'] + totals['failed'] + 1
+                try:
+                    row_count, payload, parse_seconds = future.result()
+                    inserted = _write_file(conn, table, columns, file_path, content_hash,
+                                           row_count, payload, parse_seconds, create, insert, log)
+                    totals['loaded'] += 1
+                    totals['rows'] += row_count
+                    totals['inserted'] += inserted
+                    log(f"[{done}/{len(todo)}] {os.path.basename(file_path)}: "
+                        f"{inserted:,} new of {row_count:,} rows (parse {parse_seconds:.1f}s)")
+                except Exception as e:
+                    conn.rollback()
+                    record_manifest(conn, table, content_hash, file_path, 'failed', error=str(e))
+                    conn.commit()
+                    totals['failed'] += 1
+                    log(f"[{done}/{len(todo)}] Error importing {os.path.basename(file_path)}: {e}")
+            fill()
+
+    elapsed = time.perf_counter() - started
+    log(f"{table}: loaded {totals['loaded']:,} files ({totals['inserted']:,} new of {totals['rows']:,} rows), "
+        f"skipped {totals['skipped']:,}, failed {totals['failed']:,} in {elapsed:.1f}s")
+    return totals
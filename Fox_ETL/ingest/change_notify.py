@@ -0,0 +1,167 @@
+"""
+Ingest change notifications (PostgreSQL LISTEN/NOTIFY).
+
+Loaders announce every batch that inserted rows on the ingest_changes
+channel, in the same transaction as the rows, so the notification is
+delivered exactly when (and only if) the batch commits:
+
+    {"table": "workstation_master_log", "from": "2024-05-01", "to": "2024-05-02",
+     "batch_id": 1234, "rows": 5120}
+
+from/to are the business dates the batch touched (null when unknown, e.g.
+backfill). The aggregator schedulers LISTEN through ChangeListener, which
+coalesces a burst of batches into one set of changes per table, so they run
+only the aggregators that read a changed table.
+"""
+import json
+import select
+import time
+from datetime import date
+
+import psycopg2
+
+CHANNEL = 'ingest_changes'
+
+
+# ---------------------------------------------------------------------------
+# Publishing (loaders)
+# ---------------------------------------------------------------------------
+def notify_change(conn, table, date_from=None, date_to=None, batch_id=None, rows=None):
+    """Queue a notification for table; PostgreSQL sends it when the transaction commits."""
+    payload = {
+        'table': table,
+        'from': date_from.isoformat() if date_from else None,
+        'to': date_to.isoformat() if date_to else None,
+        'batch_id': batch_id,
+        'rows': rows,
+    }
+    with conn.cursor() as cur:
+        cur.execute("SELECT pg_notify(%s, %s)", (CHANNEL, json.dumps(payload)))
+
+
+def notify_batch(conn, result):
+    """Announce a LoadResult that inserted rows. The caller commits."""
+    if not result.rows_inserted:
+        return
+    date_from, date_to = result.date_range or (None, None)
+    notify_change(conn, result.table, date_from, date_to, result.batch_id, result.rows_inserted)
+
+
+# ---------------------------------------------------------------------------
+# Listening (schedulers)
+# ---------------------------------------------------------------------------
+def merge_changes(changes, table, date_from, date_to):
+    """Widen changes[table] = (from, to) to cover the new range; None means unbounded."""
+    if table not in changes:
+        changes[table] = (date_from, date_to)
+        return
+    old_from, old_to = changes[table]
+    changes[table] = (
+        None if old_from is None or date_from is None else min(old_from, date_from),
+        None if old_to is None or date_to is None else max(old_to, date_to),
+    )
+
+
+def _parse_date(value):
+    return date.fromisoformat(value) if value else None
+
+
+class ChangeListener:
+    """
+    LISTEN on the ingest channel with a dedicated autocommit connection.
+
+    next_changes() blocks until a burst of notifications has settled (no new
+    one for quiet_seconds, or max_delay_seconds after the first) and returns
+    {table: (from, to)}, or None when fallback_seconds pass without any. If
+    the connection drops it is reopened, and the changes made while it was
+    down are covered by the fallback run.
+    """
+
+    def __init__(self, db_params, quiet_seconds=5.0, max_delay_seconds=30.0, fallback_seconds=900.0,
+                 channel=CHANNEL, log=print):
+        self.db_params = db_params
+        self.quiet_seconds = quiet_seconds
+        self.max_delay_seconds = max_delay_seconds
+        self.fallback_seconds = fallback_seconds
+        self.channel = channel
+        self.log = log
+        self._conn = None
+
+    @classmethod
+    def from_settings(cls, db_params, settings, log=print):
+        """Build from an AGGREGATOR-style config block (quiet_seconds, max_delay_seconds, fallback_seconds)."""
+        return cls(
+            db_params,
+            quiet_seconds=settings.get('quiet_seconds', 5.0),
+            max_delay_seconds=settings.get('max_delay_seconds', 30.0),
+            fallback_seconds=settings.get('fallback_seconds', 900.0),
+            log=log
+        )
+
+    def _connect(self):
+        if self._conn is not None and not self._conn.closed:
+            return self._conn
+        conn = psycopg2.connect(**self.db_params)
+        conn.autocommit = True
+        with conn.cursor() as cur:
+            cur.execute(f"LISTEN {self.channel}")
+        self._conn = conn
+        self.log(f"Listening for ingest notifications on {self.channel}")
+        return conn
+
+    def close(self):
+        if self._conn is not None and not self._conn.closed:
+            self._conn.close()
+        self._conn = None
+
+    def _poll(self, timeout):
+        """Notification payloads received within timeout seconds."""
+        try:
+            conn = self._connect()
+            if not conn.notifies and select.select([conn], [], [], max(timeout, 0)) == ([], [], []):
+                return []
+            conn.poll()
+        except (psycopg2.Error, OSError) as e:
+            self.log(f"Ingest listener connection lost ({e}), reconnecting")
+            self.close()
+            time.sleep(min(max(timeout, 0), 5))
+            return []
+        payloads = []
+        while conn.notifies:
+            notify = conn.notifies.pop(0)
+            try:
+                payloads.append(json.loads(notify.payload))
+            except ValueError:
+                self.log(f"Ignoring malformed notification: {notify.payload!r}")
+        return payloads
+
+    def next_changes(self):
+        deadline = time.monotonic() + self.fallback_seconds
+        changes = {}
+        first = last = None
+        while True:
+            now = time.monotonic()
+            if changes:
+                settle = min(last + self.quiet_seconds, first + self.max_delay_seconds)
+                if now >= settle:
+                    return changes
+                timeout = settle - now
+            else:
+                if now >= deadline:
+                    return None
+                timeout = deadline - now
+            for payload in self._poll(timeout):
+                table = payload.get('table')
+                if not table:
+                    continue
+                merge_changes(changes, table, _parse_date(payload.get('from')), _parse_date(payload.get('to')))
+                last = time.monotonic()
+                first = first or last
+
+
+def format_changes(changes):
+    parts = []
+    for table, (date_from, date_to) in sorted(changes.items()):
+        span = f"{date_from} to {date_to}" if date_from and date_to else 'all dates'
+        parts.append(f"{table} ({span})")
+    return ', '.join(parts)
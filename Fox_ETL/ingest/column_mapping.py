@@ -0,0 +1,115 @@
+"""
+Column-wise equivalents of the per-row mapping the loaders used to do inside
+df.iterrows(). Each helper returns a numpy object array holding exactly the
+Python values the old row-by-row code produced, so the rows written to the
+database are unchanged.
+"""
+import numpy as np
+import pandas as pd
+
+
+def _column(df, col):
+    if col in df.columns:
+        return df[col]
+    return None
+
+
+def str_column(df, col):
+    """str(row.get(col, '')) for every row."""
+    series = _column(df, col)
+    if series is None:
+        return np.full(len(df), '', dtype=object)
+    return series.map(str).to_numpy(dtype=object)
+
+
+def stripped_or_none_column(df, col):
+    """str(row.get(col, '')).strip() or None for every row."""
+    values = pd.Series(str_column(df, col), index=df.index, dtype=object).str.strip().to_numpy(dtype=object, copy=True)
+    values[values == ''] = None
+    return values
+
+
+def parse_datetime_series(series):
+    """pd.to_datetime over a whole column, parsing each value on its own like the scalar call did."""
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series
+    try:
+        return pd.to_datetime(series, format='mixed')
+    except (TypeError, ValueError):
+        # Older pandas without format='mixed', or a value the bulk parser rejects:
+        # fall back to the scalar parser so errors match the old behaviour.
+        return pd.to_datetime(series.map(pd.to_datetime))
+
+
+def datetime_column(df, col, null_to_none=True):
+    """
+    pd.to_datetime(row.get(col)).to_pydatetime() for every row.
+
+    With null_to_none, missing values become None (the loaders' `if pd.notna(...) else None`);
+    without it they stay NaT, as the unguarded scalar call returned.
+    """
+    series = _column(df, col)
+    if series is None:
+        series = pd.Series([None] * len(df), index=df.index, dtype=object)
+    parsed = parse_datetime_series(series)
+    values = np.array(parsed.dt.to_pydatetime(), dtype=object)
+    if null_to_none:
+        values[series.isna().to_numpy()] = None
+    return values
+
+
+def missing_mask(df, col):
+    """pd.isna(row.get(col)) for every row, on the raw (unparsed) values."""
+    series = _column(df, col)
+    if series is None:
+        return np.ones(len(df), dtype=bool)
+    return series.isna().to_numpy()
+
+
+def fill_missing(values, fallback, mask):
+    """Replace values[mask] with fallback[mask] in one masked assignment."""
+    values = values.copy()
+    values[mask] = fallback[mask]
+    return values
+
+
+def empty_to_none_column(df, col):
+    """convert_empty_string(row.get(col)): NaN and blank strings become None, other values pass through."""
+    series = _column(df, col)
+    if series is None:
+        return np.full(len(df), None, dtype=object)
+    values = series.astype(object).to_numpy(dtype=object, copy=True)
+    blank = series.isna().to_numpy().copy()
+    if pd.api.types.is_string_dtype(series.dtype):
+        blank |= series.str.strip().eq('').to_numpy(dtype=bool)
+    values[blank] = None
+    return values
+
+
+_TRUE_STRINGS = {'true', 't', 'yes', 'y', '1', 'x'}
+
+
+def bool_column(df, col):
+    """Flag column: missing/blank is False, strings like 'yes'/'true'/'1' are True, other values by truthiness."""
+    values = empty_to_none_column(df, col)
+    return np.array([
+        False if v is None else (v.strip().lower() in _TRUE_STRINGS if isinstance(v, str) else bool(v))
+        for v in values
+    ], dtype=object)
+
+
+def map_unique(values, func):
+    """func(v) for every non-None value, evaluated once per distinct value."""
+    codes, uniques = pd.factorize(pd.Series(values, dtype=object), use_na_sentinel=True)
+    mapped = np.array([func(v) for v in uniques] + [None], dtype=object)
+    # code -1 (None/NaN) picks the trailing None
+    return mapped[codes]
+
+
+def constant_column(df, value):
+    return np.full(len(df), value, dtype=object)
+
+
+def rows_from_columns(mapped, columns):
+    """Zip mapped column arrays into row tuples in the given column order."""
+    return list(zip(*(mapped[col] for col in columns)))
@@ -0,0 +1,317 @@
+"""
+Long-lived LibreOffice converter for report exports read_report cannot load.
+
+ConverterService keeps a pool of headless soffice processes, one per worker,
+each with its own user profile so they can run side by side. Jobs go on a
+queue and come back as futures, so a whole directory can be submitted at once
+and converted concurrently. A worker whose soffice dies or hangs past the
+timeout kills it, starts a fresh one and retries the job.
+
+Workers drive their soffice over UNO through ingest/soffice_bridge.py, run
+under a Python that has LibreOffice's `uno` module: this interpreter if it
+has one, otherwise LibreOffice's bundled Python or a system python3 with
+python3-uno (CONVERTER['uno_python'] names one explicitly). Without any,
+the service is degraded: every job starts its own `soffice --convert-to`
+process, and a warning says so when the service starts.
+"""
+import os
+import sys
+import json
+import queue
+import shutil
+import signal
+import subprocess
+import tempfile
+import threading
+import atexit
+from concurrent.futures import Future
+from pathlib import Path
+
+DEFAULT_WORKERS = 2
+DEFAULT_TIMEOUT = 120
+DEFAULT_RETRIES = 1
+STARTUP_TIMEOUT = 60
+BRIDGE_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'soffice_bridge.py')
+
+SOFFICE_CANDIDATES = [
+    r"C:\Program Files\LibreOffice\program\soffice.exe",
+    r"C:\Program Files (x86)\LibreOffice\program\soffice.exe",
+]
+
+
+def find_soffice():
+    for name in ('soffice', 'libreoffice'):
+        path = shutil.which(name)
+        if path:
+            return path
+    for path in SOFFICE_CANDIDATES:
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def _has_uno(python):
+    try:
+        return subprocess.run([python, '-c', 'import uno'], capture_output=True, timeout=30).returncode == 0
+    except (OSError, subprocess.TimeoutExpired):
+        return False
+
+
+def find_uno_python(soffice):
+    """A Python that can import uno: this one, LibreOffice's bundled one next to soffice, or python3; else None."""
+    program_dir = os.path.dirname(os.path.realpath(soffice))
+    candidates = [
+        sys.executable,
+        os.path.join(program_dir, 'python.exe'),
+        os.path.join(program_dir, 'python'),
+        shutil.which('python3'),
+    ]
+    for python in candidates:
+        if python and os.path.exists(python) and _has_uno(python):
+            return python
+    return None
+
+
+def xlsx_output_path(src, outdir=None):
+    outdir = outdir or os.path.dirname(os.path.abspath(src))
+    return os.path.join(outdir, Path(src).stem + '.xlsx')
+
+
+class ConversionError(RuntimeError):
+    pass
+
+
+class _SofficeWorker:
+    """
+    One soffice process with a private profile, driven through a
+    soffice_bridge.py process and restarted on failure. Without a uno_python
+    each job runs soffice --convert-to instead.
+    """
+
+    def __init__(self, index, soffice, uno_python, timeout, log):
+        self.index = index
+        self.soffice = soffice
+        self.uno_python = uno_python
+        self.timeout = timeout
+        self.log = log
+        self.profile_dir = tempfile.mkdtemp(prefix=f'fox_soffice_{index}_')
+        self.profile_url = Path(self.profile_dir).as_uri()
+        self.bridge = None
+        self.soffice_pid = None
+        self.restarts = 0
+
+    # -- process lifecycle -------------------------------------------------
+    def start(self):
+        if self.uno_python is None:
+            return
+        self.bridge = subprocess.Popen(
+            [self.uno_python, BRIDGE_SCRIPT, self.soffice, self.profile_url],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, bufsize=1
+        )
+        reply = self._read_reply(STARTUP_TIMEOUT)
+        if not reply.get('ready'):
+            self.kill()
+            raise ConversionError(f"soffice worker {self.index} failed to start: {reply.get('error')}")
+        self.soffice_pid = reply['pid']
+
+    def _read_reply(self, timeout):
+        # A hung soffice is broken by killing it and the bridge; readline then returns ''
+        watchdog = threading.Timer(timeout, self.kill)
+        watchdog.start()
+        try:
+            line = self.bridge.stdout.readline()
+        finally:
+            watchdog.cancel()
+        if not line:
+            raise ConversionError(f"soffice worker {self.index} exited or timed out after {timeout}s")
+        return json.loads(line)
+
+    def alive(self):
+        return self.bridge is not None and self.bridge.poll() is None
+
+    def kill(self):
+        bridge, self.bridge = self.bridge, None
+        pid, self.soffice_pid = self.soffice_pid, None
+        if pid is not None:
+            try:
+                os.kill(pid, getattr(signal, 'SIGKILL', signal.SIGTERM))
+            except OSError:
+                pass
+        if bridge is not None and bridge.poll() is None:
+            bridge.kill()
+            try:
+                bridge.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                pass
+
+    def restart(self):
+        if self.uno_python is None:
+            return
+        self.restarts += 1
+        self.log(f"Restarting soffice worker {self.index} (restart #{self.restarts})")
+        self.kill()
+        self.start()
+
+    def stop(self):
+        if self.alive():
+            try:
+                # The bridge terminates soffice when its stdin closes
+                self.bridge.stdin.close()
+                self.bridge.wait(timeout=30)
+            except (OSError, subprocess.TimeoutExpired):
+                pass
+        self.kill()
+        shutil.rmtree(self.profile_dir, ignore_errors=True)
+
+    # -- conversion --------------------------------------------------------
+    def convert(self, src, outdir):
+        dst = xlsx_output_path(src, outdir)
+        os.makedirs(os.path.dirname(dst), exist_ok=True)
+        if self.uno_python is None:
+            self._convert_cli(src, os.path.dirname(dst))
+        else:
+            if not self.alive():
+                self.restart()
+            self._convert_bridge(src, dst)
+        if not os.path.exists(dst):
+            raise ConversionError(f"soffice produced no output for {os.path.basename(src)}")
+        return dst
+
+    def _convert_bridge(self, src, dst):
+        self.bridge.stdin.write(json.dumps({'src': os.path.abspath(src), 'dst': os.path.abspath(dst)}) + '\n')
+        self.bridge.stdin.flush()
+        reply = self._read_reply(self.timeout)
+        if not reply.get('ok'):
+            raise ConversionError(reply.get('error') or f"soffice could not convert {os.path.basename(src)}")
+
+    def _convert_cli(self, src, outdir):
+        cmd = [
+            self.soffice, f'-env:UserInstallation={self.profile_url}',
+            '--headless', '--convert-to', 'xlsx', '--outdir', outdir, src
+        ]
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=self.timeout)
+        if result.returncode != 0:
+            raise ConversionError(f"LibreOffice conversion failed: {result.stderr.strip()}")
+
+
+class ConverterService:
+    """
+    Queue of XLS->XLSX conversions served by `workers` soffice processes.
+
+    submit()/submit_batch() return futures resolving to the .xlsx path;
+    convert() blocks and returns the path or None on failure.
+    """
+
+    def __init__(self, workers=DEFAULT_WORKERS, soffice=None, timeout=DEFAULT_TIMEOUT,
+                 retries=DEFAULT_RETRIES, uno_python=None, log=print):
+        self.soffice = soffice or find_soffice()
+        if not self.soffice:
+            raise ConversionError("LibreOffice not found! Please install LibreOffice.")
+        self.uno_python = uno_python or find_uno_python(self.soffice)
+        self.workers = max(1, int(workers))
+        self.timeout = timeout
+        self.retries = retries
+        self.log = log
+        self._jobs = queue.Queue()
+        self._threads = []
+        self._soffices = []
+        self._started = False
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._started:
+                return self
+            for index in range(self.workers):
+                worker = _SofficeWorker(index, self.soffice, self.uno_python, self.timeout, self.log)
+                thread = threading.Thread(target=self._run, args=(worker,), name=f'soffice-worker-{index}', daemon=True)
+                self._soffices.append(worker)
+                self._threads.append(thread)
+                thread.start()
+            self._started = True
+        if self.uno_python is not None:
+            self.log(f"Converter service started with {self.workers} persistent soffice worker(s) (UNO via {self.uno_python})")
+        else:
+            self.log(f"WARNING: converter service degraded - no Python with LibreOffice's uno module was found, "
+                     f"so every file starts its own soffice process. Install python3-uno or set "
+                     f"CONVERTER['uno_python'] to LibreOffice's bundled Python.")
+        return self
+
+    def _run(self, worker):
+        try:
+            worker.start()
+        except Exception as e:
+            self.log(f"soffice worker {worker.index} failed to start: {e}")
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                break
+            future, src, outdir = job
+            if not future.set_running_or_notify_cancel():
+                continue
+            for attempt in range(self.retries + 1):
+                try:
+                    future.set_result(worker.convert(src, outdir))
+                    break
+                except Exception as e:
+                    if attempt == self.retries:
+                        future.set_exception(e)
+                        break
+                    self.log(f"Converting {os.path.basename(src)} failed ({e}); retrying")
+                    try:
+                        worker.restart()
+                    except Exception as restart_error:
+                        self.log(f"soffice worker {worker.index} failed to restart: {restart_error}")
+        worker.stop()
+
+    def submit(self, src, outdir=None):
+        if not self._started:
+            self.start()
+        future = Future()
+        self._jobs.put((future, src, outdir))
+        return future
+
+    def submit_batch(self, jobs):
+        """Queue (src, outdir) pairs; returns {future: src}."""
+        return {self.submit(src, outdir): src for src, outdir in jobs}
+
+    def convert(self, src, outdir=None):
+        try:
+            return self.submit(src, outdir).result()
+        except Exception as e:
+            self.log(f"Error converting {os.path.basename(src)}: {e}")
+            return None
+
+    def queue_depth(self):
+        return self._jobs.qsize()
+
+    def stop(self):
+        with self._lock:
+            if not self._started:
+                return
+            for _ in self._threads:
+                self._jobs.put(None)
+            for thread in self._threads:
+                thread.join()
+            self._threads, self._soffices = [], []
+            self._started = False
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+_shared_service = None
+_shared_lock = threading.Lock()
+
+
+def get_converter(**kwargs):
+    """Process-wide ConverterService, started on first use and stopped at exit."""
+    global _shared_service
+    with _shared_lock:
+        if _shared_service is None:
+            _shared_service = ConverterService(**kwargs).start()
+            atexit.register(_shared_service.stop)
+        return _shared_service
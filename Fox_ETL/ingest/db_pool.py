@@ -0,0 +1,93 @@
+"""
+Shared psycopg2 connection pool for long-running processes (File_Monitor and
+the resident workers), so each file or job reuses a warm connection instead
+of opening a new one.
+"""
+import threading
+from contextlib import contextmanager
+
+from psycopg2.pool import ThreadedConnectionPool
+
+DEFAULT_MIN_CONNECTIONS = 1
+DEFAULT_MAX_CONNECTIONS = 4
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+class BlockingConnectionPool(ThreadedConnectionPool):
+    """
+    ThreadedConnectionPool whose getconn() waits for a connection to be
+    returned when all maxconn are in use, instead of raising PoolError.
+    """
+
+    def __init__(self, minconn, maxconn, *args, **kwargs):
+        super().__init__(minconn, maxconn, *args, **kwargs)
+        self._slots = threading.Semaphore(maxconn)
+
+    def getconn(self, key=None):
+        self._slots.acquire()
+        try:
+            return super().getconn(key)
+        except Exception:
+            self._slots.release()
+            raise
+
+    def putconn(self, conn=None, key=None, close=False):
+        super().putconn(conn, key, close)
+        self._slots.release()
+
+    def grow(self, maxconn):
+        """Raise maxconn (never lowers it), e.g. for a caller with more threads."""
+        with self._lock:
+            extra = maxconn - self.maxconn
+            if extra <= 0:
+                return
+            self.maxconn = maxconn
+        for _ in range(extra):
+            self._slots.release()
+
+
+def get_pool(minconn=DEFAULT_MIN_CONNECTIONS, maxconn=DEFAULT_MAX_CONNECTIONS):
+    """
+    Process-wide pool, created on first use. A later call asking for a
+    larger maxconn grows it, so every caller gets at least the connections it
+    sized for; callers beyond maxconn wait for a free connection.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None or _pool.closed:
+            from config import DATABASE
+            _pool = BlockingConnectionPool(minconn, max(minconn, maxconn), **DATABASE)
+        else:
+            _pool.grow(maxconn)
+        return _pool
+
+
+@contextmanager
+def pooled_connection(pool=None):
+    """
+    Borrow a connection for one unit of work. Anything left uncommitted is
+    rolled back before the connection goes back to the pool; a connection
+    that broke during the work is discarded instead of reused.
+    """
+    pool = pool or get_pool()
+    conn = pool.getconn()
+    try:
+        yield conn
+    finally:
+        broken = bool(conn.closed)
+        if not broken:
+            try:
+                conn.rollback()
+            except Exception:
+                broken = True
+        pool.putconn(conn, close=broken)
+
+
+def close_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None and not _pool.closed:
+            _pool.closeall()
+        _pool = None
@@ -0,0 +1,166 @@
+"""
+Dirty (table, business date) partitions for incremental aggregation.
+
+Every aggregator that reads a master log registers itself as a consumer of
+that table. When a loader commits a batch it marks, for every consumer of
+the table, the business dates (the spec's date_column) of the rows it
+inserted, in the same transaction as the rows; rows already present in
+the table mark nothing. An aggregator claims its dirty
+dates with claim_dirty_dates(): the claim deletes them, and the deletion
+commits together with the recomputed aggregates. A failed run therefore
+leaves them dirty, and a batch that commits while the aggregator runs marks
+its dates again for the next run.
+
+Late rows for an old date are thus picked up once they are loaded, and a
+run that nothing changed scans nothing. Note that File_Monitor's loads drop
+rows ending before the source's watermark minus its overlap
+(ingest/watermarks.py), so a row arriving later than that only reaches the
+master log, and its date the aggregates, through a backfill load, which
+marks the dates it inserts. A consumer's first claim (or a reset)
+recomputes the last bootstrap_days dates.
+
+    SELECT consumer, table_name, count(*), min(business_date) FROM dirty_partitions GROUP BY 1, 2;
+"""
+import threading
+from datetime import date, timedelta
+
+DIRTY_TABLE = 'dirty_partitions'
+CONSUMER_TABLE = 'dirty_partition_consumers'
+DEFAULT_BOOTSTRAP_DAYS = 7
+
+_ready = set()
+_lock = threading.Lock()
+
+
+def ensure_dirty_partitions(conn):
+    """Create the partition tables once per process. Commits, so call it before staging."""
+    key = conn.dsn
+    with _lock:
+        if key in _ready:
+            return
+        with conn.cursor() as cur:
+            cur.execute(f"""
+                CREATE TABLE IF NOT EXISTS {CONSUMER_TABLE} (
+                    consumer VARCHAR(100) NOT NULL,
+                    table_name VARCHAR(100) NOT NULL,
+                    registered_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    PRIMARY KEY (consumer, table_name)
+                )
+            """)
+            cur.execute(f"""
+                CREATE TABLE IF NOT EXISTS {DIRTY_TABLE} (
+                    consumer VARCHAR(100) NOT NULL,
+                    table_name VARCHAR(100) NOT NULL,
+                    business_date DATE NOT NULL,
+                    marked_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    PRIMARY KEY (consumer, table_name, business_date)
+                )
+            """)
+        conn.commit()
+        _ready.add(key)
+
+
+# ---------------------------------------------------------------------------
+# Loaders
+# ---------------------------------------------------------------------------
+def insert_counting_dates(cur, insert, column):
+    """
+    Run the INSERT ... SELECT insert, returning the rows inserted and the
+    sorted distinct business dates of column over those rows only (rows the
+    insert skipped as already present do not count).
+    """
+    cur.execute(f"""
+        WITH inserted AS ({insert} RETURNING {column})
+        SELECT {column}::timestamp::date, COUNT(*) FROM inserted GROUP BY 1
+    """)
+    counts = cur.fetchall()
+    return sum(count for _, count in counts), sorted(day for day, _ in counts if day is not None)
+
+
+def mark_dirty(conn, table, dates):
+    """Mark dates of table dirty for every consumer of table. Returns rows marked; the caller commits."""
+    if not dates:
+        return 0
+    with conn.cursor() as cur:
+        cur.execute(f"""
+            INSERT INTO {DIRTY_TABLE} (consumer, table_name, business_date)
+            SELECT c.consumer, c.table_name, d.business_date
+            FROM {CONSUMER_TABLE} c
+            CROSS JOIN unnest(%s::date[]) AS d(business_date)
+            WHERE c.table_name = %s
+            ON CONFLICT DO NOTHING
+        """, (list(dates), table))
+        return cur.rowcount
+
+
+# ---------------------------------------------------------------------------
+# Aggregators
+# ---------------------------------------------------------------------------
+def register_consumer(conn, consumer, table):
+    """
+    Register consumer of table. Returns True (and commits) if it was new:
+    nothing was marked for it before, so it must compute from scratch.
+    """
+    ensure_dirty_partitions(conn)
+    with conn.cursor() as cur:
+        cur.execute(f"""
+            INSERT INTO {CONSUMER_TABLE} (consumer, table_name) VALUES (%s, %s)
+            ON CONFLICT DO NOTHING
+        """, (consumer, table))
+        registered = cur.rowcount == 1
+    if registered:
+        # Loaders only mark dates for consumers they can see, so register before the first run
+        conn.commit()
+    return registered
+
+
+def claim_dirty_dates(conn, consumer, table, bootstrap_days=DEFAULT_BOOTSTRAP_DAYS):
+    """
+    Sorted dates of table that consumer must recompute. They are removed in
+    the caller's transaction, so commit together with the aggregates (or roll
+    back to keep them dirty). A new consumer is registered and gets the last
+    bootstrap_days dates up to today.
+    """
+    if register_consumer(conn, consumer, table):
+        today = date.today()
+        return [today - timedelta(days=n) for n in range(bootstrap_days - 1, -1, -1)]
+    with conn.cursor() as cur:
+        cur.execute(f"""
+            DELETE FROM {DIRTY_TABLE} WHERE consumer = %s AND table_name = %s
+            RETURNING business_date
+        """, (consumer, table))
+        return sorted(row[0] for row in cur.fetchall())
+
+
+def unregister_consumer(conn, consumer, table):
+    """Stop marking table for consumer and drop its pending dates. The caller commits."""
+    ensure_dirty_partitions(conn)
+    with conn.cursor() as cur:
+        cur.execute(f"DELETE FROM {CONSUMER_TABLE} WHERE consumer = %s AND table_name = %s", (consumer, table))
+        cur.execute(f"DELETE FROM {DIRTY_TABLE} WHERE consumer = %s AND table_name = %s", (consumer, table))
+
+
+def reset_consumer(conn, consumer, table, days=DEFAULT_BOOTSTRAP_DAYS):
+    """Mark the last `days` dates dirty for consumer, e.g. after changing its query. Commits."""
+    ensure_dirty_partitions(conn)
+    today = date.today()
+    with conn.cursor() as cur:
+        cur.execute(f"""
+            INSERT INTO {CONSUMER_TABLE} (consumer, table_name) VALUES (%s, %s)
+            ON CONFLICT DO NOTHING
+        """, (consumer, table))
+        cur.execute(f"""
+            INSERT INTO {DIRTY_TABLE} (consumer, table_name, business_date)
+            SELECT %s, %s, d::date FROM generate_series(%s::date, %s::date, '1 day') AS d
+            ON CONFLICT DO NOTHING
+        """, (consumer, table, today - timedelta(days=days - 1), today))
+    conn.commit()
+
+
+def format_dates(dates):
+    """Short description of a claimed date list for logs."""
+    if not dates:
+        return 'no dirty dates'
+    if len(dates) == 1:
+        return str(dates[0])
+    return f"{len(dates)} dates ({dates[0]} .. {dates[-1]})"
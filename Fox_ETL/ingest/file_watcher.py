@@ -0,0 +1,231 @@
+"""
+Event-driven watcher for the report input directory.
+
+Filesystem events (watchdog: inotify on Linux, ReadDirectoryChangesW on
+Windows) mark files as pending; without watchdog a cheap directory scan every
+poll interval does the same. A pending file is handed off only once its size
+and mtime have not changed for `settle_seconds`, so half-copied downloads are
+never loaded. Ready files go into a durable WorkQueue (ingest/work_queue.py)
+and are processed by worker lanes: different report types in parallel,
+files of the same type one at a time unless a type is given more lanes.
+Failed loads are retried with backoff; the queue survives restarts.
+"""
+import os
+import time
+import threading
+
+from ingest.work_queue import WorkQueue, format_stats
+
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+except ImportError:
+    Observer = None
+    FileSystemEventHandler = object
+
+DEFAULT_SETTLE_SECONDS = 2.0
+DEFAULT_POLL_INTERVAL = 1.0
+DEFAULT_RESCAN_INTERVAL = 60.0
+DEFAULT_STATS_INTERVAL = 300.0
+
+# Office lock files and partial downloads never hold a finished report
+IGNORED_PREFIXES = ('~$', '.~lock', '.')
+IGNORED_SUFFIXES = ('.crdownload', '.part', '.tmp')
+
+
+def is_candidate(filename):
+    name = os.path.basename(filename)
+    return not name.startswith(IGNORED_PREFIXES) and not name.lower().endswith(IGNORED_SUFFIXES)
+
+
+class StableFileTracker:
+    """Tracks pending files until their size and mtime stop changing."""
+
+    def __init__(self, settle_seconds=DEFAULT_SETTLE_SECONDS):
+        self.settle_seconds = settle_seconds
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def touch(self, path):
+        with self._lock:
+            self._pending.setdefault(path, None)
+
+    def discard(self, path):
+        with self._lock:
+            self._pending.pop(path, None)
+
+    def pending(self):
+        with self._lock:
+            return len(self._pending)
+
+    def ready(self, now=None):
+        """Return pending paths that have been unchanged for settle_seconds."""
+        now = time.monotonic() if now is None else now
+        ready = []
+        with self._lock:
+            for path, seen in list(self._pending.items()):
+                try:
+                    st = os.stat(path)
+                except FileNotFoundError:
+                    del self._pending[path]
+                    continue
+                signature = (st.st_size, st.st_mtime_ns)
+                if seen is None or seen[0] != signature:
+                    self._pending[path] = (signature, now)
+                elif st.st_size > 0 and now - seen[1] >= self.settle_seconds:
+                    del self._pending[path]
+                    ready.append(path)
+        return ready
+
+
+class _EventHandler(FileSystemEventHandler):
+    def __init__(self, watcher):
+        super().__init__()
+        self.watcher = watcher
+
+    def on_any_event(self, event):
+        if event.is_directory:
+            return
+        path = getattr(event, 'dest_path', None) or event.src_path
+        self.watcher.notice(path)
+
+
+def file_signature(path):
+    st = os.stat(path)
+    return st.st_size, st.st_mtime_ns
+
+
+class InputWatcher:
+    """
+    Watch `directory` and call handler(path, report_type) for every settled
+    file whose name `matcher(filename)` maps to a report type. lanes maps
+    each report type to its number of worker threads. A handler that returns
+    False or raises is retried with backoff by the queue; a file that failed
+    every attempt is not retried until it changes on disk.
+    """
+
+    def __init__(self, directory, matcher, handler, lanes, queue=None, settle_seconds=DEFAULT_SETTLE_SECONDS,
+                 poll_interval=DEFAULT_POLL_INTERVAL, rescan_interval=DEFAULT_RESCAN_INTERVAL,
+                 stats_interval=DEFAULT_STATS_INTERVAL, use_events=True, log=print):
+        self.directory = directory
+        self.matcher = matcher
+        self.handler = handler
+        self.lanes = lanes
+        self.queue = queue or WorkQueue()
+        self.poll_interval = poll_interval
+        self.rescan_interval = rescan_interval
+        self.stats_interval = stats_interval
+        self.tracker = StableFileTracker(settle_seconds)
+        self.use_events = use_events and Observer is not None
+        self.log = log
+        self._threads = []
+        self._stop = threading.Event()
+        self._observer = None
+
+    def notice(self, path):
+        name = os.path.basename(path)
+        if is_candidate(name) and self.matcher(name):
+            self.tracker.touch(path)
+
+    def scan(self):
+        try:
+            with os.scandir(self.directory) as entries:
+                for entry in entries:
+                    if entry.is_file():
+                        self.notice(entry.path)
+        except FileNotFoundError:
+            self.log(f"Input directory not found: {self.directory}")
+
+    def _enqueue(self, path):
+        report_type = self.matcher(os.path.basename(path))
+        if report_type not in self.lanes:
+            return
+        try:
+            signature = file_signature(path)
+        except FileNotFoundError:
+            return
+        if self.queue.enqueue(path, report_type, signature):
+            self.log(f"Queued {os.path.basename(path)} ({report_type})")
+
+    def _lane(self, report_type):
+        while not self._stop.is_set():
+            job = self.queue.claim(report_type, timeout=self.poll_interval)
+            if job is None:
+                continue
+            job_id, path, attempts = job
+            # Another lane may have consumed or replaced it meanwhile
+            if not os.path.exists(path):
+                self.queue.gone(job_id)
+                continue
+            error = None
+            try:
+                success = self.handler(path, report_type)
+            except Exception as e:
+                success, error = False, str(e)
+                self.log(f"Error handling {os.path.basename(path)}: {e}")
+            if success:
+                self.queue.complete(job_id)
+            elif not os.path.exists(path):
+                self.queue.gone(job_id)
+            else:
+                delay = self.queue.fail(job_id, attempts, error or 'load failed')
+                if delay is None:
+                    self.log(f"Giving up on {os.path.basename(path)} after {attempts} attempts")
+                else:
+                    self.log(f"Retrying {os.path.basename(path)} in {delay:g}s (attempt {attempts} failed)")
+
+    def log_stats(self):
+        self.log(f"Queue: {format_stats(self.queue.stats(), sep='; ')}")
+
+    def start(self):
+        requeued = self.queue.recover()
+        if requeued:
+            self.log(f"Requeued {requeued} file(s) left in progress by the previous run")
+        for report_type, count in self.lanes.items():
+            for i in range(count):
+                thread = threading.Thread(target=self._lane, args=(report_type,),
+                                          name=f'{report_type}-lane-{i}', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+        if self.use_events:
+            self._observer = Observer()
+            self._observer.schedule(_EventHandler(self), self.directory, recursive=False)
+            self._observer.start()
+        self.scan()
+        mode = 'filesystem events' if self._observer else f'polling every {self.poll_interval:g}s'
+        self.log(f"Watching {self.directory} ({mode}), lanes: "
+                 + ', '.join(f"{t} x{n}" for t, n in self.lanes.items()))
+        self.log_stats()
+
+    def run(self):
+        self.start()
+        last_scan = last_stats = time.monotonic()
+        try:
+            while not self._stop.is_set():
+                now = time.monotonic()
+                # Without events the scan is the only source; with them it is a safety net
+                if self._observer is None or now - last_scan >= self.rescan_interval:
+                    self.scan()
+                    last_scan = now
+                for path in self.tracker.ready(now):
+                    self._enqueue(path)
+                if now - last_stats >= self.stats_interval:
+                    self.log_stats()
+                    last_stats = now
+                self._stop.wait(self.poll_interval)
+        finally:
+            self.shutdown()
+
+    def stop(self):
+        self._stop.set()
+
+    def shutdown(self):
+        self._stop.set()
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join()
+            self._observer = None
+        # Lanes finish the file they are on; anything interrupted is requeued on the next start
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
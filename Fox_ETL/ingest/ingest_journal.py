@@ -0,0 +1,179 @@
+"""
+Journal of ingested report files (ingest_batches) and the in-memory filter of
+rows already committed by earlier batches.
+
+File_Extractor re-downloads overlapping report windows every 120 seconds, so
+most drops are either byte-identical to one already loaded or share most of
+their rows with recent ones. run_loader() checks the file's content hash
+against ingest_batches before anything is parsed and skips known files; the
+loaders pass each mapped chunk through a SeenBatch so rows committed earlier
+by this process never reach COPY. Every batch - loaded, skipped or failed -
+is journaled with its row counts and stage timings.
+
+The seen-row filter only remembers rows this process committed itself. If a
+master log is wiped (misc/wipe_master_log.py) restart File_Monitor so they
+are loaded again.
+"""
+import hashlib
+import threading
+
+from psycopg2.extras import Json
+
+from ingest.bulk_copy import text_row
+
+JOURNAL_TABLE = 'ingest_batches'
+DEFAULT_SEEN_CAPACITY = 2000000
+
+_journal_ready = set()
+_journal_lock = threading.Lock()
+
+
+def ensure_journal(conn):
+    """Create ingest_batches once per process (and per database)."""
+    key = conn.dsn
+    with _journal_lock:
+        if key in _journal_ready:
+            return
+        with conn.cursor() as cur:
+            cur.execute(f"""
+                CREATE TABLE IF NOT EXISTS {JOURNAL_TABLE} (
+                    id SERIAL PRIMARY KEY,
+                    report_type VARCHAR(50) NOT NULL,
+                    table_name VARCHAR(100) NOT NULL,
+                    file_name TEXT NOT NULL,
+                    content_hash CHAR(64) NOT NULL,
+                    status VARCHAR(20) NOT NULL,
+                    rows_read INTEGER,
+                    rows_deduped INTEGER,
+                    rows_rejected INTEGER,
+                    rows_quarantined INTEGER,
+                    rows_below_watermark INTEGER,
+                    rows_seen INTEGER,
+                    rows_staged INTEGER,
+                    rows_inserted INTEGER,
+                    timings JSONB,
+                    error TEXT,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            for column in ('rows_rejected', 'rows_quarantined', 'rows_below_watermark'):
+                cur.execute(f"ALTER TABLE {JOURNAL_TABLE} ADD COLUMN IF NOT EXISTS {column} INTEGER")
+            cur.execute(f"""
+                CREATE INDEX IF NOT EXISTS {JOURNAL_TABLE}_hash_idx
+                ON {JOURNAL_TABLE} (report_type, content_hash) WHERE status = 'loaded'
+            """)
+        conn.commit()
+        _journal_ready.add(key)
+
+
+def already_ingested(conn, report_type, content_hash):
+    with conn.cursor() as cur:
+        cur.execute(f"""
+            SELECT 1 FROM {JOURNAL_TABLE}
+            WHERE report_type = %s AND content_hash = %s AND status = 'loaded'
+            LIMIT 1
+        """, (report_type, content_hash))
+        return cur.fetchone() is not None
+
+
+def next_batch_id(conn):
+    """
+    Reserve the ingest_batches id of a load before it starts, so quarantined
+    rows can refer to it. Sequence values survive a rollback.
+    """
+    with conn.cursor() as cur:
+        cur.execute("SELECT nextval(pg_get_serial_sequence(%s, 'id'))", (JOURNAL_TABLE,))
+        return cur.fetchone()[0]
+
+
+def record_batch(conn, result, content_hash, status):
+    """Journal a LoadResult (under result.batch_id when reserved). The caller commits."""
+    with conn.cursor() as cur:
+        cur.execute(f"""
+            INSERT INTO {JOURNAL_TABLE}
+                (id, report_type, table_name, file_name, content_hash, status, rows_read, rows_deduped,
+                 rows_rejected, rows_quarantined, rows_below_watermark, rows_seen, rows_staged, rows_inserted,
+                 timings, error)
+            VALUES (COALESCE(%s, nextval(pg_get_serial_sequence(%s, 'id'))),
+                    %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+        """, (
+            result.batch_id, JOURNAL_TABLE,
+            result.report_type, result.table, result.file_path, content_hash, status, result.rows_read,
+            result.rows_deduped, result.rows_rejected, result.rows_quarantined, result.rows_below_watermark, result.rows_seen, result.rows_staged, result.rows_inserted,
+            Json(result.timings), result.error
+        ))
+
+
+# ---------------------------------------------------------------------------
+# Rows seen in earlier batches
+# ---------------------------------------------------------------------------
+def row_fingerprint(row):
+    """64-bit fingerprint of a mapped row, stable across processes."""
+    return int.from_bytes(hashlib.blake2b(text_row(row).encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+class SeenRows:
+    """
+    Fingerprints of rows committed by earlier batches of one table. Memory is
+    bounded by keeping two generations of at most capacity/2 entries each;
+    overlapping report windows only ever repeat recent rows.
+    """
+
+    def __init__(self, capacity=DEFAULT_SEEN_CAPACITY):
+        self.generation_size = max(1, capacity // 2)
+        self._current = set()
+        self._previous = set()
+        self._lock = threading.Lock()
+
+    def __contains__(self, fingerprint):
+        return fingerprint in self._current or fingerprint in self._previous
+
+    def __len__(self):
+        return len(self._current) + len(self._previous)
+
+    def add_all(self, fingerprints):
+        with self._lock:
+            for fingerprint in fingerprints:
+                self._current.add(fingerprint)
+                if len(self._current) >= self.generation_size:
+                    self._previous, self._current = self._current, set()
+
+    def batch(self):
+        return SeenBatch(self)
+
+
+class SeenBatch:
+    """Filters one load's rows against SeenRows; commit() only after the load is committed."""
+
+    def __init__(self, seen):
+        self.seen = seen
+        self.pending = []
+        self.dropped = 0
+
+    def filter(self, rows):
+        kept = []
+        for row in rows:
+            fingerprint = row_fingerprint(row)
+            if fingerprint in self.seen:
+                self.dropped += 1
+            else:
+                kept.append(row)
+                self.pending.append(fingerprint)
+        return kept
+
+    def discard(self):
+        """Forget this batch's rows, e.g. when some of them were quarantined after staging."""
+        self.pending = []
+
+    def commit(self):
+        self.seen.add_all(self.pending)
+        self.pending = []
+
+
+_seen_by_table = {}
+
+
+def seen_rows(table):
+    """Process-wide SeenRows for a master log table."""
+    with _journal_lock:
+        return _seen_by_table.setdefault(table, SeenRows())
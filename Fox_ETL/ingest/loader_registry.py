@@ -0,0 +1,234 @@
+"""
+Registry of report loaders that can run inside a long-lived process.
+
+Every ReportSpec (ingest/report_specs.py) is registered under its report type
+together with the table it writes and the filename patterns of the reports it
+accepts (fixed export names as well as dated copies); a loader that cannot be
+expressed as a spec can still register itself with @register_loader from a
+module listed in LOADER_MODULES. File_Monitor
+calls run_loader() with a pooled connection and gets a LoadResult back instead
+of spawning `python3 loaders/...` and reading stdout. Every load is journaled
+in ingest_batches (see ingest/ingest_journal.py).
+"""
+import os
+import time
+import fnmatch
+import importlib
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+from ingest.change_notify import notify_batch
+from ingest.db_pool import pooled_connection
+from ingest.ingest_journal import ensure_journal, already_ingested, next_batch_id, record_batch, seen_rows
+from ingest.report_cache import file_content_hash
+
+# Hand-written loaders, imported for their @register_loader side effect
+LOADER_MODULES = []
+
+LOADERS = {}
+
+
+@dataclass
+class LoadResult:
+    report_type: str
+    file_path: str
+    table: str
+    rows_read: int = 0
+    rows_deduped: int = 0
+    rows_rejected: int = 0
+    rows_quarantined: int = 0
+    rows_below_watermark: int = 0
+    rows_seen: int = 0
+    rows_staged: int = 0
+    rows_inserted: int = 0
+    timings: dict = field(default_factory=dict)
+    error: str = None
+    already_loaded: bool = False
+    batch_id: int = None
+    date_range: tuple = None  # (first, last) business date of the inserted rows
+
+    @property
+    def success(self):
+        return self.error is None
+
+    @property
+    def rows_existing(self):
+        return self.rows_staged - self.rows_inserted
+
+    @property
+    def rows_skipped(self):
+        """
+        Rows not inserted: duplicates inside the file, rows missing a required
+        value, quarantined rows, rows older than the watermark, rows seen in
+        earlier batches and rows already in the table.
+        """
+        return (self.rows_deduped + self.rows_rejected + self.rows_quarantined + self.rows_below_watermark
+                + self.rows_seen + self.rows_existing)
+
+    def summary(self):
+        stages = ', '.join(f"{stage} {seconds:.2f}s" for stage, seconds in self.timings.items())
+        status = 'ok' if self.success else f'failed: {self.error}'
+        if self.already_loaded:
+            return f"{self.report_type} {os.path.basename(self.file_path)}: identical file already loaded, skipped [{stages}]"
+        return (
+            f"{self.report_type} {os.path.basename(self.file_path)}: {status} - "
+            f"read {self.rows_read:,}, inserted {self.rows_inserted:,}, skipped {self.rows_skipped:,} "
+            f"({self.rows_deduped:,} in-file duplicates, {self.rows_rejected:,} rejected, "
+            f"{self.rows_quarantined:,} quarantined, "
+            f"{self.rows_below_watermark:,} below watermark, "
+            f"{self.rows_seen:,} seen in earlier batches, "
+            f"{self.rows_existing:,} existing) [{stages}]"
+        )
+
+
+@dataclass
+class LoaderSpec:
+    report_type: str
+    table: str
+    func: object
+    patterns: tuple
+
+    def matches(self, filename):
+        name = os.path.basename(filename).lower()
+        return any(fnmatch.fnmatchcase(name, pattern.lower()) for pattern in self.patterns)
+
+
+@contextmanager
+def timed(result, stage):
+    """Add the wall time of a load stage to result.timings (stages repeat per chunk)."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        result.timings[stage] = round(result.timings.get(stage, 0) + elapsed, 3)
+
+
+def timed_chunks(chunks, result, stage):
+    """Yield from chunks, adding the time spent producing each one to result.timings[stage]."""
+    chunks = iter(chunks)
+    while True:
+        with timed(result, stage):
+            chunk = next(chunks, None)
+        if chunk is None:
+            return
+        yield chunk
+
+
+def register_loader(report_type, table, patterns):
+    """
+    Decorator: register func(conn, file_path, result, seen, log) as the loader
+    for report_type. A loader whose insert dedups passes its mapped rows
+    through seen.filter() before staging them (plain appends keep repeated
+    rows and skip it) and leaves the commit to run_loader().
+    """
+    def decorator(func):
+        LOADERS[report_type] = LoaderSpec(report_type, table, func, tuple(patterns))
+        return func
+    return decorator
+
+
+def register_spec(spec):
+    """Register the pipeline for a ReportSpec as the loader for its report type."""
+    from ingest.pipeline import load_report
+
+    def load(conn, file_path, result, seen=None, log=print):
+        return load_report(conn, spec, file_path, result, seen=seen, log=log)
+    load.__name__ = f"load_{spec.report_type}_file"
+    LOADERS[spec.report_type] = LoaderSpec(spec.report_type, spec.table, load, tuple(spec.patterns))
+
+
+def load_registered_loaders():
+    from ingest.report_specs import REPORT_SPECS
+    for spec in REPORT_SPECS.values():
+        if spec.report_type not in LOADERS:
+            register_spec(spec)
+    for module in LOADER_MODULES:
+        importlib.import_module(module)
+    return LOADERS
+
+
+def get_loader(report_type):
+    if report_type not in LOADERS:
+        load_registered_loaders()
+    return LOADERS[report_type]
+
+
+def match_report_type(filename):
+    """Report type whose filename patterns match filename, or None."""
+    if not LOADERS:
+        load_registered_loaders()
+    for spec in LOADERS.values():
+        if spec.matches(filename):
+            return spec.report_type
+    return None
+
+
+def remove_report_file(file_path, log=print):
+    try:
+        os.remove(file_path)
+        log(f"Deleted report file: {os.path.basename(file_path)}")
+    except Exception as e:
+        log(f"Could not delete report file: {e}")
+
+
+def run_loader(report_type, file_path, conn=None, pool=None, remove_file=True, content_hash=None, log=print):
+    """
+    Load one report file with the registered loader and return its LoadResult.
+
+    Uses conn if given, otherwise borrows one from the pool. A file whose
+    content hash (content_hash, e.g. of the export before conversion, or the
+    file's own) is already journaled as loaded is skipped before it is read.
+    The rows and the ingest_batches entry commit together; on failure the
+    transaction is rolled back, the batch is journaled as failed and the
+    error is recorded on the result rather than raised. The file is removed
+    only after a successful load.
+    """
+    spec = get_loader(report_type)
+    result = LoadResult(report_type, file_path, spec.table)
+    with timed(result, 'total'):
+        try:
+            if conn is not None:
+                _call_loader(spec, conn, file_path, result, content_hash, log)
+            else:
+                with pooled_connection(pool) as pooled:
+                    _call_loader(spec, pooled, file_path, result, content_hash, log)
+        except Exception as e:
+            result.error = str(e)
+
+    if result.success and remove_file:
+        remove_report_file(file_path, log)
+    return result
+
+
+def _call_loader(spec, conn, file_path, result, content_hash, log):
+    ensure_journal(conn)
+    with timed(result, 'hash'):
+        content_hash = content_hash or file_content_hash(file_path)
+        result.already_loaded = already_ingested(conn, spec.report_type, content_hash)
+    if result.already_loaded:
+        log(f"{os.path.basename(file_path)} is identical to an export that was already loaded, skipping")
+        record_batch(conn, result, content_hash, 'duplicate')
+        conn.commit()
+        return
+
+    seen = seen_rows(spec.table).batch()
+    result.batch_id = next_batch_id(conn)
+    try:
+        spec.func(conn, file_path, result, seen=seen, log=log)
+        result.rows_seen = seen.dropped
+        record_batch(conn, result, content_hash, 'loaded')
+        # Delivered to the aggregator schedulers when this commit lands
+        notify_batch(conn, result)
+        conn.commit()
+    except Exception as e:
+        conn.rollback()
+        result.error = str(e)
+        try:
+            record_batch(conn, result, content_hash, 'failed')
+            conn.commit()
+        except Exception:
+            conn.rollback()
+        raise
+    # Only rows that are now committed may be filtered from later batches
+    seen.commit()
@@ -0,0 +1,192 @@
+"""
+Master log table definitions and the staged write path shared by the loaders
+and the upload_* backfill scripts.
+
+Rows are COPY'd into a temporary stage table, then moved into the master log
+with a single INSERT ... SELECT. Every master log row carries a row_hash: a
+16-byte md5 fingerprint of its dedup columns, computed by one SQL expression
+both on ingest and by misc/migrate_row_hash.py. A unique index on row_hash
+replaces the wide composite unique constraints, so dedup is a single index
+lookup and NULL columns compare equal.
+"""
+from ingest.bulk_copy import copy_rows, DEFAULT_CHUNK_SIZE
+
+MASTER_LOG_COLUMNS = {
+    'workstation_master_log': [
+        'sn', 'pn', 'customer_pn', 'outbound_version', 'workstation_name',
+        'history_station_start_time', 'history_station_end_time', 'hours', 'service_flow', 'model',
+        'history_station_passing_status', 'passing_station_method', 'operator', 'first_station_start_time',
+        'data_source'
+    ],
+    'testboard_master_log': [
+        'sn', 'pn', 'model', 'work_station_process', 'baseboard_sn', 'baseboard_pn', 'workstation_name',
+        'history_station_start_time', 'history_station_end_time', 'history_station_passing_status', 'operator',
+        'failure_reasons', 'failure_note', 'failure_code', 'diag_version', 'fixture_no', 'data_source'
+    ],
+    'snfn_master_log': [
+        'workstation_name', 'fixture_no', 'error_code', 'error_disc', 'sn', 'pn', 'model',
+        'history_station_start_time', 'history_station_end_time', 'data_source'
+    ],
+}
+
+# Old composite unique constraints, superseded by the row_hash unique index.
+COMPOSITE_CONSTRAINTS = {
+    'workstation_master_log': 'workstation_unique_constraint',
+    'testboard_master_log': 'testboard_unique_constraint',
+    'snfn_master_log': 'snfn_unique_constraint',
+}
+
+TIMESTAMP_COLUMNS = {'history_station_start_time', 'history_station_end_time', 'first_station_start_time'}
+
+
+# ---------------------------------------------------------------------------
+# Column mapping (exported report DataFrame -> master log columns)
+# ---------------------------------------------------------------------------
+def frame_to_rows(table, df):
+    """
+    Map a cleaned report DataFrame to row tuples in MASTER_LOG_COLUMNS[table]
+    order, using the table's ReportSpec (ingest/report_specs.py).
+    """
+    from ingest.pipeline import spec_frame_rows
+    from ingest.report_specs import spec_for_table
+    return spec_frame_rows(spec_for_table(table), df)
+
+
+# ---------------------------------------------------------------------------
+# Row fingerprint
+# ---------------------------------------------------------------------------
+def row_hash_sql(table, alias=None, available=None):
+    """
+    SQL expression computing row_hash for a row of table (or its stage).
+
+    jsonb keeps NULL distinct from '' and renders timestamps in ISO form
+    regardless of DateStyle, so the hash is stable across sessions. Columns
+    not in `available` hash as NULL (e.g. the snfn backfill has no model).
+    """
+    parts = []
+    for col in MASTER_LOG_COLUMNS[table]:
+        if available is not None and col not in available:
+            parts.append('NULL::timestamp' if col in TIMESTAMP_COLUMNS else 'NULL::text')
+        else:
+            parts.append(f"{alias}.{col}" if alias else col)
+    return f"md5(jsonb_build_array({', '.join(parts)})::text)::uuid"
+
+
+def row_hash_param_sql(table):
+    """row_hash expression over %s placeholders, one per MASTER_LOG_COLUMNS[table] value."""
+    parts = ['%s::timestamp' if col in TIMESTAMP_COLUMNS else '%s::text' for col in MASTER_LOG_COLUMNS[table]]
+    return f"md5(jsonb_build_array({', '.join(parts)})::text)::uuid"
+
+
+def row_hash_index_name(table):
+    return f"{table}_row_hash_key"
+
+
+def ensure_row_hash(conn, table):
+    """Add the row_hash column and its unique index if missing (cheap on new tables)."""
+    with conn.cursor() as cur:
+        cur.execute(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS row_hash UUID")
+        cur.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS {row_hash_index_name(table)} ON {table} (row_hash)")
+
+
+def backfill_row_hash(conn, table, batch_size=50000, log=print):
+    """Fill row_hash for rows that lack it, one committed id range at a time. Returns rows updated."""
+    with conn.cursor() as cur:
+        cur.execute(f"SELECT MIN(id), MAX(id) FROM {table} WHERE row_hash IS NULL")
+        low, high = cur.fetchone()
+    if low is None:
+        return 0
+
+    total = 0
+    for start in range(low, high + 1, batch_size):
+        with conn.cursor() as cur:
+            cur.execute(f"""
+                UPDATE {table} SET row_hash = {row_hash_sql(table)}
+                WHERE id >= %s AND id < %s AND row_hash IS NULL
+            """, (start, start + batch_size))
+            total += cur.rowcount
+        conn.commit()
+        if log:
+            log(f"{table}: hashed ids {start:,}-{min(start + batch_size - 1, high):,} ({total:,} rows so far)")
+    return total
+
+
+def delete_duplicate_hashes(conn, table):
+    """Delete rows whose row_hash repeats, keeping the lowest id. Returns rows deleted."""
+    with conn.cursor() as cur:
+        cur.execute(f"""
+            DELETE FROM {table} d
+            USING {table} k
+            WHERE d.row_hash = k.row_hash
+              AND d.id > k.id
+        """)
+        return cur.rowcount
+
+
+# ---------------------------------------------------------------------------
+# Staged writes
+# ---------------------------------------------------------------------------
+def stage_table_name(table):
+    if table.endswith('_master_log'):
+        return table[:-len('_master_log')] + '_stage'
+    return f"{table}_stage"
+
+
+def create_stage(conn, table, columns=None):
+    """
+    Create an empty temp stage table for table, dropped on commit. Text
+    columns are unbounded so an over-long value reaches the quarantine
+    check instead of failing the whole COPY.
+    """
+    columns = columns or MASTER_LOG_COLUMNS[table]
+    stage = stage_table_name(table)
+    select = ', '.join(col if col in TIMESTAMP_COLUMNS else f"{col}::text AS {col}" for col in columns)
+    with conn.cursor() as cur:
+        cur.execute(f"DROP TABLE IF EXISTS pg_temp.{stage}")
+        cur.execute(f"""
+            CREATE TEMP TABLE {stage} ON COMMIT DROP AS
+            SELECT {select} FROM {table} WITH NO DATA
+        """)
+    return stage
+
+
+def copy_to_stage(conn, table, rows, columns=None, chunk_size=DEFAULT_CHUNK_SIZE, fmt='text', log=print):
+    """COPY more rows into the existing stage for table (streaming loads). Returns row count."""
+    columns = columns or MASTER_LOG_COLUMNS[table]
+    return copy_rows(conn, stage_table_name(table), columns, rows, chunk_size=chunk_size, fmt=fmt, log=log)
+
+
+def stage_rows(conn, table, rows, columns=None, chunk_size=DEFAULT_CHUNK_SIZE, fmt='text', log=print):
+    """COPY rows into a fresh temp stage for table. Returns (stage name, row count)."""
+    stage = create_stage(conn, table, columns)
+    count = copy_to_stage(conn, table, rows, columns, chunk_size=chunk_size, fmt=fmt, log=log)
+    return stage, count
+
+
+def insert_new_sql(table, columns=None, where=None):
+    """INSERT ... SELECT of the staged rows (optionally only those matching where) whose row_hash is not already in table."""
+    columns = columns or MASTER_LOG_COLUMNS[table]
+    return f"""
+        INSERT INTO {table} ({', '.join(columns)}, row_hash)
+        SELECT {', '.join('s.' + col for col in columns)}, {row_hash_sql(table, 's', columns)}
+        FROM {stage_table_name(table)} s
+        {f'WHERE {where}' if where else ''}
+        ON CONFLICT (row_hash) DO NOTHING
+    """
+
+
+def insert_new_from_stage(conn, table, columns=None, where=None):
+    """Insert staged rows (optionally only those matching where) whose row_hash is not already in table. Returns rows inserted."""
+    with conn.cursor() as cur:
+        cur.execute(insert_new_sql(table, columns, where))
+        return cur.rowcount
+
+
+def copy_new_rows(conn, table, rows, columns=None, chunk_size=DEFAULT_CHUNK_SIZE, fmt='text', log=print):
+    """
+    Stage rows with COPY and insert only the ones not already present.
+    Returns (rows staged, rows inserted). The caller commits.
+    """
+    _, staged = stage_rows(conn, table, rows, columns, chunk_size=chunk_size, fmt=fmt, log=log)
+    inserted = insert_new_from_stage(conn, table, columns)
+    return staged, inserted
@@ -0,0 +1,266 @@
+"""
+Compiles a ReportSpec (ingest/report_specs.py) into its load pipeline.
+
+    read chunk -> clean column names -> data_source -> watermark -> dedup
+    -> map columns (vectorized) -> required -> seen rows -> COPY into stage
+    -> quarantine rows the target would reject -> one INSERT ... SELECT
+
+Foreign keys are resolved in that final insert by joining the stage to the
+lookup table, so parsing never needs the database and backfill workers can
+run it in separate processes. load_report() is the single-file path run by
+File_Monitor through the loader registry; backfill_reports() drives
+ingest/backfill.py for historical files.
+"""
+import os
+from functools import partial
+
+import numpy as np
+import pandas as pd
+
+from ingest.backfill import run_backfill
+from ingest.dirty_partitions import ensure_dirty_partitions, insert_counting_dates, mark_dirty
+from ingest.column_mapping import missing_mask, fill_missing, map_unique, rows_from_columns
+from ingest.loader_registry import timed, timed_chunks
+from ingest.master_logs import create_stage, copy_to_stage, stage_table_name, insert_new_sql, ensure_row_hash
+from ingest.quarantine import (
+    QUARANTINE_TABLE, ensure_quarantine, map_rows_isolating_errors, quarantine_rows,
+    quarantine_stage_violations, insert_with_quarantine
+)
+from ingest.report_cache import cached_report_chunks
+from ingest.report_reader import read_report_chunks
+from ingest.report_specs import COLUMN_KINDS, ROW_HASH, ANY, APPEND, get_spec
+from ingest.watermarks import load_watermark
+
+def clean_column_name(col_name):
+    cleaned = str(col_name).lower().replace(' ', '_').replace('-', '_')
+    return ''.join(c for c in cleaned if c.isalnum() or c == '_')
+
+
+# ---------------------------------------------------------------------------
+# Parse / clean / dedup / map
+# ---------------------------------------------------------------------------
+def prepare_frame(spec, df, result=None, watermark=None):
+    """Clean column names, add data_source, apply the watermark and drop duplicate report rows."""
+    df.columns = [clean_column_name(col) for col in df.columns]
+    if spec.data_source:
+        df['data_source'] = spec.data_source
+    if watermark is not None:
+        df = watermark.filter(df)
+    if spec.dedup:
+        dedup_cols = [c for c in df.columns if c not in spec.dedup_ignore]
+        chunk_rows = len(df)
+        df = df.drop_duplicates(subset=dedup_cols)
+        if result is not None:
+            result.rows_deduped += chunk_rows - len(df)
+    return df
+
+
+def map_frame(spec, df):
+    """Mapped column arrays keyed by column name."""
+    mapped = {}
+    for column in spec.columns:
+        mapper = COLUMN_KINDS[column.kind][0]
+        values = mapper(df, column.source_column)
+        if column.fallback:
+            values = fill_missing(values, mapper(df, column.fallback), missing_mask(df, column.source_column))
+        if column.normalize:
+            values = map_unique(values, column.normalize)
+        if column.default is not None:
+            values = values.copy()
+            values[pd.isna(values)] = column.default
+        mapped[column.name] = values
+    return mapped
+
+
+def spec_frame_rows(spec, df, result=None):
+    """Row tuples in spec column order, without rows missing a required value."""
+    mapped = map_frame(spec, df)
+    if spec.required:
+        keep = np.ones(len(df), dtype=bool)
+        for name in spec.required:
+            keep &= ~pd.isna(mapped[name])
+        if not keep.all():
+            if result is not None:
+                result.rows_rejected += int((~keep).sum())
+            mapped = {name: values[keep] for name, values in mapped.items()}
+    return rows_from_columns(mapped, spec.column_names)
+
+
+def parse_report_rows(report_type, file_path):
+    """Parse one file into row tuples for its spec. Module-level so backfill workers can run it."""
+    spec = get_spec(report_type)
+    rows = []
+    for df in read_report_chunks(file_path):
+        rows.extend(spec_frame_rows(spec, prepare_frame(spec, df)))
+    return rows
+
+
+# ---------------------------------------------------------------------------
+# Stage and insert
+# ---------------------------------------------------------------------------
+def ensure_table(conn, spec):
+    """Create spec.table if it does not exist yet (existing tables are left untouched)."""
+    with conn.cursor() as cur:
+        cur.execute("SELECT to_regclass(%s)", (spec.table,))
+        exists = cur.fetchone()[0] is not None
+        if not exists and spec.create_sql:
+            cur.execute(spec.create_sql)
+            if spec.conflict == ROW_HASH:
+                ensure_row_hash(conn, spec.table)
+    conn.commit()
+
+
+def create_spec_stage(conn, spec):
+    if spec.conflict == ROW_HASH:
+        return create_stage(conn, spec.table, list(spec.column_names))
+    stage = stage_table_name(spec.table)
+    columns = ', '.join(f"{c.name} {spec.stage_type(c)}" for c in spec.columns)
+    with conn.cursor() as cur:
+        cur.execute(f"DROP TABLE IF EXISTS pg_temp.{stage}")
+        cur.execute(f"CREATE TEMP TABLE {stage} ({columns}) ON COMMIT DROP")
+    return stage
+
+
+def _lookup_join(lookup, alias):
+    condition = ' AND '.join(f"({expr}) = s.{col}" for col, expr in lookup.keys)
+    return (f"JOIN LATERAL (SELECT l.{lookup.value} AS value FROM {lookup.table} l "
+            f"WHERE {condition} LIMIT 1) {alias} ON TRUE")
+
+
+def insert_sql(spec, where=None):
+    """INSERT ... SELECT moving the stage (or its rows matching where) into spec.table."""
+    targets = [c.name for c in spec.columns if not c.stage_only]
+    selects = [f"s.{name}" for name in targets]
+    joins = []
+    for i, lookup in enumerate(spec.lookups):
+        alias = f"lk{i}"
+        joins.append(_lookup_join(lookup, alias))
+        targets.append(lookup.target)
+        selects.append(f"{alias}.value")
+    if spec.conflict is APPEND:
+        conflict = ''
+    elif spec.conflict == ANY:
+        conflict = 'ON CONFLICT DO NOTHING'
+    else:
+        conflict = f"ON CONFLICT ({', '.join(spec.conflict)}) DO NOTHING"
+    where = f"WHERE {where}" if where else ''
+    return (f"INSERT INTO {spec.table} ({', '.join(targets)}) "
+            f"SELECT {', '.join(selects)} FROM {stage_table_name(spec.table)} s {' '.join(joins)} {where} {conflict}")
+
+
+def insert_from_stage(conn, spec, where=None, dates=None):
+    """
+    Insert the staged rows. Returns rows inserted; the caller commits. When
+    dates is a set, the business dates of the inserted rows are added to it.
+    """
+    if spec.conflict == ROW_HASH:
+        sql = insert_new_sql(spec.table, list(spec.column_names), where=where)
+    else:
+        sql = insert_sql(spec, where)
+    with conn.cursor() as cur:
+        if dates is None or not spec.date_column:
+            cur.execute(sql)
+            return cur.rowcount
+        inserted, inserted_dates = insert_counting_dates(cur, sql, spec.date_column)
+    dates.update(inserted_dates)
+    return inserted
+
+
+# ---------------------------------------------------------------------------
+# Single file (File_Monitor / load_reports.py FILE)
+# ---------------------------------------------------------------------------
+def load_report(conn, spec, file_path, result, seen=None, log=print):
+    """
+    Stream one report into spec.table. Counters and stage timings go on
+    result (a LoadResult); the caller commits (see run_loader). Rows that
+    cannot be mapped or inserted are quarantined instead of failing the file.
+    """
+    ensure_quarantine(conn)
+    if spec.date_column:
+        ensure_dirty_partitions(conn)
+    watermark = load_watermark(conn, spec.table, spec.data_source) if spec.watermark else None
+    # Stream the export chunk by chunk into the stage so memory stays flat;
+    # rows older than the watermark's overlap band are dropped on read, rows
+    # committed by earlier batches by seen, and conflicts by the insert
+    stage = create_spec_stage(conn, spec)
+    if spec.conflict is APPEND:
+        # Plain appends keep repeated rows, so there is nothing to filter
+        seen = None
+    for df in timed_chunks(cached_report_chunks(file_path), result, 'read'):
+        with timed(result, 'map'):
+            # Label rows by their position in the file for the quarantine
+            df.index = pd.RangeIndex(result.rows_read, result.rows_read + len(df))
+            result.rows_read += len(df)
+            df = prepare_frame(spec, df, result, watermark)
+            bad = []
+            values = map_rows_isolating_errors(partial(spec_frame_rows, spec, result=result), df, bad)
+            del df
+            if seen is not None:
+                values = seen.filter(values)
+
+        with timed(result, 'write'):
+            quarantine_rows(conn, result, bad)
+            result.rows_staged += copy_to_stage(conn, spec.table, values, list(spec.column_names), log=log)
+
+    if watermark is not None and watermark.dropped:
+        log(f"Skipped {watermark.dropped:,} rows ending before {watermark.cutoff:%Y-%m-%d %H:%M} (watermark minus overlap)")
+    if result.rows_deduped:
+        ignored = f" (ignoring {', '.join(spec.dedup_ignore)})" if spec.dedup_ignore else ''
+        log(f"Cleaned {result.rows_deduped:,} duplicate rows{ignored}")
+    if result.rows_rejected:
+        log(f"Skipped {result.rows_rejected:,} rows missing {' or '.join(spec.required)}")
+    if result.rows_quarantined:
+        log(f"Quarantined {result.rows_quarantined:,} rows that could not be parsed")
+
+    with timed(result, 'write'):
+        quarantined_before_insert = result.rows_quarantined
+        for reason, count in quarantine_stage_violations(conn, spec, stage, result).items():
+            log(f"Quarantined {count:,} rows: {reason}")
+        log(f"Staged {result.rows_staged:,} rows, checking for existing records...")
+        dates = set()
+        result.rows_inserted = insert_with_quarantine(
+            conn, spec, stage, result, lambda c, where=None: insert_from_stage(c, spec, where, dates)
+        )
+        if seen is not None and result.rows_quarantined > quarantined_before_insert:
+            # A staged row went to the quarantine instead of spec.table; keep
+            # the batch out of seen so the row loads once it is fixed
+            seen.discard()
+        if dates:
+            # Recent aggregators recompute exactly the dates of the new rows (ingest/dirty_partitions.py)
+            dates = sorted(dates)
+            mark_dirty(conn, spec.table, dates)
+            result.date_range = (dates[0], dates[-1])
+        if watermark is not None:
+            watermark.advance(conn)
+            result.rows_below_watermark = watermark.dropped
+
+    if result.rows_quarantined:
+        log(f"{result.rows_quarantined:,} rows in {QUARANTINE_TABLE} for batch {result.batch_id}")
+    log(f"Found {result.rows_existing:,} existing records, {result.rows_inserted:,} new records inserted")
+    if result.rows_inserted:
+        log(f"Imported {result.rows_inserted:,} new records from {os.path.basename(file_path)} into {spec.table}")
+    else:
+        log(f"No new records to import (all {result.rows_existing:,} records already exist)")
+    return result
+
+
+# ---------------------------------------------------------------------------
+# Backfill (load_reports.py --backfill)
+# ---------------------------------------------------------------------------
+def _insert_and_mark_dirty(conn, spec):
+    dates = set()
+    inserted = insert_from_stage(conn, spec, dates=dates)
+    mark_dirty(conn, spec.table, sorted(dates))
+    return inserted
+
+
+def backfill_reports(conn, spec, files, workers=None, force=False, log=print):
+    """Load many files for spec in parallel, checkpointed in backfill_manifest. Returns run_backfill's totals."""
+    if spec.date_column:
+        ensure_dirty_partitions(conn)
+    return run_backfill(
+        conn, spec.table, files, partial(parse_report_rows, spec.report_type),
+        columns=list(spec.column_names), workers=workers, force=force, log=log,
+        create=lambda c: create_spec_stage(c, spec),
+        insert=lambda c: _insert_and_mark_dirty(c, spec)
+    )
@@ -0,0 +1,213 @@
+"""
+Row-level quarantine for report loads.
+
+A single bad row (an unparseable timestamp, a missing NOT NULL value, a
+fixture that does not exist) used to roll back the whole file, which was
+then dropped again and failed the same way. Bad rows are now moved to
+ingest_quarantine with the reason and the ingest_batches id of the load,
+and the rest of the file commits:
+
+  - rows the vectorized mapping cannot convert are isolated by bisecting
+    the chunk (map_rows_isolating_errors), so a clean chunk costs nothing;
+  - staged rows that would violate a NOT NULL or length limit of the
+    target, or whose lookup has no match, are moved out of the stage in
+    one set-based statement (quarantine_stage_violations);
+  - if the insert still fails (e.g. a CHECK constraint), it is retried
+    row by row under savepoints and the failing rows are quarantined with
+    the database error (insert_with_quarantine).
+
+Quarantined rows can be inspected with
+    SELECT reason, count(*) FROM ingest_quarantine WHERE batch_id = ... GROUP BY reason;
+"""
+import threading
+
+import pandas as pd
+from psycopg2.extras import Json, execute_values
+
+QUARANTINE_TABLE = 'ingest_quarantine'
+MAPPING_ERRORS = (ValueError, TypeError, OverflowError)
+
+_ready = set()
+_lock = threading.Lock()
+_target_columns = {}
+
+
+def ensure_quarantine(conn):
+    """Create ingest_quarantine once per process. Commits, so call it before staging."""
+    key = conn.dsn
+    with _lock:
+        if key in _ready:
+            return
+        with conn.cursor() as cur:
+            cur.execute(f"""
+                CREATE TABLE IF NOT EXISTS {QUARANTINE_TABLE} (
+                    id BIGSERIAL PRIMARY KEY,
+                    batch_id INTEGER,
+                    report_type VARCHAR(50) NOT NULL,
+                    table_name VARCHAR(100) NOT NULL,
+                    file_name TEXT,
+                    row_number INTEGER,
+                    reason TEXT NOT NULL,
+                    row_data JSONB,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            cur.execute(f"CREATE INDEX IF NOT EXISTS {QUARANTINE_TABLE}_batch_idx ON {QUARANTINE_TABLE} (batch_id)")
+        conn.commit()
+        _ready.add(key)
+
+
+def _json_value(value):
+    if value is None or (not isinstance(value, (list, dict)) and pd.isna(value)):
+        return None
+    if isinstance(value, (bool, int, float, str)):
+        return value
+    return str(value)
+
+
+# ---------------------------------------------------------------------------
+# Mapping failures (Python side)
+# ---------------------------------------------------------------------------
+def map_rows_isolating_errors(map_rows, df, bad):
+    """
+    map_rows(df) for the whole chunk; if it raises, bisect until the failing
+    rows are isolated. Rows that fail on their own are appended to bad as
+    (row label, reason, raw values) and left out of the result.
+    """
+    try:
+        return map_rows(df)
+    except MAPPING_ERRORS as e:
+        if len(df) <= 1:
+            if not len(df):
+                raise
+            label = df.index[0]
+            raw = {str(col): _json_value(value) for col, value in df.iloc[0].items()}
+            bad.append((label, f"{type(e).__name__}: {e}", raw))
+            return []
+    mid = len(df) // 2
+    return (map_rows_isolating_errors(map_rows, df.iloc[:mid], bad)
+            + map_rows_isolating_errors(map_rows, df.iloc[mid:], bad))
+
+
+def quarantine_rows(conn, result, bad):
+    """Write (row label, reason, raw values) tuples for result's batch. Row labels are 0-based data rows."""
+    if not bad:
+        return 0
+    with conn.cursor() as cur:
+        execute_values(cur, f"""
+            INSERT INTO {QUARANTINE_TABLE} (batch_id, report_type, table_name, file_name, row_number, reason, row_data)
+            VALUES %s
+        """, [
+            (result.batch_id, result.report_type, result.table, result.file_path,
+             int(label) + 1 if label is not None else None, reason, Json(raw))
+            for label, reason, raw in bad
+        ])
+    result.rows_quarantined += len(bad)
+    return len(bad)
+
+
+# ---------------------------------------------------------------------------
+# Constraint violations (database side)
+# ---------------------------------------------------------------------------
+def target_columns(conn, table):
+    """{column: (nullable, has default, max length)} for table, cached per process."""
+    if table not in _target_columns:
+        with conn.cursor() as cur:
+            cur.execute("""
+                SELECT column_name, is_nullable = 'YES', column_default IS NOT NULL, character_maximum_length
+                FROM information_schema.columns
+                WHERE table_name = %s AND table_schema = current_schema()
+            """, (table,))
+            _target_columns[table] = {row[0]: row[1:] for row in cur.fetchall()}
+    return _target_columns[table]
+
+
+def stage_checks(conn, spec):
+    """(SQL condition over stage alias {a}, reason) for every row that could not be inserted."""
+    columns = target_columns(conn, spec.table)
+    checks = []
+    for column in spec.columns:
+        if column.stage_only or column.name not in columns:
+            continue
+        nullable, has_default, max_length = columns[column.name]
+        if not nullable and not has_default:
+            checks.append((f"{{a}}.{column.name} IS NULL", f"{column.name} is missing"))
+        if max_length:
+            checks.append((f"length({{a}}.{column.name}::text) > {max_length}",
+                           f"{column.name} longer than {max_length} characters"))
+    for lookup in spec.lookups:
+        condition = ' AND '.join(f"({expr}) = {{a}}.{col}" for col, expr in lookup.keys)
+        keys = ', '.join(col for col, _ in lookup.keys)
+        checks.append((f"NOT EXISTS (SELECT 1 FROM {lookup.table} l WHERE {condition})",
+                       f"no {lookup.table} match for {keys}"))
+    return checks
+
+
+def quarantine_stage_violations(conn, spec, stage, result):
+    """Move staged rows that would violate the target's constraints into quarantine. Returns {reason: rows}."""
+    checks = stage_checks(conn, spec)
+    if not checks:
+        return {}
+    # The statement takes parameters, so literal % in lookup expressions must be doubled
+    where = ' OR '.join(f"({cond.format(a='s')})" for cond, _ in checks).replace('%', '%%')
+    reason = ('CASE ' + ' '.join(
+        f"WHEN {cond.format(a='bad')} THEN '{text}'" for cond, text in checks
+    ) + ' END').replace('%', '%%')
+    with conn.cursor() as cur:
+        cur.execute(f"""
+            WITH bad AS (
+                DELETE FROM {stage} s WHERE {where} RETURNING s.*
+            )
+            INSERT INTO {QUARANTINE_TABLE} (batch_id, report_type, table_name, file_name, reason, row_data)
+            SELECT %s, %s, %s, %s, {reason}, to_jsonb(bad) FROM bad
+            RETURNING reason
+        """, (result.batch_id, result.report_type, result.table, result.file_path))
+        reasons = {}
+        for (text,) in cur.fetchall():
+            reasons[text] = reasons.get(text, 0) + 1
+    moved = sum(reasons.values())
+    result.rows_quarantined += moved
+    result.rows_staged -= moved
+    return reasons
+
+
+def insert_with_quarantine(conn, spec, stage, result, insert):
+    """
+    insert(conn, where=None) the stage into the target. If the set-based
+    insert fails, roll back to a savepoint and insert row by row,
+    quarantining rows the database rejects. Returns rows inserted.
+    """
+    with conn.cursor() as cur:
+        cur.execute("SAVEPOINT ingest_insert")
+    try:
+        inserted = insert(conn)
+        with conn.cursor() as cur:
+            cur.execute("RELEASE SAVEPOINT ingest_insert")
+        return inserted
+    except Exception:
+        with conn.cursor() as cur:
+            cur.execute("ROLLBACK TO SAVEPOINT ingest_insert")
+
+    with conn.cursor() as cur:
+        cur.execute(f"SELECT ctid::text FROM {stage}")
+        ctids = [row[0] for row in cur.fetchall()]
+    inserted = 0
+    for ctid in ctids:
+        where = f"s.ctid = '{ctid}'::tid"
+        with conn.cursor() as cur:
+            cur.execute("SAVEPOINT ingest_row")
+        try:
+            inserted += insert(conn, where=where)
+            with conn.cursor() as cur:
+                cur.execute("RELEASE SAVEPOINT ingest_row")
+        except Exception as e:
+            with conn.cursor() as cur:
+                cur.execute("ROLLBACK TO SAVEPOINT ingest_row")
+                cur.execute(f"""
+                    INSERT INTO {QUARANTINE_TABLE} (batch_id, report_type, table_name, file_name, reason, row_data)
+                    SELECT %s, %s, %s, %s, %s, to_jsonb(s) FROM {stage} s WHERE {where}
+                """, (result.batch_id, result.report_type, result.table, result.file_path,
+                      str(e).strip().splitlines()[0]))
+            result.rows_quarantined += 1
+            result.rows_staged -= 1
+    return inserted
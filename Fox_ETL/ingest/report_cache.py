@@ -0,0 +1,254 @@
+"""
+Parquet cache of parsed report exports, keyed by file content hash.
+
+Parsing a wareconn export through openpyxl is the slowest step of every load,
+and the same file is often parsed again: loaders re-run after a failure, the
+misc/ debugging helpers re-open yesterday's export. cached_report() and
+cached_report_chunks() return the parsed DataFrame from
+cache/reports/<sha256>.parquet when the same bytes were parsed before, and
+write it there otherwise. Each entry has a small JSON sidecar naming its
+source file, so an export that has since been loaded and deleted can still be
+opened by name. The oldest entries are evicted once the cache grows past
+max_bytes.
+
+The cache needs pyarrow; without it both functions read the file directly.
+"""
+import os
+import json
+import glob
+import hashlib
+import threading
+from datetime import datetime
+
+
+from ingest.report_reader import read_report, read_report_chunks, DEFAULT_CHUNK_ROWS
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+# Bump when the reader or the stored layout changes so old entries are ignored
+CACHE_VERSION = 1
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'cache', 'reports')
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3
+HASH_BLOCK_BYTES = 1 << 20
+
+
+def file_content_hash(file_path):
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_BYTES), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def arrow_safe_frame(df):
+    """
+    Column names as strings, and object columns holding mixed Python types
+    (e.g. numeric and text serial numbers) stored as text with nulls kept.
+    The loaders map these columns through str() anyway, so values are unchanged.
+    """
+    df = df.copy(deep=False)
+    df.columns = [str(col) for col in df.columns]
+    for col in df.columns:
+        series = df[col]
+        if series.dtype == object and len({type(v) for v in series.dropna()}) > 1:
+            df[col] = series.astype(str).where(series.notna(), None)
+    return df
+
+
+class ReportCache:
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES, log=print):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.log = log
+        self.enabled = pa is not None
+        self._lock = threading.Lock()
+
+    def _paths(self, content_hash):
+        base = os.path.join(self.directory, f'{content_hash}.v{CACHE_VERSION}')
+        return base + '.parquet', base + '.json'
+
+    # -- lookup ------------------------------------------------------------
+    def _hit(self, content_hash):
+        data_path, meta_path = self._paths(content_hash)
+        if not os.path.exists(data_path):
+            return None
+        # mtime marks recent use for eviction
+        os.utime(data_path)
+        return data_path
+
+    def find_by_name(self, file_name):
+        """Newest cached entry whose source file had this basename, or None."""
+        best = None
+        for meta_path in glob.glob(os.path.join(self.directory, f'*.v{CACHE_VERSION}.json')):
+            try:
+                with open(meta_path) as f:
+                    meta = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if os.path.basename(meta.get('source', '')) == file_name and (best is None or meta['cached_at'] > best['cached_at']):
+                best = meta
+        return best and self._hit(best['content_hash'])
+
+    def entries(self):
+        metas = []
+        for meta_path in glob.glob(os.path.join(self.directory, f'*.v{CACHE_VERSION}.json')):
+            try:
+                with open(meta_path) as f:
+                    metas.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+        return sorted(metas, key=lambda m: m['cached_at'])
+
+    # -- write -------------------------------------------------------------
+    def _write_meta(self, content_hash, file_path, rows):
+        _, meta_path = self._paths(content_hash)
+        with open(meta_path, 'w') as f:
+            json.dump({
+                'content_hash': content_hash,
+                'source': os.path.abspath(file_path),
+                'rows': rows,
+                'cached_at': datetime.now().isoformat(timespec='seconds')
+            }, f)
+
+    def _finish(self, content_hash, file_path, tmp_path, rows):
+        data_path, _ = self._paths(content_hash)
+        os.replace(tmp_path, data_path)
+        self._write_meta(content_hash, file_path, rows)
+        self.evict()
+
+    def put(self, content_hash, file_path, df):
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            data_path, _ = self._paths(content_hash)
+            tmp_path = f'{data_path}.{os.getpid()}.tmp'
+            pq.write_table(pa.Table.from_pandas(arrow_safe_frame(df), preserve_index=False), tmp_path)
+            self._finish(content_hash, file_path, tmp_path, len(df))
+        except Exception as e:
+            self.log(f"Report cache: not caching {os.path.basename(file_path)}: {e}")
+
+    def evict(self):
+        """Delete least recently used entries until the cache fits in max_bytes."""
+        with self._lock:
+            files = []
+            for data_path in glob.glob(os.path.join(self.directory, '*.parquet')):
+                try:
+                    st = os.stat(data_path)
+                except FileNotFoundError:
+                    continue
+                files.append((st.st_mtime, st.st_size, data_path))
+            total = sum(size for _, size, _ in files)
+            for _, size, data_path in sorted(files):
+                if total <= self.max_bytes:
+                    break
+                for path in (data_path, data_path[:-len('.parquet')] + '.json'):
+                    try:
+                        os.remove(path)
+                    except FileNotFoundError:
+                        pass
+                total -= size
+
+    # -- read --------------------------------------------------------------
+    def read(self, file_path):
+        content_hash = file_content_hash(file_path)
+        data_path = self._hit(content_hash)
+        if data_path:
+            return pq.read_table(data_path).to_pandas()
+        df = read_report(file_path)
+        self.put(content_hash, file_path, df)
+        return df
+
+    def read_chunks(self, file_path, chunk_size=DEFAULT_CHUNK_ROWS):
+        content_hash = file_content_hash(file_path)
+        data_path = self._hit(content_hash)
+        if data_path:
+            yield from _parquet_chunks(data_path, chunk_size)
+            return
+
+        # Write the cache entry chunk by chunk while the caller streams the
+        # source; a later chunk whose inferred types differ from the first
+        # one's abandons the entry rather than altering the data
+        writer, tmp_path, rows = None, None, 0
+        try:
+            for df in read_report_chunks(file_path, chunk_size):
+                if writer is not False:
+                    try:
+                        table = pa.Table.from_pandas(arrow_safe_frame(df), preserve_index=False,
+                                                     schema=writer.schema if writer else None)
+                        if writer is None:
+                            os.makedirs(self.directory, exist_ok=True)
+                            tmp_path = f'{self._paths(content_hash)[0]}.{os.getpid()}.tmp'
+                            writer = pq.ParquetWriter(tmp_path, table.schema)
+                        writer.write_table(table)
+                        rows += len(df)
+                    except Exception as e:
+                        self.log(f"Report cache: not caching {os.path.basename(file_path)}: {e}")
+                        if writer:
+                            writer.close()
+                        writer = False
+                yield df
+            if writer:
+                writer.close()
+                self._finish(content_hash, file_path, tmp_path, rows)
+                writer = None
+        finally:
+            if writer:
+                writer.close()
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+
+def _parquet_chunks(data_path, chunk_size):
+    parquet = pq.ParquetFile(data_path)
+    for batch in parquet.iter_batches(batch_size=chunk_size):
+        # Going through a Table keeps the pandas metadata, so dtypes round-trip
+        yield pa.Table.from_batches([batch], schema=parquet.schema_arrow).to_pandas()
+
+
+_shared_cache = None
+
+
+def get_report_cache():
+    """Process-wide cache configured from the optional REPORT_CACHE block in config.py."""
+    global _shared_cache
+    if _shared_cache is None:
+        try:
+            import config
+            settings = getattr(config, 'REPORT_CACHE', {})
+        except ImportError:
+            settings = {}
+        _shared_cache = ReportCache(
+            directory=settings.get('dir') or DEFAULT_CACHE_DIR,
+            max_bytes=settings.get('max_bytes', DEFAULT_MAX_BYTES),
+        )
+        _shared_cache.enabled = _shared_cache.enabled and settings.get('enabled', True)
+    return _shared_cache
+
+
+def cached_report(file_path):
+    """
+    read_report() through the cache. If file_path no longer exists, the newest
+    cached export with the same file name is returned instead.
+    """
+    cache = get_report_cache()
+    if not cache.enabled:
+        return read_report(file_path)
+    if not os.path.exists(file_path):
+        data_path = cache.find_by_name(os.path.basename(file_path))
+        if data_path is None:
+            raise FileNotFoundError(f"File not found and not cached: {file_path}")
+        cache.log(f"{os.path.basename(file_path)} no longer exists, using cached copy {os.path.basename(data_path)}")
+        return pq.read_table(data_path).to_pandas()
+    return cache.read(file_path)
+
+
+def cached_report_chunks(file_path, chunk_size=DEFAULT_CHUNK_ROWS):
+    """read_report_chunks() through the cache."""
+    cache = get_report_cache()
+    if not cache.enabled:
+        return read_report_chunks(file_path, chunk_size)
+    return cache.read_chunks(file_path, chunk_size)
@@ -0,0 +1,251 @@
+"""
+Read wareconn report exports directly, whatever is behind the .xls extension.
+
+Report servers save three different things as ".xls": real BIFF workbooks,
+HTML tables and SpreadsheetML (Excel 2003 XML). sniff_report_format() looks
+at the first bytes of the file; read_report() loads each format natively so
+File_Monitor only needs the LibreOffice conversion when the format is not
+recognised.
+
+read_report_chunks() is the streaming variant used by the loaders: it yields
+DataFrames of at most chunk_size rows, reading xlsx in openpyxl's read-only
+mode and HTML/SpreadsheetML incrementally, so peak memory depends on the chunk
+size rather than on the export. Column types are inferred per chunk the same
+way read_excel infers them for the whole sheet.
+"""
+import os
+import codecs
+import xml.etree.ElementTree as ET
+from html.parser import HTMLParser
+
+import numpy as np
+import pandas as pd
+from pandas.io.parsers import TextParser
+
+OLE2_MAGIC = b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1'
+ZIP_MAGIC = b'PK\x03\x04'
+SNIFF_BYTES = 4096
+READ_BLOCK_BYTES = 1 << 20
+DEFAULT_CHUNK_ROWS = 50000
+
+SPREADSHEETML_NS = 'urn:schemas-microsoft-com:office:spreadsheet'
+
+
+class UnrecognizedReportFormat(ValueError):
+    pass
+
+
+def sniff_report_format(file_path):
+    """Return 'xlsx', 'xls', 'html', 'xml' or None if the format is not recognised."""
+    with open(file_path, 'rb') as f:
+        head = f.read(SNIFF_BYTES)
+    if head.startswith(ZIP_MAGIC):
+        return 'xlsx'
+    if head.startswith(OLE2_MAGIC):
+        return 'xls'
+
+    text = head.lstrip(b'\xef\xbb\xbf \t\r\n').lower()
+    if not text.startswith(b'<'):
+        return None
+    if SPREADSHEETML_NS.encode() in text or b'<workbook' in text:
+        return 'xml'
+    if b'<html' in text or b'<table' in text or b'<!doctype html' in text:
+        return 'html'
+    return None
+
+
+class _TableParser(HTMLParser):
+    """Collect the cell text of the first <table> in an HTML document."""
+
+    def __init__(self):
+        super().__init__()
+        self.rows = []
+        self._depth = 0
+        self._done = False
+        self._row = None
+        self._cell = None
+
+    def handle_starttag(self, tag, attrs):
+        if self._done:
+            return
+        if tag == 'table':
+            self._depth += 1
+        elif self._depth == 1 and tag == 'tr':
+            self._row = []
+        elif self._depth == 1 and tag in ('td', 'th') and self._row is not None:
+            self._cell = []
+        elif tag == 'br' and self._cell is not None:
+            self._cell.append('\n')
+
+    def handle_endtag(self, tag):
+        if self._done:
+            return
+        if tag == 'table':
+            self._depth -= 1
+            if self._depth == 0:
+                self._done = True
+        elif self._depth == 1 and tag in ('td', 'th') and self._cell is not None:
+            self._row.append(' '.join(''.join(self._cell).split()))
+            self._cell = None
+        elif self._depth == 1 and tag == 'tr' and self._row is not None:
+            if self._row:
+                self.rows.append(self._row)
+            self._row = None
+
+    def handle_data(self, data):
+        if self._cell is not None:
+            self._cell.append(data)
+
+
+def _frame_from_rows(rows, header=None):
+    """Build a DataFrame from header + string rows with read_html-style type inference."""
+    if header is None:
+        if not rows:
+            return pd.DataFrame()
+        header, rows = rows[0], rows[1:]
+    width = len(header)
+    rows = [row + [''] * (width - len(row)) if len(row) < width else row[:width] for row in rows]
+    return TextParser([header] + rows, header=0).read()
+
+
+def _chunk_frames(rows, chunk_size):
+    """Group a row stream (header first) into DataFrames of at most chunk_size rows."""
+    rows = iter(rows)
+    header = None
+    for row in rows:
+        if any(value != '' for value in row):
+            header = row
+            break
+    if header is None:
+        return
+
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            # Release the raw rows before the consumer works on the frame
+            frame, chunk = _frame_from_rows(chunk, header), []
+            yield frame
+    if chunk:
+        frame, chunk = _frame_from_rows(chunk, header), []
+        yield frame
+
+
+def iter_html_rows(file_path):
+    """Rows of the first HTML table, parsed block by block."""
+    parser = _TableParser()
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(READ_BLOCK_BYTES), b''):
+            parser.feed(decoder.decode(block))
+            rows, parser.rows = parser.rows, []
+            yield from rows
+            if parser._done:
+                return
+    parser.feed(decoder.decode(b'', final=True))
+    parser.close()
+    yield from parser.rows
+
+
+def iter_spreadsheetml_rows(file_path):
+    """Non-empty rows of the first worksheet of an Excel 2003 XML workbook, parsed incrementally."""
+    ss = f'{{{SPREADSHEETML_NS}}}'
+    worksheets = 0
+    table = None
+    for event, elem in ET.iterparse(file_path, events=('start', 'end')):
+        if event == 'start':
+            if elem.tag == ss + 'Worksheet':
+                worksheets += 1
+            elif elem.tag == ss + 'Table' and worksheets == 1:
+                table = elem
+            continue
+        if elem.tag == ss + 'Worksheet':
+            return
+        if elem.tag != ss + 'Row' or table is None:
+            continue
+
+        values = []
+        for cell in elem.findall(ss + 'Cell'):
+            # ss:Index skips empty cells (1-based column number)
+            index = cell.get(ss + 'Index')
+            if index is not None:
+                values.extend([''] * (int(index) - 1 - len(values)))
+            data = cell.find(ss + 'Data')
+            values.append(''.join(data.itertext()).strip() if data is not None else '')
+        # Parsed rows are dropped so memory does not grow with the sheet
+        table.remove(elem)
+        if any(values):
+            yield values
+
+
+def _openpyxl_value(cell):
+    """Cell value converted the way pandas' openpyxl reader converts it."""
+    from openpyxl.cell.cell import TYPE_ERROR, TYPE_NUMERIC
+
+    if cell.value is None:
+        return ''
+    if cell.data_type == TYPE_ERROR:
+        return np.nan
+    if cell.data_type == TYPE_NUMERIC:
+        val = int(cell.value)
+        return val if val == cell.value else float(cell.value)
+    return cell.value
+
+
+def iter_xlsx_rows(file_path):
+    """Rows of the first worksheet, streamed in openpyxl read-only mode."""
+    from openpyxl import load_workbook
+
+    book = load_workbook(file_path, read_only=True, data_only=True, keep_links=False)
+    try:
+        sheet = book.worksheets[0]
+        sheet.reset_dimensions()
+        for row in sheet.rows:
+            values = [_openpyxl_value(cell) for cell in row]
+            while values and values[-1] == '':
+                values.pop()
+            if values:
+                yield values
+    finally:
+        book.close()
+
+
+def read_html_table(file_path):
+    return _frame_from_rows(list(iter_html_rows(file_path)))
+
+
+def read_spreadsheetml(file_path):
+    """Read the first worksheet of an Excel 2003 XML workbook."""
+    return _frame_from_rows(list(iter_spreadsheetml_rows(file_path)))
+
+
+def read_report(file_path):
+    """Load a report export into a DataFrame without converting it first."""
+    fmt = sniff_report_format(file_path)
+    if fmt == 'xlsx':
+        return pd.read_excel(file_path, engine='openpyxl')
+    if fmt == 'xls':
+        return pd.read_excel(file_path, engine='xlrd')
+    if fmt == 'html':
+        return read_html_table(file_path)
+    if fmt == 'xml':
+        return read_spreadsheetml(file_path)
+    raise UnrecognizedReportFormat(f"Unrecognised report format: {os.path.basename(file_path)}")
+
+
+def read_report_chunks(file_path, chunk_size=DEFAULT_CHUNK_ROWS):
+    """Yield a report export as DataFrames of at most chunk_size rows."""
+    fmt = sniff_report_format(file_path)
+    if fmt == 'xlsx':
+        yield from _chunk_frames(iter_xlsx_rows(file_path), chunk_size)
+    elif fmt == 'xls':
+        # BIFF sheets are capped at 65,536 rows and xlrd loads the sheet whole anyway
+        df = pd.read_excel(file_path, engine='xlrd')
+        for start in range(0, len(df), chunk_size):
+            yield df.iloc[start:start + chunk_size].copy()
+    elif fmt == 'html':
+        yield from _chunk_frames(iter_html_rows(file_path), chunk_size)
+    elif fmt == 'xml':
+        yield from _chunk_frames(iter_spreadsheetml_rows(file_path), chunk_size)
+    else:
+        raise UnrecognizedReportFormat(f"Unrecognised report format: {os.path.basename(file_path)}")
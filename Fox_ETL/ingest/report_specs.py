@@ -0,0 +1,479 @@
+"""
+Declarative specs for every report the ETL loads.
+
+A ReportSpec names the target table and lists its columns in write order,
+each with the report column it comes from and how the value is cleaned
+(COLUMN_KINDS), plus the dedup rule, the conflict handling on insert, rows
+that must have a value, and foreign keys resolved by lookup. ingest/pipeline.py
+compiles a spec into the vectorized read -> clean -> dedup -> COPY -> insert
+pipeline used both by File_Monitor (through the loader registry) and by
+load_reports.py for single files and backfills.
+
+To load a new report type, add a spec here; there is no script to copy.
+"""
+from dataclasses import dataclass
+
+from ingest.column_mapping import (
+    str_column, stripped_or_none_column, empty_to_none_column, datetime_column, bool_column
+)
+from ingest.master_logs import MASTER_LOG_COLUMNS
+
+# Conflict handling on insert
+ROW_HASH = 'row_hash'   # master logs: skip rows whose row_hash exists (ingest/master_logs.py)
+ANY = 'any'             # ON CONFLICT DO NOTHING against any unique constraint
+APPEND = None           # plain insert
+
+
+def _datetime_nat(df, col):
+    return datetime_column(df, col, null_to_none=False)
+
+
+# kind -> (column mapper, stage column type)
+COLUMN_KINDS = {
+    'str': (str_column, 'TEXT'),                    # str(value), NaN becomes 'nan' as the loaders always did
+    'stripped': (stripped_or_none_column, 'TEXT'),  # str(value).strip() or None
+    'text': (empty_to_none_column, 'TEXT'),         # value as read, NaN and blank strings become None
+    'datetime': (datetime_column, 'TIMESTAMP'),     # parsed, missing becomes None
+    'datetime_nat': (_datetime_nat, 'TIMESTAMP'),   # parsed, missing stays NaT
+    'bool': (bool_column, 'BOOLEAN'),
+}
+
+
+@dataclass(frozen=True)
+class Column:
+    name: str
+    kind: str = 'text'
+    source: str = None        # cleaned report column name, defaults to name
+    normalize: object = None  # value -> value, applied once per distinct non-null value
+    default: object = None    # replaces None after normalizing
+    fallback: str = None      # report column used (same kind) where source is missing
+    stage_only: bool = False  # only staged to resolve a lookup, not written to the table
+
+    @property
+    def source_column(self):
+        return self.source or self.name
+
+
+@dataclass(frozen=True)
+class Lookup:
+    """Foreign key written to `target`, resolved at insert time by joining the stage to `table` (alias l)."""
+    target: str
+    table: str
+    keys: tuple               # ((stage column, SQL expression over l), ...)
+    value: str = 'id'
+
+
+@dataclass(frozen=True)
+class ReportSpec:
+    report_type: str
+    table: str
+    columns: tuple
+    conflict: object = APPEND  # ROW_HASH, ANY, APPEND or a tuple of unique columns
+    dedup: bool = False        # drop_duplicates on the report columns before mapping
+    dedup_ignore: tuple = ()   # report columns left out of that comparison
+    required: tuple = ()       # rows with None in any of these columns are skipped
+    lookups: tuple = ()
+    data_source: str = None    # written to the report's data_source column before mapping
+    watermark: bool = False    # skip rows older than the table's end-time watermark (ingest/watermarks.py)
+    date_column: str = None    # business time of a row; its date range is announced to the aggregators
+    patterns: tuple = ()       # File_Monitor filename patterns
+    backfill: tuple = ()       # default backfill globs, relative to Fox_ETL
+    create_sql: str = None
+
+    def __post_init__(self):
+        unknown = [c.kind for c in self.columns if c.kind not in COLUMN_KINDS]
+        if unknown:
+            raise ValueError(f"{self.report_type}: unknown column kinds {unknown}")
+        # row_hash is computed over MASTER_LOG_COLUMNS in order, so the spec must match it exactly
+        if self.conflict == ROW_HASH and list(self.column_names) != MASTER_LOG_COLUMNS[self.table]:
+            raise ValueError(f"{self.report_type}: columns must match MASTER_LOG_COLUMNS['{self.table}']")
+
+    @property
+    def column_names(self):
+        return tuple(c.name for c in self.columns)
+
+    def stage_type(self, column):
+        return COLUMN_KINDS[column.kind][1]
+
+
+# ---------------------------------------------------------------------------
+# Value normalizers (testing constructor sheets are typed by hand)
+# ---------------------------------------------------------------------------
+_HEALTH_STATUS = {
+    'active': 'active',
+    'no response': 'no_response',
+    'no_response': 'no_response',
+    'maintenance': 'under_maintenance',
+    'under maintenance': 'under_maintenance',
+    'under_maintenance': 'under_maintenance',
+    'rma': 'RMA'
+}
+
+_EVENT_TYPES = {
+    'scheduled maintenance': 'Scheduled Maintenance',
+    'emergency maintenance': 'Emergency Maintenance',
+    'unknown outage': 'Unknown Outage',
+}
+
+_OCCURANCES = {'daily', 'weekly', 'monthly', 'quarterly', 'once'}
+
+
+def normalize_status(value):
+    return _HEALTH_STATUS.get(str(value).strip().lower())
+
+
+def normalize_tester_type(value):
+    value = str(value).strip().upper()
+    if value in ('LA', 'LEFT', 'LEFT SLOT'):
+        return 'LA Slot'
+    if value in ('RA', 'RIGHT', 'RIGHT SLOT'):
+        return 'RA Slot'
+    return value  # assume already valid
+
+
+def normalize_slot(value):
+    value = str(value).upper()
+    return value if value in ('LA', 'RA') else None
+
+
+def normalize_event_type(value):
+    return _EVENT_TYPES.get(str(value).lower())
+
+
+def normalize_occurance(value):
+    value = str(value)
+    return value.capitalize() if value.lower() in _OCCURANCES else None
+
+
+# ---------------------------------------------------------------------------
+# Master logs (wareconn exports)
+# ---------------------------------------------------------------------------
+WORKSTATION = ReportSpec(
+    report_type='workstation',
+    table='workstation_master_log',
+    columns=(
+        Column('sn', 'str'),
+        Column('pn', 'str'),
+        Column('customer_pn', 'stripped'),
+        Column('outbound_version', 'str'),
+        Column('workstation_name', 'str'),
+        Column('history_station_start_time', 'datetime_nat', fallback='history_station_end_time'),
+        Column('history_station_end_time', 'datetime'),
+        Column('hours', 'str'),
+        Column('service_flow', 'str'),
+        Column('model', 'str'),
+        Column('history_station_passing_status', 'str'),
+        Column('passing_station_method', 'str'),
+        Column('operator', 'str'),
+        Column('first_station_start_time', 'datetime'),
+        Column('data_source', 'str'),
+    ),
+    conflict=ROW_HASH,
+    dedup=True,
+    # 'day' and 'tat' are metadata columns that shouldn't be used for duplicate detection
+    dedup_ignore=('day', 'tat'),
+    data_source='workstation',
+    watermark=True,
+    date_column='history_station_end_time',
+    patterns=('workstationOutputReport*.xls', 'workstationOutputReport*.xlsx'),
+    backfill=('input/data log/workstationreport_xlsx/**/*.xlsx',),
+    create_sql="""
+        CREATE TABLE IF NOT EXISTS workstation_master_log (
+            id SERIAL PRIMARY KEY,
+            sn VARCHAR(255) NOT NULL,
+            pn VARCHAR(255),
+            model VARCHAR(255),
+            workstation_name VARCHAR(255) NOT NULL,
+            history_station_start_time TIMESTAMP NOT NULL,
+            history_station_end_time TIMESTAMP NOT NULL,
+            history_station_passing_status VARCHAR(255),
+            operator VARCHAR(255),
+            customer_pn VARCHAR(255),
+            outbound_version VARCHAR(255),
+            hours VARCHAR(255),
+            service_flow VARCHAR(255),
+            passing_station_method VARCHAR(255),
+            first_station_start_time TIMESTAMP,
+            data_source VARCHAR(50) NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            row_hash UUID
+        )
+    """
+)
+
+TESTBOARD = ReportSpec(
+    report_type='testboard',
+    table='testboard_master_log',
+    columns=(
+        Column('sn', 'str'),
+        Column('pn', 'str'),
+        Column('model', 'str'),
+        Column('work_station_process', 'stripped'),
+        Column('baseboard_sn', 'stripped'),
+        Column('baseboard_pn', 'stripped'),
+        Column('workstation_name', 'str'),
+        Column('history_station_start_time', 'datetime_nat'),
+        Column('history_station_end_time', 'datetime_nat'),
+        Column('history_station_passing_status', 'str'),
+        Column('operator', 'str'),
+        Column('failure_reasons', 'stripped'),
+        Column('failure_note', 'stripped'),
+        Column('failure_code', 'stripped'),
+        Column('diag_version', 'stripped'),
+        Column('fixture_no', 'stripped'),
+        Column('data_source', 'str'),
+    ),
+    conflict=ROW_HASH,
+    dedup=True,
+    dedup_ignore=('number_of_times_baseboard_is_used',),
+    data_source='testboard',
+    watermark=True,
+    date_column='history_station_end_time',
+    patterns=('Test board record report*.xls', 'Test board record report*.xlsx'),
+    backfill=('input/data log/testboardrecord_xlsx/**/*.xlsx',),
+    create_sql="""
+        CREATE TABLE IF NOT EXISTS testboard_master_log (
+            id SERIAL PRIMARY KEY,
+            sn VARCHAR(255) NOT NULL,
+            pn VARCHAR(255),
+            model VARCHAR(255),
+            work_station_process VARCHAR(255),
+            baseboard_sn VARCHAR(255),
+            baseboard_pn VARCHAR(255),
+            workstation_name VARCHAR(255) NOT NULL,
+            history_station_start_time TIMESTAMP NOT NULL,
+            history_station_end_time TIMESTAMP NOT NULL,
+            history_station_passing_status VARCHAR(255),
+            operator VARCHAR(255),
+            failure_reasons TEXT,
+            failure_note TEXT,
+            failure_code VARCHAR(255),
+            diag_version VARCHAR(255),
+            fixture_no VARCHAR(255),
+            data_source VARCHAR(50) NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            row_hash UUID
+        )
+    """
+)
+
+SNFN = ReportSpec(
+    report_type='snfn',
+    table='snfn_master_log',
+    columns=(
+        Column('workstation_name', 'str'),
+        Column('fixture_no', 'stripped'),
+        Column('error_code', 'stripped'),
+        Column('error_disc', 'stripped'),
+        Column('sn', 'str'),
+        Column('pn', 'str'),
+        Column('model', 'stripped'),
+        Column('history_station_start_time', 'datetime_nat'),
+        Column('history_station_end_time', 'datetime_nat'),
+        Column('data_source', 'str'),
+    ),
+    conflict=ROW_HASH,
+    dedup=True,
+    dedup_ignore=('number_of_times_baseboard_is_used',),
+    data_source='snfn',
+    watermark=True,
+    date_column='history_station_end_time',
+    patterns=('snfnReport*.xls', 'snfnReport*.xlsx'),
+    backfill=('input/snfnrecord.xlsx',),
+    create_sql="""
+        CREATE TABLE IF NOT EXISTS snfn_master_log (
+            id SERIAL PRIMARY KEY,
+            workstation_name VARCHAR(255) NOT NULL,
+            fixture_no VARCHAR(255),
+            error_code VARCHAR(255),
+            error_disc TEXT,
+            sn VARCHAR(255) NOT NULL,
+            pn VARCHAR(255),
+            model VARCHAR(255),
+            history_station_start_time TIMESTAMP NOT NULL,
+            history_station_end_time TIMESTAMP NOT NULL,
+            data_source VARCHAR(50) NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            row_hash UUID
+        )
+    """
+)
+
+# ---------------------------------------------------------------------------
+# Testing constructors (hand-maintained fixture sheets)
+# ---------------------------------------------------------------------------
+FIXTURE_BY_NAME = Lookup('fixture_id', 'fixtures', (('fixture_name', 'l.fixture_name'),))
+
+FIXTURES = ReportSpec(
+    report_type='fixtures',
+    table='fixtures',
+    columns=(
+        Column('fixture_name'),
+        Column('gen_type'),
+        Column('rack'),
+        Column('fixture_sn'),
+        Column('test_type'),
+        Column('ip_address'),
+        Column('mac_address'),
+        Column('creator'),
+    ),
+    conflict=('fixture_name',),
+    backfill=('testing_constructors/input/fixtures/**/*.xlsx',),
+    create_sql="""
+        CREATE TABLE IF NOT EXISTS fixtures (
+            id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+            fixture_name VARCHAR(32) UNIQUE NOT NULL,
+            gen_type VARCHAR(32) NOT NULL
+                CHECK (gen_type IN ('Gen3 B Tester', 'Gen5 B Tester')),
+            rack VARCHAR(32),
+            fixture_sn VARCHAR(32),
+            test_type VARCHAR(32)
+                CHECK (test_type IN ('Refurbish', 'Sort', 'Debug')),
+            ip_address VARCHAR(16),
+            mac_address VARCHAR(17),
+            create_date TIMESTAMPTZ DEFAULT NOW(),
+            creator VARCHAR(32)
+        )
+    """
+)
+
+FIXTURE_PARTS = ReportSpec(
+    report_type='fixture_parts',
+    table='fixture_parts',
+    columns=(
+        Column('tester_type', normalize=normalize_tester_type),
+        Column('fixture_name'),
+        Column('creator', default='etl'),
+    ),
+    conflict=ANY,
+    required=('fixture_name', 'tester_type'),
+    lookups=(Lookup('parent_fixture_id', 'fixtures', (('fixture_name', 'l.fixture_name'),)),),
+    backfill=('testing_constructors/input/fixture_parts/**/*.xlsx',),
+    create_sql="""
+        CREATE TABLE IF NOT EXISTS fixture_parts (
+            id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+            parent_fixture_id UUID NOT NULL REFERENCES fixtures(id),
+            tester_type VARCHAR(32) NOT NULL
+                CHECK (tester_type IN ('LA Slot', 'RA Slot')),
+            fixture_name VARCHAR(32),
+            gen_type VARCHAR(32),
+            rack VARCHAR(32),
+            fixture_sn VARCHAR(32),
+            test_type VARCHAR(32),
+            ip_address VARCHAR(16),
+            mac_address VARCHAR(17),
+            create_date TIMESTAMPTZ DEFAULT NOW(),
+            creator VARCHAR(32)
+        )
+    """
+)
+
+HEALTH = ReportSpec(
+    report_type='health',
+    table='health',
+    columns=(
+        Column('fixture_name', stage_only=True),
+        Column('status', normalize=normalize_status),
+        Column('comments'),
+        Column('creator', default='etl'),
+    ),
+    required=('fixture_name', 'status'),
+    lookups=(FIXTURE_BY_NAME,),
+    backfill=('testing_constructors/input/health/**/*.xlsx',),
+    create_sql="""
+        CREATE TABLE IF NOT EXISTS health (
+            id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+            fixture_id UUID NOT NULL REFERENCES fixtures(id),
+            status VARCHAR(32)
+                CHECK (status IN ('active', 'no_response', 'under_maintenance', 'RMA')),
+            comments VARCHAR(256),
+            creator VARCHAR(32),
+            create_date TIMESTAMPTZ DEFAULT NOW()
+        )
+    """
+)
+
+USAGE = ReportSpec(
+    report_type='usage',
+    table='usage',
+    columns=(
+        Column('fixture_name', stage_only=True),
+        Column('test_slot', normalize=normalize_slot),
+        Column('test_station'),
+        Column('test_type'),
+        Column('gpu_pn'),
+        Column('gpu_sn'),
+        Column('log_path'),
+        Column('creator', default='etl'),
+    ),
+    required=('fixture_name', 'test_slot'),
+    lookups=(Lookup('fixture_part_id', 'fixture_parts', (
+        ('fixture_name', 'l.fixture_name'),
+        ('test_slot', "CASE WHEN l.tester_type LIKE '%LA%' THEN 'LA' ELSE 'RA' END"),
+    )),),
+    backfill=('testing_constructors/input/usage/**/*.xlsx',),
+    create_sql="""
+        CREATE TABLE IF NOT EXISTS usage (
+            id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+            fixture_part_id UUID NOT NULL REFERENCES fixture_parts(id),
+            test_slot VARCHAR(16) NOT NULL CHECK (test_slot IN ('LA', 'RA')),
+            test_station VARCHAR(32),
+            test_type VARCHAR(32) CHECK (test_type IN ('Refurbish', 'Sort', 'Debug')),
+            gpu_pn VARCHAR(32),
+            gpu_sn VARCHAR(32),
+            log_path VARCHAR(256),
+            creator VARCHAR(32),
+            create_date TIMESTAMPTZ DEFAULT NOW()
+        )
+    """
+)
+
+MAINTENANCE = ReportSpec(
+    report_type='maintenance',
+    table='fixture_maintenance',
+    columns=(
+        Column('fixture_name', stage_only=True),
+        Column('event_type', normalize=normalize_event_type),
+        Column('start_date_time', 'datetime'),
+        Column('end_date_time', 'datetime'),
+        Column('occurance', normalize=normalize_occurance),
+        Column('comments'),
+        Column('is_completed', 'bool'),
+        Column('creator', default='etl'),
+    ),
+    required=('fixture_name', 'event_type'),
+    lookups=(FIXTURE_BY_NAME,),
+    backfill=('testing_constructors/input/fixture_maintenance/**/*.xlsx',),
+    create_sql="""
+        CREATE TABLE IF NOT EXISTS fixture_maintenance (
+            id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+            fixture_id UUID NOT NULL REFERENCES fixtures(id),
+            event_type VARCHAR(32) CHECK (event_type IN ('Scheduled Maintenance', 'Emergency Maintenance', 'Unknown Outage')),
+            start_date_time TIMESTAMPTZ,
+            end_date_time TIMESTAMPTZ,
+            occurance VARCHAR(32) CHECK (occurance IN ('Daily', 'Weekly', 'Monthly', 'Quarterly', 'Once')),
+            comments VARCHAR(256),
+            is_completed BOOLEAN DEFAULT FALSE,
+            creator VARCHAR(32),
+            create_date TIMESTAMPTZ DEFAULT NOW()
+        )
+    """
+)
+
+REPORT_SPECS = {spec.report_type: spec for spec in (
+    WORKSTATION, TESTBOARD, SNFN, FIXTURES, FIXTURE_PARTS, HEALTH, USAGE, MAINTENANCE
+)}
+
+
+def get_spec(report_type):
+    return REPORT_SPECS[report_type]
+
+
+def spec_for_table(table):
+    for spec in REPORT_SPECS.values():
+        if spec.table == table:
+            return spec
+    raise KeyError(table)
@@ -0,0 +1,156 @@
+"""
+snfn_aggregate_daily from testboard_master_log in bulk.
+
+Every failing testboard row becomes one row keyed by (sn, fixture_no, model,
+workstation_name, error_code, history_station_end_time). One
+INSERT ... SELECT DISTINCT ON ... ON CONFLICT resolves duplicate keys inside
+the statement, so a whole set of dates (or all history) is one round trip.
+
+If the bulk statement fails (e.g. a row with a NULL key column), it is
+rolled back to a savepoint and retried one date at a time; only a date that
+still fails is inserted row by row, each row under its own savepoint, and
+the rows it cannot insert are reported and skipped. Rows already written in
+the transaction are never thrown away.
+"""
+import psycopg2
+
+SNFN_TABLE = 'snfn_aggregate_daily'
+SNFN_KEY = ('sn', 'fixture_no', 'model', 'workstation_name', 'error_code', 'history_station_end_time')
+
+CREATE_TABLE_SQL = f'''
+CREATE TABLE IF NOT EXISTS {SNFN_TABLE} (
+    fixture_no TEXT NOT NULL,
+    workstation_name TEXT NOT NULL,
+    sn TEXT NOT NULL,
+    pn TEXT,
+    model TEXT NOT NULL,
+    error_code TEXT NOT NULL,
+    error_disc TEXT,
+    history_station_end_time TIMESTAMP NOT NULL,
+    PRIMARY KEY ({', '.join(SNFN_KEY)})
+);
+'''
+
+# One row per key; of duplicates, the one with a description and part number wins
+SELECT_SQL = '''
+SELECT DISTINCT ON (sn, fixture_no, model, workstation_name, CONCAT('EC', RIGHT(failure_reasons, 3)), history_station_end_time)
+    fixture_no,
+    workstation_name,
+    sn,
+    pn,
+    model,
+    CONCAT('EC', RIGHT(failure_reasons, 3)) AS error_code,
+    failure_note AS error_disc,
+    history_station_end_time
+FROM testboard_master_log
+{dates_join}
+WHERE history_station_end_time IS NOT NULL
+AND history_station_passing_status = 'Fail'
+ORDER BY sn, fixture_no, model, workstation_name, CONCAT('EC', RIGHT(failure_reasons, 3)), history_station_end_time,
+    failure_note NULLS LAST, pn NULLS LAST
+'''
+
+DATES_JOIN = '''
+JOIN unnest(%s::date[]) AS d(day)
+    ON history_station_end_time >= d.day
+    AND history_station_end_time < d.day + 1
+'''
+
+UPSERT_SQL = f'''
+INSERT INTO {SNFN_TABLE} (
+    fixture_no, workstation_name, sn, pn, model, error_code, error_disc, history_station_end_time
+)
+{{select}}
+ON CONFLICT ({', '.join(SNFN_KEY)})
+DO UPDATE SET
+    error_disc = EXCLUDED.error_disc,
+    pn = EXCLUDED.pn
+WHERE ({SNFN_TABLE}.error_disc, {SNFN_TABLE}.pn) IS DISTINCT FROM (EXCLUDED.error_disc, EXCLUDED.pn);
+'''
+
+
+def _select(dates):
+    if dates is None:
+        return SELECT_SQL.format(dates_join=''), ()
+    return SELECT_SQL.format(dates_join=DATES_JOIN), (list(dates),)
+
+
+def _bulk(cur, dates):
+    select, params = _select(dates)
+    cur.execute(UPSERT_SQL.format(select=select), params)
+    return cur.rowcount
+
+
+def _try(cur, name, func, *args):
+    """func(*args) under a savepoint; (result, None) or (None, error) after rolling back to it."""
+    cur.execute(f"SAVEPOINT {name}")
+    try:
+        result = func(*args)
+    except psycopg2.Error as e:
+        cur.execute(f"ROLLBACK TO SAVEPOINT {name}")
+        return None, e
+    cur.execute(f"RELEASE SAVEPOINT {name}")
+    return result, None
+
+
+def _insert_row(cur, row):
+    cur.execute(UPSERT_SQL.format(select='VALUES (%s, %s, %s, %s, %s, %s, %s, %s)'), row)
+    return cur.rowcount
+
+
+def _row_by_row(cur, day, log):
+    select, params = _select([day])
+    cur.execute(select, params)
+    written = skipped = 0
+    for row in cur.fetchall():
+        count, error = _try(cur, 'snfn_row', _insert_row, cur, row)
+        if error is not None:
+            log(f"Skipping SNFN row {row}: {str(error).strip()}")
+            skipped += 1
+        else:
+            written += count
+    return written, skipped
+
+
+def _fail_dates(cur):
+    cur.execute('''
+        SELECT DISTINCT DATE(history_station_end_time) FROM testboard_master_log
+        WHERE history_station_end_time IS NOT NULL AND history_station_passing_status = 'Fail'
+        ORDER BY 1
+    ''')
+    return [row[0] for row in cur.fetchall()]
+
+
+def upsert_snfn(conn, dates=None, log=print):
+    """
+    Upsert the failures of dates (all history when None). Returns
+    (rows written, rows skipped); the caller commits.
+    """
+    with conn.cursor() as cur:
+        written, error = _try(cur, 'snfn_bulk', _bulk, cur, dates)
+        if error is None:
+            return written, 0
+        log(f"Bulk SNFN upsert failed ({str(error).strip()}), retrying one date at a time")
+
+        written = skipped = 0
+        for day in (dates if dates is not None else _fail_dates(cur)):
+            count, error = _try(cur, 'snfn_date', _bulk, cur, [day])
+            if error is None:
+                written += count
+                continue
+            log(f"SNFN upsert for {day} failed ({str(error).strip()}), inserting it row by row")
+            day_written, day_skipped = _row_by_row(cur, day, log)
+            written += day_written
+            skipped += day_skipped
+        return written, skipped
+
+
+def rebuild_snfn(conn, log=print):
+    """
+    Replace every row with a fresh aggregate of all history in one
+    transaction, so readers see the old rows until it commits. Returns
+    (rows written, rows skipped); the caller commits.
+    """
+    with conn.cursor() as cur:
+        cur.execute(f"DELETE FROM {SNFN_TABLE}")
+    return upsert_snfn(conn, None, log)
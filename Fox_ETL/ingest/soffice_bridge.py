@@ -0,0 +1,106 @@
+"""
+UNO bridge to one persistent soffice, run by ingest/converter_service.py.
+
+The `uno` module only exists in LibreOffice's own Python (or a system Python
+with python3-uno), not in the interpreter the ETL scripts run under, so each
+converter worker starts this script under such a Python. It launches a
+headless soffice with a private profile, then converts the jobs it reads from
+stdin, one JSON line each ({"src": ..., "dst": ...}), answering with one JSON
+line ({"ok": true} or {"ok": false, "error": ...}). The first line it writes
+is {"ready": true, "pid": <soffice pid>} once soffice accepts connections.
+Closing stdin stops soffice.
+
+Only the standard library and uno are imported here.
+
+    <python with uno> soffice_bridge.py SOFFICE PROFILE_URL
+"""
+import json
+import os
+import subprocess
+import sys
+import time
+
+import uno
+
+STARTUP_TIMEOUT = 60
+XLSX_FILTER = 'Calc MS Excel 2007 XML'
+
+
+def _property(name, value):
+    prop = uno.createUnoStruct('com.sun.star.beans.PropertyValue')
+    prop.Name = name
+    prop.Value = value
+    return prop
+
+
+def _reply(**message):
+    sys.stdout.write(json.dumps(message) + '\n')
+    sys.stdout.flush()
+
+
+def start_soffice(soffice, profile_url):
+    pipe_name = f'fox_soffice_{os.getpid()}'
+    proc = subprocess.Popen(
+        [
+            soffice, f'-env:UserInstallation={profile_url}',
+            '--headless', '--invisible', '--nologo', '--norestore', '--nodefault',
+            f'--accept=pipe,name={pipe_name};urp;StarOffice.ComponentContext'
+        ],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    local = uno.getComponentContext()
+    resolver = local.ServiceManager.createInstanceWithContext('com.sun.star.bridge.UnoUrlResolver', local)
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while True:
+        try:
+            ctx = resolver.resolve(f'uno:pipe,name={pipe_name};urp;StarOffice.ComponentContext')
+            return proc, ctx.ServiceManager.createInstanceWithContext('com.sun.star.frame.Desktop', ctx)
+        except Exception:
+            if proc.poll() is not None:
+                raise RuntimeError("soffice exited during startup")
+            if time.monotonic() > deadline:
+                proc.kill()
+                raise RuntimeError("soffice did not accept connections")
+            time.sleep(0.5)
+
+
+def convert(desktop, src, dst):
+    doc = desktop.loadComponentFromURL(
+        uno.systemPathToFileUrl(os.path.abspath(src)), '_blank', 0,
+        (_property('Hidden', True), _property('ReadOnly', True))
+    )
+    if doc is None:
+        raise RuntimeError(f"soffice could not open {os.path.basename(src)}")
+    try:
+        doc.storeToURL(uno.systemPathToFileUrl(os.path.abspath(dst)), (_property('FilterName', XLSX_FILTER),))
+    finally:
+        doc.close(True)
+
+
+def main(soffice, profile_url):
+    try:
+        proc, desktop = start_soffice(soffice, profile_url)
+    except Exception as e:
+        _reply(ready=False, error=str(e))
+        return 1
+    _reply(ready=True, pid=proc.pid)
+    try:
+        for line in sys.stdin:
+            job = json.loads(line)
+            try:
+                convert(desktop, job['src'], job['dst'])
+                _reply(ok=True)
+            except Exception as e:
+                _reply(ok=False, error=str(e))
+    finally:
+        try:
+            desktop.terminate()
+        except Exception:
+            pass
+        if proc.poll() is None:
+            proc.kill()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(*sys.argv[1:3]))
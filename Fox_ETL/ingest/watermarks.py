@@ -0,0 +1,121 @@
+"""
+Per-source high-water marks on history_station_end_time.
+
+Each wareconn export covers a rolling window, so most of a new file's rows
+are older than anything it can add. The loaders keep, per master log table
+and data_source, the latest history_station_end_time they have committed.
+Rows ending before that mark minus an overlap are dropped as soon as a chunk
+is read, before any dedup work; only the overlap band (and rows without an
+end time) go through the exact row_hash check.
+
+The overlap must cover how late a row can still show up in an export
+(WATERMARK['overlap_hours'] in config.py, 24 hours by default). Historical
+exports older than the mark are loaded with the upload_*_master_log.py
+backfill scripts, which do not use watermarks; that is also the only way a
+row later than the overlap reaches the master log and, through the dates
+the backfill marks dirty, the recent aggregates.
+"""
+import threading
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from ingest.column_mapping import parse_datetime_series
+
+WATERMARK_TABLE = 'ingest_watermarks'
+WATERMARK_COLUMN = 'history_station_end_time'
+DEFAULT_OVERLAP_HOURS = 24
+
+_ready = set()
+_lock = threading.Lock()
+
+
+def watermark_settings():
+    try:
+        import config
+        return getattr(config, 'WATERMARK', {})
+    except ImportError:
+        return {}
+
+
+def ensure_watermarks(conn):
+    key = conn.dsn
+    with _lock:
+        if key in _ready:
+            return
+        with conn.cursor() as cur:
+            cur.execute(f"""
+                CREATE TABLE IF NOT EXISTS {WATERMARK_TABLE} (
+                    table_name VARCHAR(100) NOT NULL,
+                    data_source VARCHAR(50) NOT NULL,
+                    high_water TIMESTAMP NOT NULL,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    PRIMARY KEY (table_name, data_source)
+                )
+            """)
+        conn.commit()
+        _ready.add(key)
+
+
+class Watermark:
+    """The mark of one (table, data_source) for the duration of a single load."""
+
+    def __init__(self, table, source, high_water=None, overlap=timedelta(hours=DEFAULT_OVERLAP_HOURS), enabled=True):
+        self.table = table
+        self.source = source
+        self.high_water = high_water
+        self.overlap = overlap
+        self.enabled = enabled
+        self.cutoff = high_water - overlap if (enabled and high_water is not None) else None
+        self.latest = None
+        self.dropped = 0
+
+    def filter(self, df, col=WATERMARK_COLUMN):
+        """Drop rows of df ending before the cutoff and note the latest end time seen."""
+        if not self.enabled or col not in df.columns or df.empty:
+            return df
+        try:
+            end_time = parse_datetime_series(df[col])
+        except (TypeError, ValueError):
+            # Leave unparseable chunks to the mapping step, which reports the bad value
+            return df
+        latest = end_time.max()
+        if pd.notna(latest) and (self.latest is None or latest > self.latest):
+            self.latest = latest.to_pydatetime()
+        if self.cutoff is None:
+            return df
+        # NaT compares False, so rows without an end time are kept
+        old = (end_time < self.cutoff).to_numpy()
+        if not old.any():
+            return df
+        self.dropped += int(old.sum())
+        return df[~old]
+
+    def advance(self, conn):
+        """Raise the stored mark to the latest end time loaded. Part of the caller's transaction."""
+        if not self.enabled or self.latest is None:
+            return
+        # A bad future timestamp must not push the mark past rows still to come
+        high_water = min(self.latest, datetime.now())
+        with conn.cursor() as cur:
+            cur.execute(f"""
+                INSERT INTO {WATERMARK_TABLE} (table_name, data_source, high_water)
+                VALUES (%s, %s, %s)
+                ON CONFLICT (table_name, data_source) DO UPDATE SET
+                    high_water = GREATEST({WATERMARK_TABLE}.high_water, EXCLUDED.high_water),
+                    updated_at = CURRENT_TIMESTAMP
+            """, (self.table, self.source, high_water))
+
+
+def load_watermark(conn, table, source):
+    """Watermark for table/source with the configured overlap (disabled by WATERMARK['enabled'] = False)."""
+    settings = watermark_settings()
+    overlap = timedelta(hours=settings.get('overlap_hours', DEFAULT_OVERLAP_HOURS))
+    if not settings.get('enabled', True):
+        return Watermark(table, source, overlap=overlap, enabled=False)
+    ensure_watermarks(conn)
+    with conn.cursor() as cur:
+        cur.execute(f"SELECT high_water FROM {WATERMARK_TABLE} WHERE table_name = %s AND data_source = %s",
+                    (table, source))
+        row = cur.fetchone()
+    return Watermark(table, source, row[0] if row else None, overlap)
@@ -0,0 +1,220 @@
+"""
+Durable work queue of report files for File_Monitor.
+
+Settled files are recorded in a local SQLite database (WAL mode, stdlib
+only, so it keeps working while PostgreSQL is down) and consumed by worker
+lanes, one or more per report type. A slow testboard import therefore never
+holds up the snfn file behind it, and a backlog of several report types is
+cleared in parallel.
+
+A job is pending until a lane claims it (running) and then either done,
+retried with exponential backoff, or failed after max_attempts. Jobs left
+running by a monitor that died are requeued on start, so a restart picks up
+where it stopped. A failed file is enqueued again once it changes on disk
+(a new size/mtime signature).
+
+    python schedulers/File_Monitor.py --status
+"""
+import os
+import time
+import sqlite3
+import threading
+
+DEFAULT_QUEUE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'cache', 'file_queue.db')
+DEFAULT_MAX_ATTEMPTS = 5
+DEFAULT_RETRY_SECONDS = 30.0
+DEFAULT_MAX_RETRY_SECONDS = 900.0
+
+PENDING, RUNNING, DONE, FAILED, GONE = 'pending', 'running', 'done', 'failed', 'gone'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS file_jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    path TEXT NOT NULL,
+    report_type TEXT NOT NULL,
+    size INTEGER,
+    mtime_ns INTEGER,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    not_before REAL NOT NULL DEFAULT 0,
+    enqueued_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    last_error TEXT
+);
+CREATE INDEX IF NOT EXISTS file_jobs_claim_idx ON file_jobs (report_type, status, not_before, id);
+CREATE INDEX IF NOT EXISTS file_jobs_path_idx ON file_jobs (path, status);
+"""
+
+
+def retry_delay(attempts, base=DEFAULT_RETRY_SECONDS, cap=DEFAULT_MAX_RETRY_SECONDS):
+    """Seconds before retry number `attempts` (1-based): base, 2*base, 4*base ... capped."""
+    return min(cap, base * 2 ** max(attempts - 1, 0))
+
+
+class WorkQueue:
+    """SQLite-backed queue of (path, report_type) jobs shared by the watcher and its lanes."""
+
+    def __init__(self, path=DEFAULT_QUEUE_PATH, max_attempts=DEFAULT_MAX_ATTEMPTS,
+                 retry_seconds=DEFAULT_RETRY_SECONDS, max_retry_seconds=DEFAULT_MAX_RETRY_SECONDS):
+        self.path = path
+        self.max_attempts = max_attempts
+        self.retry_seconds = retry_seconds
+        self.max_retry_seconds = max_retry_seconds
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        # One connection shared under a lock; every statement autocommits
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        self._db.executescript(SCHEMA)
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def recover(self):
+        """Requeue jobs a previous monitor left running. Returns the number requeued."""
+        with self._lock:
+            cur = self._db.execute(
+                "UPDATE file_jobs SET status = ?, started_at = NULL WHERE status = ?", (PENDING, RUNNING)
+            )
+            self._wakeup.notify_all()
+            return cur.rowcount
+
+    def enqueue(self, path, report_type, signature):
+        """
+        Queue a settled file unless it is already pending/running, or already
+        failed with this exact signature. Returns True if a job was added.
+        """
+        size, mtime_ns = signature
+        with self._lock:
+            active = self._db.execute("""
+                SELECT 1 FROM file_jobs
+                WHERE path = ? AND (status IN (?, ?) OR (status = ? AND size = ? AND mtime_ns = ?))
+                LIMIT 1
+            """, (path, PENDING, RUNNING, FAILED, size, mtime_ns)).fetchone()
+            if active:
+                return False
+            self._db.execute("""
+                INSERT INTO file_jobs (path, report_type, size, mtime_ns, enqueued_at)
+                VALUES (?, ?, ?, ?, ?)
+            """, (path, report_type, size, mtime_ns, time.time()))
+            self._wakeup.notify_all()
+            return True
+
+    def claim(self, report_type, timeout=None):
+        """
+        Claim the oldest due job of report_type, waiting up to timeout seconds
+        for one. Returns (id, path, attempts) or None.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._lock:
+            while True:
+                now = time.time()
+                row = self._db.execute("""
+                    SELECT id, path, attempts, not_before FROM file_jobs
+                    WHERE report_type = ? AND status = ?
+                    ORDER BY not_before > ?, CASE WHEN not_before <= ? THEN id ELSE not_before END
+                    LIMIT 1
+                """, (report_type, PENDING, now, now)).fetchone()
+                if row and row[3] <= now:
+                    self._db.execute(
+                        "UPDATE file_jobs SET status = ?, started_at = ?, attempts = attempts + 1 WHERE id = ?",
+                        (RUNNING, now, row[0])
+                    )
+                    return row[0], row[1], row[2] + 1
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return None
+                # Sleep until woken by enqueue, the next backoff expiring, or the timeout
+                wait = remaining
+                if row:
+                    wait = row[3] - now if wait is None else min(wait, row[3] - now)
+                self._wakeup.wait(wait)
+
+    def complete(self, job_id):
+        self._finish(job_id, DONE)
+
+    def gone(self, job_id):
+        """The file disappeared before it was processed (e.g. loaded under another name)."""
+        self._finish(job_id, GONE)
+
+    def fail(self, job_id, attempts, error=None):
+        """Schedule a retry with backoff, or mark the job failed after max_attempts. Returns the delay or None."""
+        if attempts >= self.max_attempts:
+            self._finish(job_id, FAILED, error)
+            return None
+        delay = retry_delay(attempts, self.retry_seconds, self.max_retry_seconds)
+        with self._lock:
+            self._db.execute(
+                "UPDATE file_jobs SET status = ?, not_before = ?, last_error = ? WHERE id = ?",
+                (PENDING, time.time() + delay, error, job_id)
+            )
+            self._wakeup.notify_all()
+        return delay
+
+    def _finish(self, job_id, status, error=None):
+        with self._lock:
+            self._db.execute(
+                "UPDATE file_jobs SET status = ?, finished_at = ?, last_error = COALESCE(?, last_error) WHERE id = ?",
+                (status, time.time(), error, job_id)
+            )
+
+    def stats(self, now=None):
+        """
+        {report_type: {'pending', 'running', 'failed', 'retrying', 'oldest_age'}}
+        where oldest_age is the age in seconds of the oldest unfinished job.
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            rows = self._db.execute("""
+                SELECT report_type,
+                       SUM(status = ?), SUM(status = ?), SUM(status = ?),
+                       SUM(status = ? AND attempts > 0),
+                       MIN(CASE WHEN status IN (?, ?) THEN enqueued_at END)
+                FROM file_jobs
+                GROUP BY report_type
+                ORDER BY report_type
+            """, (PENDING, RUNNING, FAILED, PENDING, PENDING, RUNNING)).fetchall()
+        return {
+            report_type: {
+                'pending': pending or 0,
+                'running': running or 0,
+                'failed': failed or 0,
+                'retrying': retrying or 0,
+                'oldest_age': now - oldest if oldest else 0.0,
+            }
+            for report_type, pending, running, failed, retrying, oldest in rows
+        }
+
+    def failed_jobs(self, limit=20):
+        """(path, report_type, attempts, last_error) of the most recently failed jobs."""
+        with self._lock:
+            return self._db.execute("""
+                SELECT path, report_type, attempts, last_error FROM file_jobs
+                WHERE status = ? ORDER BY finished_at DESC LIMIT ?
+            """, (FAILED, limit)).fetchall()
+
+    def prune(self, older_than_days=30):
+        """Delete finished jobs older than older_than_days. Returns rows deleted."""
+        cutoff = time.time() - older_than_days * 86400
+        with self._lock:
+            return self._db.execute(
+                "DELETE FROM file_jobs WHERE status IN (?, ?, ?) AND finished_at < ?",
+                (DONE, GONE, FAILED, cutoff)
+            ).rowcount
+
+
+def format_stats(stats, sep='\n'):
+    """One entry per report type (joined by sep), for logs and --status."""
+    if not stats:
+        return "Queue empty"
+    lines = []
+    for report_type, s in stats.items():
+        lines.append(
+            f"{report_type}: {s['pending']} pending ({s['retrying']} retrying), {s['running']} running, "
+            f"{s['failed']} failed, oldest {s['oldest_age']:.0f}s"
+        )
+    return sep.join(lines)
@@ -0,0 +1,153 @@
+"""
+Hourly base rollup of workstation_master_log.
+
+One row per (date, hour, pn, model, workstation_name, service_flow,
+passing_status) with the number of master log rows, built in one scan of
+the dirty dates. P-chart, station hourly counts, packing, sort-test and the
+TPY station yields are all sums over it, so a cycle scans the master log
+once instead of once per aggregate. Filters such as
+service_flow NOT IN ('NC Sort', 'RO') are applied by each aggregate, so the
+rollup keeps every row.
+
+The rollup is itself a consumer of workstation_master_log. Refreshing a
+date marks it dirty on ROLLUP_TABLE in the same transaction, so the
+aggregates claim dates from the rollup (claim_rollup_dates) and never read
+a date before it was refreshed. The first refresh builds every date, and
+so does an aggregate that finds the rollup empty (ensure_rollup).
+
+    python aggregators/recent/workstation/aggregate_workstation_rollup.py [--rebuild]
+"""
+import threading
+
+from ingest.dirty_partitions import (
+    DEFAULT_BOOTSTRAP_DAYS, register_consumer, claim_dirty_dates, unregister_consumer, mark_dirty
+)
+
+ROLLUP_TABLE = 'workstation_rollup_hourly'
+SOURCE_TABLE = 'workstation_master_log'
+CONSUMER = 'aggregate_workstation_rollup'
+
+_ready = set()
+_lock = threading.Lock()
+
+ROLLUP_SELECT = f"""
+    SELECT
+        DATE(history_station_end_time) AS date,
+        EXTRACT(HOUR FROM history_station_end_time)::int AS hour,
+        pn,
+        model,
+        workstation_name,
+        service_flow,
+        history_station_passing_status AS passing_status,
+        COUNT(*) AS part_count
+    FROM {SOURCE_TABLE}
+    {{dates_join}}
+    WHERE history_station_end_time IS NOT NULL
+    GROUP BY 1, 2, 3, 4, 5, 6, 7
+"""
+
+DATES_JOIN = """
+    JOIN unnest(%s::date[]) AS d(day)
+        ON history_station_end_time >= d.day
+        AND history_station_end_time < d.day + 1
+"""
+
+
+def _create_rollup(conn):
+    """Create the rollup table once per process. Commits."""
+    key = conn.dsn
+    with _lock:
+        if key in _ready:
+            return
+        with conn.cursor() as cur:
+            cur.execute(f"""
+                CREATE TABLE IF NOT EXISTS {ROLLUP_TABLE} (
+                    date DATE NOT NULL,
+                    hour INTEGER NOT NULL,
+                    pn VARCHAR(255),
+                    model VARCHAR(255),
+                    workstation_name VARCHAR(255) NOT NULL,
+                    service_flow VARCHAR(255),
+                    passing_status VARCHAR(255),
+                    part_count INTEGER NOT NULL
+                )
+            """)
+            cur.execute(f"CREATE INDEX IF NOT EXISTS {ROLLUP_TABLE}_date_idx ON {ROLLUP_TABLE} (date, workstation_name)")
+        conn.commit()
+        _ready.add(key)
+
+
+def ensure_rollup(conn, log=print):
+    """
+    Create the rollup table and build it if it is empty, so an aggregate run
+    by hand before aggregate_workstation_rollup.py reads real data rather
+    than writing empty aggregates. Commits.
+    """
+    _create_rollup(conn)
+    if rollup_empty(conn):
+        update_rollup(conn, log=log)
+
+
+def _lock_rollup(cur):
+    # Refreshes and rebuilds take turns, so two of them never insert the same date twice
+    cur.execute("SELECT pg_advisory_xact_lock(hashtext(%s))", (ROLLUP_TABLE,))
+
+
+def refresh_rollup(conn, dates):
+    """Recompute dates from the master log and mark them for the aggregates. Returns rows written; the caller commits."""
+    if not dates:
+        return 0
+    with conn.cursor() as cur:
+        _lock_rollup(cur)
+        cur.execute(f"DELETE FROM {ROLLUP_TABLE} WHERE date = ANY(%s::date[])", (list(dates),))
+        cur.execute(f"INSERT INTO {ROLLUP_TABLE} {ROLLUP_SELECT.format(dates_join=DATES_JOIN)}", (list(dates),))
+        rows = cur.rowcount
+    mark_dirty(conn, ROLLUP_TABLE, dates)
+    return rows
+
+
+def rebuild_rollup(conn):
+    """
+    Rebuild every date in one transaction (readers keep the old rows until
+    it commits). Dates loaded meanwhile stay dirty for the next refresh.
+    Aggregates are not marked; rebuild them separately if needed. Commits.
+    """
+    with conn.cursor() as cur:
+        _lock_rollup(cur)
+        cur.execute(f"DELETE FROM {ROLLUP_TABLE}")
+        cur.execute(f"INSERT INTO {ROLLUP_TABLE} {ROLLUP_SELECT.format(dates_join='')}")
+        rows = cur.rowcount
+    conn.commit()
+    return rows
+
+
+def rollup_empty(conn):
+    with conn.cursor() as cur:
+        cur.execute(f"SELECT NOT EXISTS (SELECT 1 FROM {ROLLUP_TABLE})")
+        return cur.fetchone()[0]
+
+
+def update_rollup(conn, rebuild=False, log=print):
+    """
+    Refresh the dirty dates, or build every date on the first run, when the
+    rollup is empty or when asked to. Returns (rows written, dates refreshed
+    or None for a full build).
+    """
+    _create_rollup(conn)
+    if register_consumer(conn, CONSUMER, SOURCE_TABLE) or rebuild or rollup_empty(conn):
+        log(f"Building {ROLLUP_TABLE} from the full {SOURCE_TABLE}...")
+        return rebuild_rollup(conn), None
+    dates = claim_dirty_dates(conn, CONSUMER, SOURCE_TABLE)
+    rows = refresh_rollup(conn, dates)
+    conn.commit()
+    return rows, dates
+
+
+def claim_rollup_dates(conn, consumer, bootstrap_days=DEFAULT_BOOTSTRAP_DAYS):
+    """
+    claim_dirty_dates() for an aggregate that reads the rollup. A consumer
+    that used to read the master log directly stops being marked there.
+    """
+    ensure_rollup(conn)
+    unregister_consumer(conn, consumer, SOURCE_TABLE)
+    return claim_dirty_dates(conn, consumer, ROLLUP_TABLE, bootstrap_days)
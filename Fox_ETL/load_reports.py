@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Load report exports into the database with the specs in ingest/report_specs.py.
+
+Single files go through the same path as File_Monitor (journal, watermark,
+file removed after a successful load unless --keep). --backfill loads many
+files in parallel with a per-file checkpoint manifest; without paths it uses
+the spec's default input globs.
+
+    python load_reports.py workstation input/workstationOutputReport.xlsx
+    python load_reports.py health --backfill
+    python load_reports.py testboard --backfill "D:/exports/testboard/**/*.xlsx" --workers 6 --force
+    python load_reports.py --list
+"""
+import os
+import sys
+import glob
+import argparse
+
+import psycopg2
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from config import DATABASE
+from ingest.backfill import default_workers
+from ingest.loader_registry import run_loader
+from ingest.pipeline import ensure_table, backfill_reports
+from ingest.report_specs import REPORT_SPECS
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def connect_to_db():
+    return psycopg2.connect(**DATABASE)
+
+
+def expand_paths(paths):
+    """Files matching paths/globs (relative to Fox_ETL), sorted and without duplicates."""
+    files = set()
+    for path in paths:
+        path = path if os.path.isabs(path) else os.path.join(BASE_DIR, path)
+        if os.path.isdir(path):
+            path = os.path.join(path, '**', '*.xls*')
+        files.update(p for p in glob.glob(os.path.normpath(path), recursive=True) if os.path.isfile(p))
+    return sorted(files)
+
+
+def list_specs():
+    for spec in REPORT_SPECS.values():
+        watched = ', '.join(spec.patterns) or '-'
+        print(f"{spec.report_type:<14} -> {spec.table:<24} watched: {watched}")
+        if spec.backfill:
+            print(f"{'':<14}    backfill: {', '.join(spec.backfill)}")
+
+
+def load_files(conn, spec, files, keep):
+    failed = 0
+    for i, file_path in enumerate(files, 1):
+        print(f"\nImporting {file_path} into {spec.table} ({i}/{len(files)})...")
+        result = run_loader(spec.report_type, file_path, conn=conn, remove_file=not keep)
+        print(result.summary())
+        if not result.success:
+            print(f"Error importing {os.path.basename(file_path)}: {result.error}")
+            failed += 1
+    return failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load report exports (single files or backfill)")
+    parser.add_argument('report_type', nargs='?', choices=list(REPORT_SPECS), help='Report spec to load with')
+    parser.add_argument('paths', nargs='*', help='Files, directories or globs')
+    parser.add_argument('--backfill', action='store_true',
+                        help="Load many files in parallel with a checkpoint manifest (default paths: the spec's backfill globs)")
+    parser.add_argument('--workers', type=int, default=default_workers(), help='Parser processes for --backfill')
+    parser.add_argument('--force', action='store_true', help='Reload files already recorded in the manifest')
+    parser.add_argument('--keep', action='store_true', help='Keep single files after loading them')
+    parser.add_argument('--list', action='store_true', help='List report specs and exit')
+    args = parser.parse_args(argv)
+
+    if args.list:
+        list_specs()
+        return 0
+    if not args.report_type:
+        parser.error('report_type is required')
+    spec = REPORT_SPECS[args.report_type]
+
+    paths = args.paths or (list(spec.backfill) if args.backfill else [])
+    if not paths:
+        parser.error('give at least one file (or use --backfill)')
+    files = expand_paths(paths)
+    if not files:
+        print(f"No files found for: {', '.join(paths)}")
+        return 1
+
+    conn = connect_to_db()
+    try:
+        ensure_table(conn, spec)
+        if args.backfill:
+            totals = backfill_reports(conn, spec, files, workers=args.workers, force=args.force)
+            print(f"\nTotal {spec.report_type} records imported: {totals['inserted']:,}")
+            return 1 if totals['failed'] else 0
+        return 1 if load_files(conn, spec, files, args.keep) else 0
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Compare peak memory of loading a workstation export whole versus streaming it
+in chunks. Both paths run the loader's read -> clean -> drop_duplicates ->
+frame_to_rows -> COPY encoding steps; nothing is written to the database.
+
+A synthetic export of each requested size is generated first (xlsx when
+openpyxl is installed, otherwise an HTML-table .xls like the report server
+produces). Peak memory is measured with tracemalloc, which also tracks numpy
+and pandas buffers.
+
+Usage: python misc/benchmark_report_memory.py [--rows 10000 50000 200000] [--chunk-size N] [--format xlsx|html]
+"""
+import sys
+import os
+import time
+import argparse
+import tempfile
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from ingest.bulk_copy import encode_text, DEFAULT_CHUNK_SIZE
+from ingest.master_logs import frame_to_rows
+from ingest.report_reader import read_report, read_report_chunks, DEFAULT_CHUNK_ROWS
+
+HEADER = [
+    'SN', 'PN', 'Customer PN', 'Outbound Version', 'Workstation Name', 'History station start time',
+    'History station end time', 'Hours', 'Service Flow', 'Model', 'History station passing status',
+    'Passing station method', 'Operator', 'First Station Start Time', 'Day', 'TAT'
+]
+
+def synthetic_rows(count):
+    start = datetime(2025, 1, 1)
+    for i in range(count):
+        begin = start + timedelta(seconds=37 * i)
+        yield [
+            f'1{i:012d}', f'900-{i % 40:05d}-0000-000', f'CPN{i % 40}', 'V1.0', f'STATION_{i % 25}',
+            begin.strftime('%Y-%m-%d %H:%M:%S'), (begin + timedelta(minutes=5)).strftime('%Y-%m-%d %H:%M:%S'),
+            '0.08', 'Normal', f'Model {i % 6}', 'Pass' if i % 9 else 'Fail', 'Auto', f'op{i % 50}',
+            start.strftime('%Y-%m-%d %H:%M:%S'), str(begin.day), '1'
+        ]
+
+def write_export(path, rows, fmt):
+    if fmt == 'xlsx':
+        from openpyxl import Workbook
+        book = Workbook(write_only=True)
+        sheet = book.create_sheet()
+        sheet.append(HEADER)
+        for row in synthetic_rows(rows):
+            sheet.append(row)
+        book.save(path)
+        return
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('<html><body><table>\n<tr>' + ''.join(f'<th>{h}</th>' for h in HEADER) + '</tr>\n')
+        for row in synthetic_rows(rows):
+            f.write('<tr>' + ''.join(f'<td>{v}</td>' for v in row) + '</tr>\n')
+        f.write('</table></body></html>\n')
+
+def clean_and_encode(df):
+    df.columns = [col.lower().replace(' ', '_').replace('-', '_') for col in df.columns]
+    df['data_source'] = 'workstation'
+    dedup_cols = [c for c in df.columns if c not in ['day', 'tat']]
+    df = df.drop_duplicates(subset=dedup_cols)
+    values = frame_to_rows('workstation_master_log', df)
+    # copy_rows encodes one COPY chunk at a time
+    return sum(len(encode_text(values[i:i + DEFAULT_CHUNK_SIZE]).getvalue()) for i in range(0, len(values), DEFAULT_CHUNK_SIZE))
+
+def load_whole(path, chunk_size):
+    return clean_and_encode(read_report(path))
+
+def load_streaming(path, chunk_size):
+    return sum(clean_and_encode(df) for df in read_report_chunks(path, chunk_size))
+
+def measure(func, path, chunk_size):
+    tracemalloc.start()
+    started = time.perf_counter()
+    func(path, chunk_size)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / (1024 * 1024), elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description="Peak memory of whole-file vs streaming report loads")
+    parser.add_argument('--rows', type=int, nargs='+', default=[10000, 50000, 200000], help='Export sizes to test')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_ROWS, help='Rows per streamed chunk')
+    parser.add_argument('--format', choices=['xlsx', 'html'], help='Export format (default: xlsx if openpyxl is installed)')
+    args = parser.parse_args()
+
+    fmt = args.format
+    if fmt is None:
+        try:
+            import openpyxl  # noqa: F401
+            fmt = 'xlsx'
+        except ImportError:
+            fmt = 'html'
+
+    print(f"Format: {fmt}, chunk size: {args.chunk_size:,} rows")
+    print(f"{'rows':>10} {'file MiB':>9} {'whole peak MiB':>15} {'whole s':>8} {'stream peak MiB':>16} {'stream s':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in args.rows:
+            path = os.path.join(tmp, f'workstationOutputReport_{rows}.{"xlsx" if fmt == "xlsx" else "xls"}')
+            write_export(path, rows, fmt)
+            size = os.path.getsize(path) / (1024 * 1024)
+            whole_peak, whole_time = measure(load_whole, path, args.chunk_size)
+            stream_peak, stream_time = measure(load_streaming, path, args.chunk_size)
+            print(f"{rows:>10,} {size:>9.1f} {whole_peak:>15.1f} {whole_time:>8.1f} {stream_peak:>16.1f} {stream_time:>9.1f}")
+            os.remove(path)
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,9 @@ import pandas as pd
 import sys
 import os
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from ingest.report_cache import cached_report
+
 def convert_timestamp(value):
     import pandas as pd
     if pd.isna(value):
@@ -14,11 +17,12 @@ EXCEL_PATH = r'C:\projects\Fox_ETL\workstationOutputReport-7-14-2025.xlsx'
 SN_TARGET = '1651624100018'
 WORKSTATION_TARGET = 'RECEIVE'
 
-if not os.path.isfile(EXCEL_PATH):
+try:
+    # Falls back to the cached copy when the export was already loaded and deleted
+    df = cached_report(EXCEL_PATH)
+except FileNotFoundError:
     print(f"File not found: {EXCEL_PATH}")
     sys.exit(1)
-
-df = pd.read_excel(EXCEL_PATH)
 row = df[(df['SN'].astype(str) == SN_TARGET) & (df['Workstation_Name'] == WORKSTATION_TARGET)]
 
 if row.empty:
@@ -1,51 +1,16 @@
 import os
-import subprocess
-from pathlib import Path
 import sys
+import argparse
+from pathlib import Path
+from concurrent.futures import as_completed
 
-def find_soffice():
-    possible_paths = [
-        r"C:\Program Files\LibreOffice\program\soffice.exe",
-        r"C:\Program Files (x86)\LibreOffice\program\soffice.exe",
-    ]
-    
-    for path in possible_paths:
-        if os.path.exists(path):
-            return path
-            
-    return None
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from ingest.converter_service import ConverterService, DEFAULT_WORKERS, DEFAULT_TIMEOUT
 
 def ensure_dir(directory):
     Path(directory).mkdir(parents=True, exist_ok=True)
 
-def convert_using_libreoffice(input_file, output_file):
-    output_dir = os.path.dirname(output_file)
-    
-    ensure_dir(output_dir)
-    
-    soffice_path = find_soffice()
-    if not soffice_path:
-        print("Error: LibreOffice not found! Please install LibreOffice.")
-        sys.exit(1)
-    
-    cmd = [
-        soffice_path,
-        '--headless',
-        '--convert-to', 'xlsx',
-        '--outdir', output_dir,
-        input_file
-    ]
-    
-    try:
-        result = subprocess.run(cmd, check=True, capture_output=True, text=True)
-        return True
-    except subprocess.CalledProcessError as e:
-        print(f"LibreOffice conversion error: {e.stderr}")
-        return False
-
-def convert_and_organize_files():
-    base_dir = os.path.abspath(os.path.join(os.getcwd(), "input", "data log"))
-    
+def collect_conversion_jobs(base_dir):
     conversions = [
         {
             'source_dir': os.path.join(base_dir, "testboardrecord"),
@@ -58,41 +23,60 @@ def convert_and_organize_files():
             'file_prefix': 'workstationOutputReport'
         }
     ]
-    
-    total_converted = 0
-    
+
+    jobs = []
     for conv in conversions:
         source_dir = conv['source_dir']
-        print(f"\nProcessing files from {source_dir}")
-        
+        print(f"\nCollecting files from {source_dir}")
+
         if not os.path.exists(source_dir):
             print(f"Source directory not found: {source_dir}")
             continue
-            
+
         for root, _, files in os.walk(source_dir):
             for file in files:
                 if file.endswith('.xls'):
                     rel_path = os.path.relpath(root, source_dir)
-                    
                     output_dir = os.path.join(conv['target_dir'], rel_path)
                     ensure_dir(output_dir)
-                    
-                    input_file = os.path.join(root, file)
-                    output_file = os.path.join(output_dir, file)
-                    
-                    try:
-                        print(f"Converting: {file}")
-                        if convert_using_libreoffice(input_file, output_file):
-                            total_converted += 1
-                            print(f"Saved to: {output_file.replace('.xls', '.xlsx')}")
-                        else:
-                            print(f"Failed to convert {file}")
-                    except Exception as e:
-                        print(f"Error converting {file}: {e}")
-                        continue
+                    jobs.append((os.path.join(root, file), output_dir))
+    return jobs
+
+def convert_and_organize_files(workers=DEFAULT_WORKERS, timeout=DEFAULT_TIMEOUT):
+    base_dir = os.path.abspath(os.path.join(os.getcwd(), "input", "data log"))
+    jobs = collect_conversion_jobs(base_dir)
+    print(f"\nQueued {len(jobs)} files for conversion with {workers} workers")
+
+    total_converted = 0
+    total_failed = 0
+
+    try:
+        service = ConverterService(workers=workers, timeout=timeout)
+    except Exception as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    with service:
+        futures = service.submit_batch(jobs)
+        for future in as_completed(futures):
+            file = os.path.basename(futures[future])
+            try:
+                output_file = future.result()
+                total_converted += 1
+                print(f"[{total_converted + total_failed}/{len(jobs)}] Saved to: {output_file}")
+            except Exception as e:
+                total_failed += 1
+                print(f"[{total_converted + total_failed}/{len(jobs)}] Failed to convert {file}: {e}")
 
     print(f"\nTotal files converted: {total_converted}")
+    if total_failed:
+        print(f"Total files failed: {total_failed}")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert historical XLS reports to XLSX using LibreOffice")
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help='Concurrent soffice workers')
+    parser.add_argument('--timeout', type=int, default=DEFAULT_TIMEOUT, help='Seconds allowed per file before soffice is restarted')
+    args = parser.parse_args()
+
     print("Starting XLS to XLSX conversion using LibreOffice...")
-    convert_and_organize_files() 
\ No newline at end of file
+    convert_and_organize_files(args.workers, args.timeout)
@@ -2,29 +2,29 @@
 """
 Debug script to show exactly what's happening with deduplication logic
 """
+import sys
 import psycopg2
-import pandas as pd
 import os
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import DATABASE
+from ingest.master_logs import MASTER_LOG_COLUMNS, frame_to_rows, row_hash_param_sql
+from ingest.report_cache import cached_report
+
 def connect_to_db():
-    return psycopg2.connect(
-        host="localhost",
-        database="fox_db",
-        user="gpu_user",
-        password="",
-        port="5432"
-    )
+    return psycopg2.connect(**DATABASE)
 
 def debug_workstation_deduplication():
     print("DEBUGGING WORKSTATION DEDUPLICATION")
     print("=" * 60)
     file_path = "/home/cloud/projects/ETL_V2/input/workstationOutputReport.xlsx"
-    if not os.path.exists(file_path):
+    print(f"Reading file: {file_path}")
+    try:
+        # Loaded exports are deleted; the report cache still has their parsed copy
+        df = cached_report(file_path)
+    except FileNotFoundError:
         print(f"File not found: {file_path}")
         return
-    
-    print(f"Reading file: {file_path}")
-    df = pd.read_excel(file_path)
     print(f"File contains {len(df)} records")
     
     df.columns = [col.lower().replace(' ', '_').replace('-', '_') for col in df.columns]
@@ -37,81 +37,26 @@ def debug_workstation_deduplication():
     cursor = conn.cursor()
     
     try:
-        for i, (_, row) in enumerate(test_records.iterrows()):
+        columns = MASTER_LOG_COLUMNS['workstation_master_log']
+        for i, values in enumerate(frame_to_rows('workstation_master_log', test_records)):
             print(f"\n--- RECORD {i+1} ---")
-                
-            mapped_row = {
-                'sn': str(row.get('sn', '')),
-                'pn': str(row.get('pn', '')),
-                'model': str(row.get('model', '')),
-                'work_station_process': str(row.get('work_station_process', '')),
-                'baseboard_sn': str(row.get('baseboard_sn', '')),
-                'baseboard_pn': str(row.get('baseboard_pn', '')),
-                'number_of_times_baseboard_is_used': row.get('number_of_times_baseboard_is_used'),
-                'workstation_name': str(row.get('workstation_name', '')),
-                'history_station_start_time': pd.to_datetime(row.get('history_station_start_time')),
-                'history_station_end_time': pd.to_datetime(row.get('history_station_end_time')),
-                'history_station_passing_status': str(row.get('history_station_passing_status', '')),
-                'operator': str(row.get('operator', '')),
-                'failure_reasons': str(row.get('failure_reasons', '')),
-                'failure_note': str(row.get('failure_note', '')),
-                'failure_code': str(row.get('failure_code', '')),
-                'diag_version': str(row.get('diag_version', '')),
-                'fixture_no': str(row.get('fixture_no', '')),
-                'customer_pn': str(row.get('customer_pn', '')),
-                'outbound_version': str(row.get('outbound_version', '')),
-                'hours': str(row.get('hours', '')),
-                'service_flow': str(row.get('service_flow', '')),
-                'passing_station_method': str(row.get('passing_station_method', '')),
-                'first_station_start_time': pd.to_datetime(row.get('first_station_start_time')) if pd.notna(row.get('first_station_start_time')) else None,
-                'data_source': 'workstation'
-            }
+            mapped_row = dict(zip(columns, values))
             
             print(f"Record data types:")
             for key, value in mapped_row.items():
                 print(f"  {key}: {type(value).__name__} = {value}")
             
-            check_query = """
-            SELECT COUNT(*) FROM workstation_master_log 
-            WHERE sn = %s 
-            AND pn = %s 
-            AND model = %s 
-            AND work_station_process = %s 
-            AND baseboard_sn = %s 
-            AND baseboard_pn = %s 
-            AND number_of_times_baseboard_is_used = %s 
-            AND workstation_name = %s 
-            AND history_station_start_time = %s 
-            AND history_station_end_time = %s 
-            AND history_station_passing_status = %s 
-            AND operator = %s 
-            AND failure_reasons = %s 
-            AND failure_note = %s 
-            AND failure_code = %s 
-            AND diag_version = %s 
-            AND fixture_no = %s 
-            AND customer_pn = %s 
-            AND outbound_version = %s 
-            AND hours = %s 
-            AND service_flow = %s 
-            AND passing_station_method = %s 
-            AND first_station_start_time = %s 
-            AND data_source = %s
+            check_query = f"""
+            SELECT {row_hash_param_sql('workstation_master_log')}, COUNT(t.id)
+            FROM workstation_master_log t
+            WHERE t.row_hash = {row_hash_param_sql('workstation_master_log')}
             """
-            
-            check_values = (
-                mapped_row['sn'], mapped_row['pn'], mapped_row['model'], mapped_row['work_station_process'], 
-                mapped_row['baseboard_sn'], mapped_row['baseboard_pn'], mapped_row['number_of_times_baseboard_is_used'], 
-                mapped_row['workstation_name'], mapped_row['history_station_start_time'], mapped_row['history_station_end_time'], 
-                mapped_row['history_station_passing_status'], mapped_row['operator'], mapped_row['failure_reasons'], 
-                mapped_row['failure_note'], mapped_row['failure_code'], mapped_row['diag_version'], mapped_row['fixture_no'], 
-                mapped_row['customer_pn'], mapped_row['outbound_version'], mapped_row['hours'], mapped_row['service_flow'], 
-                mapped_row['passing_station_method'], mapped_row['first_station_start_time'], mapped_row['data_source']
-            )
+            check_values = values + values
             
             print(f"\nChecking database for matches...")
             cursor.execute(check_query, check_values)
-            exists = cursor.fetchone()[0]
+            row_hash, exists = cursor.fetchone()
+            print(f"Record row_hash: {row_hash}")
             print(f"Database matches found: {exists}")
             
             if exists > 0:
@@ -126,9 +71,9 @@ def debug_workstation_deduplication():
                 if db_record:
                     print(f"Database record data types:")
                     cursor.execute("SELECT column_name FROM information_schema.columns WHERE table_name = 'workstation_master_log' ORDER BY ordinal_position")
-                    columns = [col[0] for col in cursor.fetchall()]
+                    db_columns = [col[0] for col in cursor.fetchall()]
                     
-                    for i, (col_name, value) in enumerate(zip(columns, db_record)):
+                    for col_name, value in zip(db_columns, db_record):
                         print(f"  {col_name}: {type(value).__name__} = {value}")
             
             print(f"\n{'='*60}")
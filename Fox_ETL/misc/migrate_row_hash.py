@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Add the row_hash fingerprint to workstation_master_log, testboard_master_log
+and snfn_master_log.
+
+For each table: add the row_hash column, fill it in id-range batches using the
+same SQL expression the loaders use on ingest, remove rows whose hash repeats,
+then build the unique index. With --drop-composite the old wide
+*_unique_constraint indexes are dropped afterwards.
+
+Run this once before loaders that dedup on row_hash are deployed.
+Usage: python misc/migrate_row_hash.py [--batch-size N] [--drop-composite] [--table NAME]
+"""
+import sys
+import os
+import argparse
+import psycopg2
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import DATABASE
+from ingest.master_logs import (
+    MASTER_LOG_COLUMNS, COMPOSITE_CONSTRAINTS, backfill_row_hash, delete_duplicate_hashes, row_hash_index_name
+)
+
+def migrate_table(conn, table, batch_size, drop_composite):
+    print(f"\nMigrating {table}...")
+    with conn.cursor() as cur:
+        cur.execute(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS row_hash UUID")
+    conn.commit()
+
+    updated = backfill_row_hash(conn, table, batch_size=batch_size)
+    print(f"Hashed {updated:,} rows")
+
+    deleted = delete_duplicate_hashes(conn, table)
+    conn.commit()
+    print(f"Deleted {deleted:,} duplicate rows")
+
+    # CONCURRENTLY cannot run inside a transaction block
+    conn.autocommit = True
+    try:
+        with conn.cursor() as cur:
+            print(f"Creating unique index {row_hash_index_name(table)}...")
+            cur.execute(f"CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS {row_hash_index_name(table)} ON {table} (row_hash)")
+            if drop_composite:
+                print(f"Dropping {COMPOSITE_CONSTRAINTS[table]}...")
+                cur.execute(f"ALTER TABLE {table} DROP CONSTRAINT IF EXISTS {COMPOSITE_CONSTRAINTS[table]}")
+    finally:
+        conn.autocommit = False
+
+    print(f"{table} migration complete!")
+
+def main():
+    parser = argparse.ArgumentParser(description="Add row_hash fingerprints to the master log tables")
+    parser.add_argument('--batch-size', type=int, default=50000, help='Rows per UPDATE batch')
+    parser.add_argument('--drop-composite', action='store_true', help='Drop the old composite unique constraints')
+    parser.add_argument('--table', choices=list(MASTER_LOG_COLUMNS), help='Only migrate this table')
+    args = parser.parse_args()
+
+    tables = [args.table] if args.table else list(MASTER_LOG_COLUMNS)
+    conn = psycopg2.connect(**DATABASE)
+    try:
+        for table in tables:
+            migrate_table(conn, table, args.batch_size, args.drop_composite)
+    except Exception as e:
+        print(f"Error during row_hash migration: {e}")
+        conn.rollback()
+        sys.exit(1)
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,23 @@
+import os
+import sys
 import subprocess
 import time
 from datetime import datetime
 import logging
 from pathlib import Path
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from schedulers.job_graph import Job, JobGraph, format_graph_run
+from ingest.change_notify import ChangeListener, format_changes
+
+try:
+    import config
+    AGGREGATOR = getattr(config, 'AGGREGATOR', {})
+    DATABASE = config.DATABASE
+except ImportError:
+    AGGREGATOR = {}
+    DATABASE = None
+
 class ScriptOrchestrator:
     def __init__(self):
         # Define base paths first
@@ -11,6 +25,8 @@ class ScriptOrchestrator:
         self.historical_testboard_dir = self.scheduler_dir.parent / "aggregators" / "historical" / "testboard"
         self.historical_workstation_dir = self.scheduler_dir.parent / "aggregators" / "historical" / "workstation"
         self.throughput_dir = self.scheduler_dir.parent / "aggregators" / "throughput"
+        # Shared with the recent scheduler: the hourly rollup every workstation aggregate reads
+        self.rollup_script = self.scheduler_dir.parent / "aggregators" / "recent" / "workstation" / "aggregate_workstation_rollup.py"
         
         # Now setup logging after paths are defined
         self._setup_logging()
@@ -23,6 +39,7 @@ class ScriptOrchestrator:
                 self.historical_testboard_dir / 'aggregate_snfn_reports_all_time.py'
             ],
             'workstation': [
+                self.rollup_script,
                 self.historical_workstation_dir / 'aggregate_packing_all_time.py',
                 self.historical_workstation_dir / 'aggregate_pchart_all_time.py',
                 self.historical_workstation_dir / 'aggregate_station_hourly_counts_all_time.py',
@@ -34,8 +51,32 @@ class ScriptOrchestrator:
             ]
         }
         
+        # Scripts that must finish before a script starts. The workstation aggregates
+        # read the hourly rollup, so it is refreshed first, and TPY runs after the
+        # other scripts (weekly reads the daily metrics)
+        self.dependencies = {
+            **{
+                script.name: [self.rollup_script.name]
+                for script in self.script_groups['workstation'] if script != self.rollup_script
+            },
+            'aggregate_tpy_all_time_daily.py': [
+                script.name for group in ('testboard', 'workstation') for script in self.script_groups[group]
+            ],
+            'aggregate_tpy_all_time_weekly.py': ['aggregate_tpy_all_time_daily.py']
+        }
+
+        # Master logs each group reads; an ingest notification for one of them triggers the group
+        self.sources = {
+            'testboard': ('testboard_master_log',),
+            'workstation': ('workstation_master_log',),
+            'throughput': ('workstation_master_log',)
+        }
+
         # Verify all scripts exist
         self._verify_scripts()
+        self.graph = self._build_graph()
+        # All-time scripts run one at a time, as before, so they do not compete with the recent cycle
+        self.parallelism = AGGREGATOR.get('historical_parallelism', 1)
         
         # Wait time between cycles (2 minutes = 120 seconds)
         self.wait_time = 120
@@ -55,6 +96,19 @@ class ScriptOrchestrator:
                 "\n".join(missing_scripts)
             )
 
+    def _build_graph(self):
+        jobs = []
+        for category, scripts in self.script_groups.items():
+            for script_path in scripts:
+                jobs.append(Job(
+                    name=script_path.name,
+                    run=lambda path=script_path, category=category: self.run_script(path, category),
+                    after=tuple(self.dependencies.get(script_path.name, ())),
+                    group=category,
+                    sources=self.sources[category]
+                ))
+        return JobGraph(jobs)
+
     def _setup_logging(self):
         # Create logs directory if it doesn't exist
         log_dir = self.scheduler_dir / "logs"
@@ -95,36 +149,26 @@ class ScriptOrchestrator:
             logging.error(f"Unexpected error running {script_path.name}: {e}")
             return False
 
-    def run_cycle(self):
+    def run_cycle(self, changes=None):
+        """Run every script, or only those reading a table in changes ({table: (from, to)})."""
         cycle_start = datetime.now()
+        only = None
+        if changes is not None:
+            only = self.graph.affected(changes)
+            if not only:
+                logging.info(f"No historical aggregators read {format_changes(changes)}")
+                return True
+            logging.info(f"Running {len(only)} of {len(self.graph.jobs)} aggregators for {format_changes(changes)}")
         logging.info("Starting new historical aggregation cycle")
-        
-        # First run testboard scripts
-        logging.info("=== Starting Historical Testboard Scripts ===")
-        for script in self.script_groups['testboard']:
-            success = self.run_script(script, 'testboard')
-            if not success:
-                logging.error(f"Cycle interrupted due to failure in testboard script: {script.name}")
-                return False
-        
-        # Then run workstation scripts
-        logging.info("=== Starting Historical Workstation Scripts ===")
-        for script in self.script_groups['workstation']:
-            success = self.run_script(script, 'workstation')
-            if not success:
-                logging.error(f"Cycle interrupted due to failure in workstation script: {script.name}")
-                return False
-
-        # Finally run throughput scripts (TPY must run after other scripts)
-        logging.info("=== Starting Historical Throughput Scripts ===")
-        for script in self.script_groups['throughput']:
-            success = self.run_script(script, 'throughput')
-            if not success:
-                logging.error(f"Cycle interrupted due to failure in throughput script: {script.name}")
-                return False
-        
-        cycle_end = datetime.now()
-        duration = (cycle_end - cycle_start).total_seconds()
+
+        graph_run = self.graph.run(self.parallelism, log=logging.error, only=only)
+
+        duration = (datetime.now() - cycle_start).total_seconds()
+        for line in format_graph_run(graph_run):
+            logging.info(line)
+        if not graph_run.success:
+            logging.error(f"Historical cycle finished with failures. Total duration: {duration:.2f} seconds")
+            return False
         logging.info(f"Historical cycle completed successfully. Total duration: {duration:.2f} seconds")
         return True
 
@@ -134,6 +178,12 @@ class ScriptOrchestrator:
         logging.info(f"Historical Workstation directory: {self.historical_workstation_dir}")
         logging.info(f"Throughput directory: {self.throughput_dir}")
         cycle_count = 1
+        # All-time tables only change when loaders commit new rows, so wait for their
+        # notifications (ingest/change_notify.py) instead of recomputing on a timer
+        listener = None
+        if DATABASE is not None and AGGREGATOR.get('listen', True):
+            listener = ChangeListener.from_settings(DATABASE, AGGREGATOR, log=logging.info)
+        changes = None
         
         while True:
             try:
@@ -141,21 +191,31 @@ class ScriptOrchestrator:
                 logging.info(f"Starting historical cycle #{cycle_count}")
                 logging.info(f"{'='*50}")
                 
-                self.run_cycle()
-                
-                logging.info(f"Waiting {self.wait_time} seconds before next cycle...")
-                time.sleep(self.wait_time)
-                
+                self.run_cycle(changes)
                 cycle_count += 1
+
+                if listener is None:
+                    logging.info(f"Waiting {self.wait_time} seconds before next cycle...")
+                    time.sleep(self.wait_time)
+                    continue
+
+                logging.info("Waiting for ingest notifications...")
+                changes = listener.next_changes()
+                if changes is None:
+                    logging.info(f"No ingest for {listener.fallback_seconds:g} seconds, running a full fallback cycle")
                 
             except KeyboardInterrupt:
                 logging.info("Historical Orchestrator stopped by user")
                 break
             except Exception as e:
                 logging.error(f"Unexpected error in cycle: {e}")
+                changes = None
                 # Wait before trying again
                 time.sleep(self.wait_time)
 
+        if listener is not None:
+            listener.close()
+
 def main():
     orchestrator = ScriptOrchestrator()
     orchestrator.start()
@@ -1,11 +1,29 @@
+import os
+import sys
+import argparse
 import subprocess
 import time
 from datetime import datetime
 import logging
 from pathlib import Path
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from schedulers.job_graph import Job, JobGraph, format_graph_run
+from schedulers.aggregation_worker import AggregationWorker
+from ingest.change_notify import ChangeListener, format_changes
+
+try:
+    import config
+    AGGREGATOR = getattr(config, 'AGGREGATOR', {})
+    DATABASE = config.DATABASE
+except ImportError:
+    AGGREGATOR = {}
+    DATABASE = None
+
+DEFAULT_PARALLELISM = 4
+
 class ScriptOrchestrator:
-    def __init__(self):
+    def __init__(self, parallelism=None, in_process=None):
         # Define base paths first
         self.scheduler_dir = Path(__file__).parent  # scheduler folder
         self.recent_testboard_dir = self.scheduler_dir.parent / "aggregators" / "recent" / "testboard"
@@ -23,6 +41,7 @@ class ScriptOrchestrator:
                 self.recent_testboard_dir / 'aggregate_snfn_reports_daily.py'
             ],
             'workstation': [
+                self.recent_workstation_dir / 'aggregate_workstation_rollup.py',
                 self.recent_workstation_dir / 'aggregate_packing_daily.py',
                 self.recent_workstation_dir / 'aggregate_pchart_daily.py',
                 self.recent_workstation_dir / 'aggregate_station_hourly_counts_daily.py',
@@ -34,8 +53,44 @@ class ScriptOrchestrator:
             ]
         }
         
+        # Scripts that must finish before a script starts; the rest run in parallel.
+        # Both performance scripts upsert fixture_performance_daily, so they take turns,
+        # and TPY must run after the other scripts (weekly reads the daily metrics).
+        # The workstation aggregates read the hourly rollup, so it is refreshed first
+        self.dependencies = {
+            'aggregate_fixture_performance_daily.py': ['aggregate_station_performance_daily.py'],
+            **{
+                script.name: ['aggregate_workstation_rollup.py']
+                for script in self.script_groups['workstation'] if script.name != 'aggregate_workstation_rollup.py'
+            },
+            'aggregate_tpy_all_time_daily.py': [
+                script.name for group in ('testboard', 'workstation') for script in self.script_groups[group]
+            ],
+            'aggregate_tpy_all_time_weekly.py': ['aggregate_tpy_all_time_daily.py']
+        }
+
+        # Command-line arguments for scripts started as subprocesses, so they do what
+        # their run(conn) does in-process: daily TPY defaults to all dates on the command line
+        self.script_args = {
+            'aggregate_tpy_all_time_daily.py': ['--incremental']
+        }
+
+        # Master logs each group reads; an ingest notification for one of them triggers the group
+        self.sources = {
+            'testboard': ('testboard_master_log',),
+            'workstation': ('workstation_master_log',),
+            'throughput': ('workstation_master_log',)
+        }
+
         # Verify all scripts exist
         self._verify_scripts()
+        self.graph = self._build_graph()
+        self.parallelism = parallelism or AGGREGATOR.get('parallelism', DEFAULT_PARALLELISM)
+
+        # Aggregators run in this process on pooled connections; without it each one is a subprocess
+        if in_process is None:
+            in_process = AGGREGATOR.get('in_process', True)
+        self.worker = AggregationWorker(self.parallelism) if in_process else None
         
         # Wait time between cycles (2 minutes = 120 seconds)
         self.wait_time = 120
@@ -55,6 +110,19 @@ class ScriptOrchestrator:
                 "\n".join(missing_scripts)
             )
 
+    def _build_graph(self):
+        jobs = []
+        for category, scripts in self.script_groups.items():
+            for script_path in scripts:
+                jobs.append(Job(
+                    name=script_path.name,
+                    run=lambda path=script_path, category=category: self.run_script(path, category),
+                    after=tuple(self.dependencies.get(script_path.name, ())),
+                    group=category,
+                    sources=self.sources[category]
+                ))
+        return JobGraph(jobs)
+
     def _setup_logging(self):
         # Create logs directory if it doesn't exist
         log_dir = self.scheduler_dir / "logs"
@@ -72,13 +140,16 @@ class ScriptOrchestrator:
         logging.getLogger().addHandler(console_handler)
 
     def run_script(self, script_path: Path, category: str) -> bool:
+        if self.worker is not None:
+            logging.info(f"Starting {category} aggregator: {script_path.name}")
+            return self.worker.run(script_path)
         try:
             logging.info(f"Starting {category} script: {script_path.name}")
             start_time = datetime.now()
             
             # Run the script in its own directory
             subprocess.run(
-                ['python', str(script_path)],
+                ['python', str(script_path)] + self.script_args.get(script_path.name, []),
                 check=True,
                 cwd=script_path.parent  # Set working directory to script's directory
             )
@@ -95,36 +166,32 @@ class ScriptOrchestrator:
             logging.error(f"Unexpected error running {script_path.name}: {e}")
             return False
 
-    def run_cycle(self):
+    def _listener(self):
+        """ChangeListener for ingest notifications, or None to fall back to fixed wait_time cycles."""
+        if DATABASE is None or not AGGREGATOR.get('listen', True):
+            return None
+        return ChangeListener.from_settings(DATABASE, AGGREGATOR, log=logging.info)
+
+    def run_cycle(self, changes=None):
+        """Run every aggregator, or only those reading a table in changes ({table: (from, to)})."""
         cycle_start = datetime.now()
-        logging.info("Starting new recent aggregation cycle")
-        
-        # First run testboard scripts
-        logging.info("=== Starting Recent Testboard Scripts ===")
-        for script in self.script_groups['testboard']:
-            success = self.run_script(script, 'testboard')
-            if not success:
-                logging.error(f"Cycle interrupted due to failure in testboard script: {script.name}")
-                return False
-        
-        # Then run workstation scripts
-        logging.info("=== Starting Recent Workstation Scripts ===")
-        for script in self.script_groups['workstation']:
-            success = self.run_script(script, 'workstation')
-            if not success:
-                logging.error(f"Cycle interrupted due to failure in workstation script: {script.name}")
-                return False
-
-        # Finally run throughput scripts (TPY must run after other scripts)
-        logging.info("=== Starting Recent Throughput Scripts ===")
-        for script in self.script_groups['throughput']:
-            success = self.run_script(script, 'throughput')
-            if not success:
-                logging.error(f"Cycle interrupted due to failure in throughput script: {script.name}")
-                return False
-        
-        cycle_end = datetime.now()
-        duration = (cycle_end - cycle_start).total_seconds()
+        only = None
+        if changes is not None:
+            only = self.graph.affected(changes)
+            if not only:
+                logging.info(f"No recent aggregators read {format_changes(changes)}")
+                return True
+            logging.info(f"Running {len(only)} of {len(self.graph.jobs)} aggregators for {format_changes(changes)}")
+        logging.info(f"Starting new recent aggregation cycle ({self.parallelism} in parallel)")
+
+        graph_run = self.graph.run(self.parallelism, log=logging.error, only=only)
+
+        duration = (datetime.now() - cycle_start).total_seconds()
+        for line in format_graph_run(graph_run):
+            logging.info(line)
+        if not graph_run.success:
+            logging.error(f"Recent cycle finished with failures. Total duration: {duration:.2f} seconds")
+            return False
         logging.info(f"Recent cycle completed successfully. Total duration: {duration:.2f} seconds")
         return True
 
@@ -133,31 +200,55 @@ class ScriptOrchestrator:
         logging.info(f"Recent Testboard directory: {self.recent_testboard_dir}")
         logging.info(f"Recent Workstation directory: {self.recent_workstation_dir}")
         logging.info(f"Throughput directory: {self.throughput_dir}")
+        logging.info("Running aggregators " + ("in-process on pooled connections" if self.worker else "as subprocesses"))
+        for name in self.graph.order:
+            after = self.graph.jobs[name].after
+            logging.info(f"  {name}" + (f" (after {', '.join(after)})" if after else ''))
         cycle_count = 1
-        
+        # Cycles run when loaders announce new rows (ingest/change_notify.py); a full
+        # cycle still runs on start and whenever fallback_seconds pass without any
+        listener = self._listener()
+        changes = None
+
         while True:
             try:
                 logging.info(f"\n{'='*50}")
                 logging.info(f"Starting recent cycle #{cycle_count}")
                 logging.info(f"{'='*50}")
                 
-                self.run_cycle()
-                
-                logging.info(f"Waiting {self.wait_time} seconds before next cycle...")
-                time.sleep(self.wait_time)
-                
+                self.run_cycle(changes)
                 cycle_count += 1
+
+                if listener is None:
+                    logging.info(f"Waiting {self.wait_time} seconds before next cycle...")
+                    time.sleep(self.wait_time)
+                    continue
+
+                logging.info("Waiting for ingest notifications...")
+                changes = listener.next_changes()
+                if changes is None:
+                    logging.info(f"No ingest for {listener.fallback_seconds:g} seconds, running a full fallback cycle")
                 
             except KeyboardInterrupt:
                 logging.info("Recent Orchestrator stopped by user")
                 break
             except Exception as e:
                 logging.error(f"Unexpected error in cycle: {e}")
+                changes = None
                 # Wait before trying again
                 time.sleep(self.wait_time)
 
+        if listener is not None:
+            listener.close()
+        if self.worker is not None:
+            self.worker.close()
+
 def main():
-    orchestrator = ScriptOrchestrator()
+    parser = argparse.ArgumentParser(description="Run the recent aggregators as a dependency graph every cycle")
+    parser.add_argument('--parallelism', type=int, help=f'Aggregators run at once (default {DEFAULT_PARALLELISM})')
+    parser.add_argument('--subprocess', action='store_true', help='Start each aggregator as its own process')
+    args = parser.parse_args()
+    orchestrator = ScriptOrchestrator(args.parallelism, in_process=False if args.subprocess else None)
     orchestrator.start()
 
 if __name__ == "__main__":
@@ -1,106 +1,67 @@
 import os
 import sys
-import time
-import subprocess
+import shutil
+import argparse
+import tempfile
 from datetime import datetime
 import logging
 
-<<<<<<< HEAD
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
-logger = logging.getLogger(__name__)
-
-INPUT_DIR = "/home/darvin/Fox_ETL/input"
-=======
 # Add the parent directory to the path to import config
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import config
 from config import PATHS
+from ingest.converter_service import get_converter
+from ingest.db_pool import get_pool, close_pool
+from ingest.file_watcher import InputWatcher, DEFAULT_SETTLE_SECONDS, DEFAULT_POLL_INTERVAL, DEFAULT_STATS_INTERVAL
+from ingest.loader_registry import load_registered_loaders, match_report_type, run_loader, remove_report_file
+from ingest.report_reader import sniff_report_format
+from ingest.report_cache import file_content_hash
+from ingest.work_queue import (
+    WorkQueue, format_stats, DEFAULT_QUEUE_PATH, DEFAULT_MAX_ATTEMPTS, DEFAULT_RETRY_SECONDS, DEFAULT_MAX_RETRY_SECONDS
+)
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 INPUT_DIR = PATHS['input_dir']
->>>>>>> origin/main
-
-WORKSTATION_XLS_FILENAME = "workstationOutputReport.xls"
-TESTBOARD_XLS_FILENAME = "Test board record report.xls"
-SNFN_XLS_FILENAME = "snfnReport.xls"
-WORKSTATION_FILEPATH = os.path.join(INPUT_DIR, WORKSTATION_XLS_FILENAME)
-TESTBOARD_FILEPATH = os.path.join(INPUT_DIR, TESTBOARD_XLS_FILENAME)
-
-SNFN_FILEPATH = os.path.join(INPUT_DIR, SNFN_XLS_FILENAME)
+CONVERTER = getattr(config, 'CONVERTER', {})
+WATCHER = getattr(config, 'WATCHER', {})
+QUEUE = getattr(config, 'QUEUE', {})
 
-ETL_V2_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-IMPORT_TESTBOARD_SCRIPT = os.path.join(ETL_V2_DIR, "loaders", "import_testboard_file.py")
-IMPORT_WORKSTATION_SCRIPT = os.path.join(ETL_V2_DIR, "loaders", "import_workstation_file.py")
-IMPORT_SNFN_SCRIPT = os.path.join(ETL_V2_DIR, "loaders", "import_snfn_file.py")
+LOADERS = load_registered_loaders()
+# Report types the monitor watches for; the rest are loaded with load_reports.py
+WATCHED = {name: spec for name, spec in LOADERS.items() if spec.patterns}
 
-def convert_xls_to_xlsx(xls_file_path):
+def convert_xls_to_xlsx(xls_file_path, outdir=None):
+    logger.info(f"Converting {os.path.basename(xls_file_path)} to XLSX...")
     try:
-        xlsx_file_path = os.path.splitext(xls_file_path)[0] + '.xlsx'
-        
-        logger.info(f"Converting {os.path.basename(xls_file_path)} to XLSX...")
-        
-        cmd = [
-            'libreoffice',
-            '--headless',
-            '--convert-to', 'xlsx',
-            '--outdir', os.path.dirname(xls_file_path),
-            xls_file_path
-        ]
-        
-        logger.info(f"Running command: {' '.join(cmd)}")
-        
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=60
-        )
-        
-        if result.returncode == 0:
-            logger.info(f"Successfully converted to {os.path.basename(xlsx_file_path)}")
-            return xlsx_file_path
-        else:
-            logger.error(f"LibreOffice conversion failed: {result.stderr}")
-            return None
-            
-    except subprocess.TimeoutExpired:
-        logger.error(f"LibreOffice conversion timed out for {os.path.basename(xls_file_path)}")
-        return None
+        converter = get_converter(log=logger.info, **CONVERTER)
     except Exception as e:
-        logger.error(f"Error converting {os.path.basename(xls_file_path)}: {e}")
+        logger.error(f"Converter service unavailable: {e}")
         return None
+    xlsx_file_path = converter.convert(xls_file_path, outdir)
+    if xlsx_file_path:
+        logger.info(f"Successfully converted to {os.path.basename(xlsx_file_path)}")
+    return xlsx_file_path
 
-def process_file(file_path, script_path, file_type):
+def process_file(file_path, file_type):
+    scratch_dir = None
     try:
-<<<<<<< HEAD
-        xlsx_file_path = convert_xls_to_xlsx(file_path)
-        
-        if not xlsx_file_path:
-            logger.error(f"Failed to convert {os.path.basename(file_path)} to XLSX")
-            return False
-        
-        if not os.path.exists(xlsx_file_path):
-            logger.error(f"XLSX file not found after conversion: {os.path.basename(xlsx_file_path)}")
-            return False
-
-        try:
-            os.remove(file_path)
-            logger.info(f"Deleted original XLS file: {os.path.basename(file_path)}")
-        except Exception as e:
-            logger.warning(f"Could not delete original XLS file: {e}")
-        
-        logger.info(f"Importing {file_type} data using {os.path.basename(script_path)}...")
-        
-        cmd = ['python3', script_path, xlsx_file_path]
-=======
-        # Check if file is already XLSX
-        if file_path.lower().endswith('.xlsx'):
+        # Loaders read XLSX, BIFF, HTML and SpreadsheetML exports directly;
+        # LibreOffice is only needed for formats read_report does not know
+        report_format = sniff_report_format(file_path)
+        content_hash = None
+        if report_format:
             xlsx_file_path = file_path
-            logger.info(f"File is already XLSX: {os.path.basename(file_path)}")
+            logger.info(f"Reading {os.path.basename(file_path)} natively ({report_format})")
         else:
-            # Convert XLS to XLSX
-            xlsx_file_path = convert_xls_to_xlsx(file_path)
+            # Journal the export by its own bytes; the converted copy differs on every run
+            content_hash = file_content_hash(file_path)
+
+            # Convert XLS to XLSX outside INPUT_DIR, where the watcher would
+            # queue the copy as a second report of the same type
+            scratch_dir = tempfile.mkdtemp(prefix='fox_convert_')
+            xlsx_file_path = convert_xls_to_xlsx(file_path, scratch_dir)
             
             if not xlsx_file_path:
                 logger.error(f"Failed to convert {os.path.basename(file_path)} to XLSX")
@@ -109,191 +70,96 @@ def process_file(file_path, script_path, file_type):
             if not os.path.exists(xlsx_file_path):
                 logger.error(f"XLSX file not found after conversion: {os.path.basename(xlsx_file_path)}")
                 return False
-
-            try:
-                os.remove(file_path)
-                logger.info(f"Deleted original XLS file: {os.path.basename(file_path)}")
-            except Exception as e:
-                logger.warning(f"Could not delete original XLS file: {e}")
-        
-        logger.info(f"Importing {file_type} data using {os.path.basename(script_path)}...")
-        
-        # Use relative path so the script runs correctly from the Fox_ETL directory
-        script_name = os.path.basename(script_path)
-        cmd = ['python3', f'loaders/{script_name}', xlsx_file_path]
->>>>>>> origin/main
-        logger.info(f"Running command: {' '.join(cmd)}")
-        
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-<<<<<<< HEAD
-            timeout=300
-=======
-            timeout=300,
-            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
->>>>>>> origin/main
-        )
         
-        if result.returncode == 0:
+        logger.info(f"Importing {file_type} data in-process...")
+        result = run_loader(file_type, xlsx_file_path, pool=get_pool(), content_hash=content_hash, log=logger.info)
+        logger.info(result.summary())
+        if result.success:
             logger.info(f"Successfully imported {file_type} data")
-            logger.info(f"Output: {result.stdout}")
-            return True
+            if scratch_dir:
+                # Kept until now so a failed import is retried from the original
+                remove_report_file(file_path, logger.info)
         else:
-            logger.error(f"Import script failed: {result.stderr}")
-            return False
-            
-    except subprocess.TimeoutExpired:
-        logger.error(f"Import script timed out for {file_type}")
-        return False
+            logger.error(f"Import failed for {file_type}: {result.error}")
+        return result.success
+
     except Exception as e:
         logger.error(f"Error processing {file_type}: {e}")
         return False
+    finally:
+        if scratch_dir:
+            shutil.rmtree(scratch_dir, ignore_errors=True)
+
+def handle_report(file_path, file_type):
+    logger.info(f"{file_type} file detected: {os.path.basename(file_path)} at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    logger.info(f"Starting {file_type} file processing pipeline...")
+    success = process_file(file_path, file_type)
+    if success:
+        logger.info(f"{file_type} file processing completed successfully")
+    else:
+        logger.error(f"{file_type} file processing failed")
+    return success
+
+def open_queue():
+    return WorkQueue(
+        QUEUE.get('path') or DEFAULT_QUEUE_PATH,
+        max_attempts=QUEUE.get('max_attempts', DEFAULT_MAX_ATTEMPTS),
+        retry_seconds=QUEUE.get('retry_seconds', DEFAULT_RETRY_SECONDS),
+        max_retry_seconds=QUEUE.get('max_retry_seconds', DEFAULT_MAX_RETRY_SECONDS)
+    )
+
+def show_status():
+    queue = open_queue()
+    try:
+        print(format_stats(queue.stats()))
+        failed = queue.failed_jobs()
+        if failed:
+            print("\nRecently failed:")
+            for path, report_type, attempts, error in failed:
+                print(f"  {report_type}: {os.path.basename(path)} after {attempts} attempts - {error}")
+    finally:
+        queue.close()
 
 def monitor_for_files():
     logger.info("Starting file monitor for PostgreSQL ETL pipeline")
     logger.info(f"Monitoring directory: {INPUT_DIR}")
-    logger.info(f"Target files: {WORKSTATION_XLS_FILENAME}, {TESTBOARD_XLS_FILENAME},{SNFN_XLS_FILENAME}")
-    logger.info(f"Import scripts: {os.path.basename(IMPORT_WORKSTATION_SCRIPT)}, {os.path.basename(IMPORT_TESTBOARD_SCRIPT)}, {os.path.basename(IMPORT_SNFN_SCRIPT)}")
-    
-    while True:
-        try:
-<<<<<<< HEAD
-            if os.path.exists(WORKSTATION_FILEPATH):
-=======
-            # Check for workstation file (XLS or XLSX)
-            workstation_xls = os.path.join(INPUT_DIR, WORKSTATION_XLS_FILENAME)
-            workstation_xlsx = os.path.join(INPUT_DIR, WORKSTATION_XLS_FILENAME.replace('.xls', '.xlsx'))
-            
-            if os.path.exists(workstation_xls):
->>>>>>> origin/main
-                logger.info(f"Workstation file detected: {WORKSTATION_XLS_FILENAME} at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-                logger.info(f"Starting workstation file processing pipeline...")
-                
-                success = process_file(
-<<<<<<< HEAD
-                    WORKSTATION_FILEPATH, 
-=======
-                    workstation_xls, 
-                    IMPORT_WORKSTATION_SCRIPT, 
-                    "workstation"
-                )
-                
-                if success:
-                    logger.info(f"Workstation file processing completed successfully")
-                else:
-                    logger.error(f"Workstation file processing failed")
-            elif os.path.exists(workstation_xlsx):
-                logger.info(f"Workstation file detected: {os.path.basename(workstation_xlsx)} at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-                logger.info(f"Starting workstation file processing pipeline...")
-                
-                success = process_file(
-                    workstation_xlsx, 
->>>>>>> origin/main
-                    IMPORT_WORKSTATION_SCRIPT, 
-                    "workstation"
-                )
-                
-                if success:
-                    logger.info(f"Workstation file processing completed successfully")
-                else:
-                    logger.error(f"Workstation file processing failed")
-            
-<<<<<<< HEAD
-            if os.path.exists(TESTBOARD_FILEPATH):
-=======
-            # Check for testboard file (XLS or XLSX)
-            testboard_xls = os.path.join(INPUT_DIR, TESTBOARD_XLS_FILENAME)
-            testboard_xlsx = os.path.join(INPUT_DIR, TESTBOARD_XLS_FILENAME.replace('.xls', '.xlsx'))
-            
-            if os.path.exists(testboard_xls):
->>>>>>> origin/main
-                logger.info(f"Test board file detected: {TESTBOARD_XLS_FILENAME} at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-                logger.info(f"Starting test board file processing pipeline...")
-                
-                success = process_file(
-<<<<<<< HEAD
-                    TESTBOARD_FILEPATH, 
-=======
-                    testboard_xls, 
-                    IMPORT_TESTBOARD_SCRIPT, 
-                    "testboard"
-                )
-                
-                if success:
-                    logger.info(f"Test board file processing completed successfully")
-                else:
-                    logger.error(f"❌ STEP 3: Test board file processing failed")
-            elif os.path.exists(testboard_xlsx):
-                logger.info(f"Test board file detected: {os.path.basename(testboard_xlsx)} at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-                logger.info(f"Starting test board file processing pipeline...")
-                
-                success = process_file(
-                    testboard_xlsx, 
->>>>>>> origin/main
-                    IMPORT_TESTBOARD_SCRIPT, 
-                    "testboard"
-                )
-                
-                if success:
-                    logger.info(f"Test board file processing completed successfully")
-                else:
-                    logger.error(f"❌ STEP 3: Test board file processing failed")
+    for name, spec in WATCHED.items():
+        logger.info(f"{name}: {', '.join(spec.patterns)} -> {spec.table}")
 
-<<<<<<< HEAD
-            # Check for snfn report
-            if os.path.exists(SNFN_FILEPATH):
-=======
-            # Check for snfn report (XLS or XLSX)
-            snfn_xls = os.path.join(INPUT_DIR, SNFN_XLS_FILENAME)
-            snfn_xlsx = os.path.join(INPUT_DIR, SNFN_XLS_FILENAME.replace('.xls', '.xlsx'))
-            
-            if os.path.exists(snfn_xls):
->>>>>>> origin/main
-                logger.info(f"📋 STEP 1: SnfN file detected: {SNFN_XLS_FILENAME} at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-                logger.info(f"🔄 STEP 2: Starting SnFn file processing pipeline...")
-                
-                success = process_file(
-<<<<<<< HEAD
-                    SNFN_FILEPATH, 
-=======
-                    snfn_xls, 
-                    IMPORT_SNFN_SCRIPT, 
-                    "snfn"
-                )
-                
-                if success:
-                    logger.info(f"✅ STEP 3: snfn file processing completed successfully")
-                else:
-                    logger.error(f"❌ STEP 3: snfn file processing failed")
-            elif os.path.exists(snfn_xlsx):
-                logger.info(f"📋 STEP 1: SnfN file detected: {os.path.basename(snfn_xlsx)} at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-                logger.info(f"🔄 STEP 2: Starting SnFn file processing pipeline...")
-                
-                success = process_file(
-                    snfn_xlsx, 
->>>>>>> origin/main
-                    IMPORT_SNFN_SCRIPT, 
-                    "snfn"
-                )
-                
-                if success:
-                    logger.info(f"✅ STEP 3: snfn file processing completed successfully")
-                else:
-                    logger.error(f"❌ STEP 3: snfn file processing failed")
-                
-            time.sleep(10)  # Check every 10 seconds
-            
-        except KeyboardInterrupt:
-            logger.info("File monitor shutdown requested")
-            break
-        except Exception as e:
-            logger.error(f"Error in monitor loop: {e}")
-            import traceback
-            logger.error(traceback.format_exc())
-            time.sleep(10)
+    queue = open_queue()
+    pruned = queue.prune(QUEUE.get('keep_days', 30))
+    if pruned:
+        logger.info(f"Pruned {pruned} finished jobs from {queue.path}")
+    # One lane per report type by default, so one slow import never blocks another type
+    lane_counts = QUEUE.get('lanes', {})
+    lanes = {name: lane_counts.get(name, 1) for name in WATCHED}
+    # One connection per lane, so no lane waits on another's import
+    get_pool(maxconn=sum(lanes.values()))
+    watcher = InputWatcher(
+        INPUT_DIR,
+        match_report_type,
+        handle_report,
+        lanes=lanes,
+        queue=queue,
+        settle_seconds=WATCHER.get('settle_seconds', DEFAULT_SETTLE_SECONDS),
+        poll_interval=WATCHER.get('poll_interval', DEFAULT_POLL_INTERVAL),
+        stats_interval=QUEUE.get('stats_interval', DEFAULT_STATS_INTERVAL),
+        use_events=WATCHER.get('use_events', True),
+        log=logger.info
+    )
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        logger.info("File monitor shutdown requested")
+    finally:
+        queue.close()
+        close_pool()
 
 
 if __name__ == "__main__":
-    monitor_for_files() 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Watch the input directory and load reports as they arrive")
+    parser.add_argument('--status', action='store_true', help='Print queue depth and age per report type and exit')
+    if parser.parse_args().status:
+        show_status()
+    else:
+        monitor_for_files()
@@ -0,0 +1,84 @@
+"""
+Resident worker that runs aggregator scripts in the scheduler's process.
+
+Every aggregator script exposes run(conn). The worker imports each script
+once (pandas, psycopg2 and config stay loaded between cycles) and runs it on
+a connection borrowed from the shared pool (ingest/db_pool.py), so a cycle no
+longer pays for starting a Python process and connecting per script. Each
+job is timed on its own: the wait for a connection and the run itself.
+
+A script without run(conn) is started as a subprocess, as before.
+"""
+import sys
+import time
+import logging
+import subprocess
+import threading
+import importlib.util
+from pathlib import Path
+
+from ingest.db_pool import get_pool, pooled_connection, close_pool
+
+
+class AggregationWorker:
+    def __init__(self, parallelism=4, log=logging.info):
+        self.parallelism = parallelism
+        self.log = log
+        self._modules = {}
+        self._lock = threading.Lock()
+
+    def load(self, script_path: Path):
+        """The script imported as a module (once per process), or None if it has no run(conn)."""
+        script_path = Path(script_path)
+        with self._lock:
+            if script_path not in self._modules:
+                name = f"aggregators_{script_path.stem}"
+                spec = importlib.util.spec_from_file_location(name, script_path)
+                module = importlib.util.module_from_spec(spec)
+                sys.modules[name] = module
+                try:
+                    spec.loader.exec_module(module)
+                except BaseException:
+                    # Import it again next cycle rather than keep a half-loaded module
+                    del sys.modules[name]
+                    raise
+                self._modules[script_path] = module if callable(getattr(module, 'run', None)) else None
+            return self._modules[script_path]
+
+    def run(self, script_path: Path) -> bool:
+        """Run one aggregator; True on success. Failures are logged and rolled back."""
+        script_path = Path(script_path)
+        start = time.monotonic()
+        try:
+            module = self.load(script_path)
+        except Exception as e:
+            logging.error(f"Error importing {script_path.name}: {e}")
+            return False
+        if module is None:
+            return self.run_subprocess(script_path)
+
+        try:
+            with pooled_connection(get_pool(1, self.parallelism)) as conn:
+                acquired = time.monotonic()
+                module.run(conn)
+                conn.commit()
+        except Exception as e:
+            logging.error(f"Error running {script_path.name}: {e}")
+            return False
+        finished = time.monotonic()
+        self.log(f"Completed {script_path.name} in {finished - acquired:.2f}s "
+                 f"(waited {acquired - start:.2f}s for a connection)")
+        return True
+
+    def run_subprocess(self, script_path: Path) -> bool:
+        start = time.monotonic()
+        try:
+            subprocess.run(['python', str(script_path)], check=True, cwd=script_path.parent)
+        except (subprocess.CalledProcessError, OSError) as e:
+            logging.error(f"Error running {script_path.name}: {e}")
+            return False
+        self.log(f"Completed {script_path.name} in {time.monotonic() - start:.2f}s (subprocess)")
+        return True
+
+    def close(self):
+        close_pool()
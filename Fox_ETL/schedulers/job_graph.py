@@ -0,0 +1,203 @@
+"""
+Dependency-graph runner for the aggregator schedulers.
+
+Jobs declare the jobs they must run after; everything else is free to run
+at the same time, up to `parallelism` jobs at once. A cycle therefore takes
+roughly as long as its longest dependency chain instead of the sum of all
+jobs. When a job fails, the jobs that depend on it are skipped, while
+independent jobs still run.
+
+After each run the critical path (the chain of jobs that determined the
+cycle's wall time) is reported, which shows which aggregator to speed up
+next.
+"""
+import time
+import logging
+from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Callable, Tuple
+
+
+@dataclass
+class Job:
+    """
+    run() returns True on success. after lists the names of jobs that must
+    finish first; sources the tables the job reads, so a change to one of
+    them selects the job (JobGraph.affected).
+    """
+    name: str
+    run: Callable[[], bool]
+    after: Tuple[str, ...] = ()
+    group: str = None
+    sources: Tuple[str, ...] = ()
+
+
+@dataclass
+class JobRun:
+    job: Job
+    status: str = 'pending'  # succeeded / failed / skipped
+    started: float = None
+    finished: float = None
+
+    @property
+    def duration(self):
+        if self.started is None or self.finished is None:
+            return 0.0
+        return self.finished - self.started
+
+
+@dataclass
+class GraphRun:
+    runs: dict
+    started: float
+    finished: float = None
+    critical_path: list = field(default_factory=list)
+
+    @property
+    def wall_time(self):
+        return (self.finished or time.monotonic()) - self.started
+
+    @property
+    def busy_time(self):
+        """Sum of all job durations, i.e. the cycle time had they run one after another."""
+        return sum(run.duration for run in self.runs.values())
+
+    @property
+    def success(self):
+        return all(run.status == 'succeeded' for run in self.runs.values())
+
+    def failed(self):
+        return [name for name, run in self.runs.items() if run.status == 'failed']
+
+    def skipped(self):
+        return [name for name, run in self.runs.items() if run.status == 'skipped']
+
+
+class JobGraph:
+    def __init__(self, jobs):
+        self.jobs = {}
+        for job in jobs:
+            if job.name in self.jobs:
+                raise ValueError(f"Duplicate job name: {job.name}")
+            self.jobs[job.name] = job
+        for job in self.jobs.values():
+            unknown = [dep for dep in job.after if dep not in self.jobs]
+            if unknown:
+                raise ValueError(f"Job {job.name} depends on unknown job(s): {', '.join(unknown)}")
+        self.order = self._topological_order()
+
+    def _topological_order(self):
+        remaining = {name: set(job.after) for name, job in self.jobs.items()}
+        order = []
+        while remaining:
+            ready = [name for name, deps in remaining.items() if not deps]
+            if not ready:
+                raise ValueError(f"Dependency cycle between: {', '.join(sorted(remaining))}")
+            for name in ready:
+                order.append(name)
+                del remaining[name]
+            for deps in remaining.values():
+                deps.difference_update(ready)
+        return order
+
+    def dependents(self, name):
+        """All jobs that (transitively) run after name."""
+        found = set()
+        stack = [name]
+        while stack:
+            current = stack.pop()
+            for job in self.jobs.values():
+                if current in job.after and job.name not in found:
+                    found.add(job.name)
+                    stack.append(job.name)
+        return found
+
+    def affected(self, tables):
+        """Names of the jobs that read any of tables."""
+        tables = set(tables)
+        return {name for name, job in self.jobs.items() if tables & set(job.sources)}
+
+    def run(self, parallelism=4, log=logging.info, only=None):
+        """
+        Run every job (or the jobs named in only) once, respecting
+        dependencies; dependencies outside only count as satisfied.
+        Returns a GraphRun.
+        """
+        order = [name for name in self.order if only is None or name in only]
+        graph_run = GraphRun({name: JobRun(self.jobs[name]) for name in order}, time.monotonic())
+        runs = graph_run.runs
+        done = {name for name in self.order if name not in runs}
+        running = {}
+
+        def start(name):
+            runs[name].started = time.monotonic()
+            return self.jobs[name].run()
+
+        with ThreadPoolExecutor(max_workers=max(1, parallelism), thread_name_prefix='aggregator') as executor:
+            while True:
+                for name in order:
+                    run = runs[name]
+                    if run.status == 'pending' and name not in running and set(run.job.after) <= done:
+                        running[name] = executor.submit(start, name)
+                if not running:
+                    break
+                finished, _ = wait(running.values(), return_when=FIRST_COMPLETED)
+                for name, future in list(running.items()):
+                    if future not in finished:
+                        continue
+                    del running[name]
+                    run = runs[name]
+                    run.finished = time.monotonic()
+                    try:
+                        ok = future.result()
+                    except Exception as e:
+                        log(f"Unexpected error in {name}: {e}")
+                        ok = False
+                    if ok:
+                        run.status = 'succeeded'
+                        done.add(name)
+                        continue
+                    run.status = 'failed'
+                    for dependent in self.dependents(name):
+                        if dependent in runs and runs[dependent].status == 'pending':
+                            runs[dependent].status = 'skipped'
+                            log(f"Skipping {dependent}: depends on failed job {name}")
+
+        graph_run.finished = time.monotonic()
+        graph_run.critical_path = self.critical_path(graph_run)
+        return graph_run
+
+    def critical_path(self, graph_run):
+        """
+        The chain that ended last: start from the last job to finish and walk
+        back through the dependency that finished last, to a job with none.
+        """
+        finished = [run for run in graph_run.runs.values() if run.finished is not None]
+        if not finished:
+            return []
+        current = max(finished, key=lambda run: run.finished)
+        path = [current]
+        while True:
+            deps = [graph_run.runs[dep] for dep in current.job.after
+                    if dep in graph_run.runs and graph_run.runs[dep].finished is not None]
+            if not deps:
+                break
+            current = max(deps, key=lambda run: run.finished)
+            path.append(current)
+        return list(reversed(path))
+
+
+def format_graph_run(graph_run):
+    """Summary lines: wall vs. summed job time and the critical path with durations."""
+    lines = [
+        f"Wall time {graph_run.wall_time:.2f}s for {graph_run.busy_time:.2f}s of jobs "
+        f"({graph_run.busy_time / graph_run.wall_time if graph_run.wall_time else 0:.1f}x parallel)"
+    ]
+    if graph_run.critical_path:
+        chain = ' -> '.join(f"{run.job.name} ({run.duration:.2f}s)" for run in graph_run.critical_path)
+        lines.append(f"Critical path: {chain}")
+    if graph_run.failed():
+        lines.append(f"Failed: {', '.join(graph_run.failed())}")
+    if graph_run.skipped():
+        lines.append(f"Skipped: {', '.join(graph_run.skipped())}")
+    return lines
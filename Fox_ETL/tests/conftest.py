@@ -0,0 +1,37 @@
+"""
+Shared fixtures. Tests that need PostgreSQL use the database named by the
+FOX_TEST_DSN environment variable (a libpq connection string, e.g.
+"host=127.0.0.1 port=5432 dbname=fox_test user=postgres") and are skipped
+without it. Each test gets a schema of its own, dropped afterwards.
+
+    FOX_TEST_DSN="dbname=fox_test" python -m pytest tests
+"""
+import os
+import sys
+import uuid
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def conn():
+    psycopg2 = pytest.importorskip('psycopg2')
+    dsn = os.environ.get('FOX_TEST_DSN')
+    if not dsn:
+        pytest.skip('FOX_TEST_DSN is not set')
+    schema = f"fox_test_{uuid.uuid4().hex[:12]}"
+    admin = psycopg2.connect(dsn)
+    admin.autocommit = True
+    with admin.cursor() as cur:
+        cur.execute(f"CREATE SCHEMA {schema}")
+    # The schema is part of the DSN, so the per-connection "table exists" caches start empty
+    connection = psycopg2.connect(dsn, options=f'-c search_path={schema}')
+    try:
+        yield connection
+    finally:
+        connection.close()
+        with admin.cursor() as cur:
+            cur.execute(f"DROP SCHEMA {schema} CASCADE")
+        admin.close()
@@ -0,0 +1,45 @@
+from datetime import date, timedelta
+
+from ingest.dirty_partitions import claim_dirty_dates, mark_dirty, register_consumer, unregister_consumer
+
+TABLE = 'workstation_master_log'
+
+
+def test_first_claim_bootstraps_the_last_days(conn):
+    dates = claim_dirty_dates(conn, 'packing', TABLE, bootstrap_days=3)
+    today = date.today()
+    assert dates == [today - timedelta(days=2), today - timedelta(days=1), today]
+    conn.commit()
+    assert claim_dirty_dates(conn, 'packing', TABLE) == []
+
+
+def test_claim_returns_marked_dates_once(conn):
+    register_consumer(conn, 'packing', TABLE)
+    register_consumer(conn, 'pchart', TABLE)
+    mark_dirty(conn, TABLE, [date(2024, 1, 3), date(2024, 1, 1)])
+    mark_dirty(conn, TABLE, [date(2024, 1, 1)])
+    mark_dirty(conn, 'testboard_master_log', [date(2024, 1, 2)])
+    conn.commit()
+
+    assert claim_dirty_dates(conn, 'packing', TABLE) == [date(2024, 1, 1), date(2024, 1, 3)]
+    conn.commit()
+    assert claim_dirty_dates(conn, 'packing', TABLE) == []
+    # Every consumer has its own marks
+    assert claim_dirty_dates(conn, 'pchart', TABLE) == [date(2024, 1, 1), date(2024, 1, 3)]
+
+
+def test_rolled_back_claim_keeps_dates_dirty(conn):
+    register_consumer(conn, 'packing', TABLE)
+    mark_dirty(conn, TABLE, [date(2024, 1, 1)])
+    conn.commit()
+
+    assert claim_dirty_dates(conn, 'packing', TABLE) == [date(2024, 1, 1)]
+    conn.rollback()
+    assert claim_dirty_dates(conn, 'packing', TABLE) == [date(2024, 1, 1)]
+
+
+def test_unregistered_consumer_is_not_marked(conn):
+    register_consumer(conn, 'packing', TABLE)
+    conn.commit()
+    unregister_consumer(conn, 'packing', TABLE)
+    assert mark_dirty(conn, TABLE, [date(2024, 1, 1)]) == 0
@@ -0,0 +1,56 @@
+import threading
+
+from schedulers.job_graph import Job, JobGraph
+
+
+def make_graph(fail=()):
+    """rollup -> (packing, pchart) -> tpy_daily -> tpy_weekly, plus an unrelated testboard job."""
+    ran = []
+    lock = threading.Lock()
+
+    def job(name, after=(), sources=('workstation_master_log',)):
+        def run():
+            with lock:
+                ran.append(name)
+            return name not in fail
+        return Job(name, run, after=after, sources=sources)
+
+    graph = JobGraph([
+        job('tpy_weekly', after=('tpy_daily',)),
+        job('tpy_daily', after=('packing', 'pchart', 'station_performance')),
+        job('pchart', after=('rollup',)),
+        job('packing', after=('rollup',)),
+        job('rollup'),
+        job('station_performance', sources=('testboard_master_log',)),
+    ])
+    return graph, ran
+
+
+def test_affected_selects_jobs_reading_the_changed_tables():
+    graph, _ = make_graph()
+    assert graph.affected({'testboard_master_log': (None, None)}) == {'station_performance'}
+    assert graph.affected(['workstation_master_log']) == {'rollup', 'packing', 'pchart', 'tpy_daily', 'tpy_weekly'}
+    assert graph.affected(['health']) == set()
+
+
+def test_affected_jobs_run_in_dependency_order():
+    graph, ran = make_graph()
+    only = graph.affected(['workstation_master_log'])
+    graph_run = graph.run(parallelism=4, only=only)
+
+    assert graph_run.success
+    assert set(ran) == only
+    # station_performance is outside only, so tpy_daily does not wait for it
+    assert ran[0] == 'rollup'
+    assert set(ran[1:3]) == {'packing', 'pchart'}
+    assert ran[3:] == ['tpy_daily', 'tpy_weekly']
+    assert [run.job.name for run in graph_run.critical_path][-2:] == ['tpy_daily', 'tpy_weekly']
+
+
+def test_failed_job_skips_only_its_dependents():
+    graph, ran = make_graph(fail=('packing',))
+    graph_run = graph.run(parallelism=1, log=lambda message: None)
+
+    assert graph_run.failed() == ['packing']
+    assert set(graph_run.skipped()) == {'tpy_daily', 'tpy_weekly'}
+    assert set(ran) == {'rollup', 'packing', 'pchart', 'station_performance'}
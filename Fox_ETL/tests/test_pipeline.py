@@ -0,0 +1,95 @@
+import html
+from datetime import date
+
+import pytest
+
+pytest.importorskip('psycopg2')
+
+import ingest.ingest_journal
+import ingest.report_cache
+from ingest.loader_registry import run_loader
+from ingest.master_logs import ensure_row_hash
+from ingest.quarantine import QUARANTINE_TABLE
+from ingest.report_specs import get_spec
+
+HEADER = ('SN', 'PN', 'Model', 'Workstation Name', 'History station start time',
+          'History station end time', 'Service Flow', 'History station passing status')
+
+
+def row(sn, pn='P1', model='M1', workstation='PACKING', day=1):
+    return (sn, pn, model, workstation, f'2024-01-0{day} 10:00:00', f'2024-01-0{day} 10:05:00', 'F', 'Pass')
+
+
+def write_export(path, rows):
+    """A workstation export as the HTML table wareconn serves with an .xls name."""
+    lines = ['<html><body><table>', '<tr>' + ''.join(f'<th>{name}</th>' for name in HEADER) + '</tr>']
+    lines += ['<tr>' + ''.join(f'<td>{html.escape(value)}</td>' for value in values) + '</tr>' for values in rows]
+    lines.append('</table></body></html>')
+    path.write_text('\n'.join(lines))
+    return str(path)
+
+
+@pytest.fixture
+def workstation(conn, tmp_path, monkeypatch):
+    """Load workstation exports into an empty workstation_master_log."""
+    cache = ingest.report_cache.ReportCache(directory=str(tmp_path / 'cache'))
+    cache.enabled = False
+    monkeypatch.setattr(ingest.report_cache, '_shared_cache', cache)
+    monkeypatch.setattr(ingest.ingest_journal, '_seen_by_table', {})
+    spec = get_spec('workstation')
+    with conn.cursor() as cur:
+        cur.execute(spec.create_sql)
+    ensure_row_hash(conn, spec.table)
+    conn.commit()
+
+    def load(name, rows):
+        file_path = write_export(tmp_path / name, rows)
+        result = run_loader('workstation', file_path, conn=conn, remove_file=False, log=lambda message: None)
+        assert result.success, result.error
+        return result
+    return load
+
+
+def count_rows(conn, table):
+    with conn.cursor() as cur:
+        cur.execute(f"SELECT COUNT(*) FROM {table}")
+        return cur.fetchone()[0]
+
+
+def test_redropped_export_is_skipped(conn, workstation):
+    rows = [row('SN1'), row('SN2'), row('SN2'), row('SN3', day=2)]
+    first = workstation('workstationOutputReport.xls', rows)
+    assert (first.rows_read, first.rows_deduped, first.rows_inserted) == (4, 1, 3)
+    assert first.date_range == (date(2024, 1, 1), date(2024, 1, 2))
+
+    again = workstation('workstationOutputReport (1).xls', rows)
+    assert again.already_loaded
+    assert again.rows_read == again.rows_inserted == 0
+    assert count_rows(conn, 'workstation_master_log') == 3
+
+
+def test_row_with_null_columns_still_deduplicates(conn, workstation):
+    rows = [row('SN1'), row('SN2')]
+    assert workstation('workstationOutputReport.xls', rows).rows_inserted == 2
+    with conn.cursor() as cur:
+        # The export has no customer PN or first station column
+        cur.execute("SELECT customer_pn, first_station_start_time FROM workstation_master_log WHERE sn = 'SN1'")
+        assert cur.fetchone() == (None, None)
+
+    # Forget the rows seen in this process, so only row_hash can catch the repeats
+    ingest.ingest_journal._seen_by_table.clear()
+    result = workstation('workstationOutputReport (1).xls', rows + [row('SN3')])
+    assert result.rows_seen == 0
+    assert (result.rows_staged, result.rows_inserted, result.rows_existing) == (3, 1, 2)
+    assert count_rows(conn, 'workstation_master_log') == 3
+
+
+def test_rows_the_table_rejects_are_quarantined(conn, workstation):
+    rows = [row('SN1'), row('SN2', workstation='W' * 300), row('SN3')]
+    result = workstation('workstationOutputReport.xls', rows)
+
+    assert (result.rows_quarantined, result.rows_inserted) == (1, 2)
+    assert count_rows(conn, 'workstation_master_log') == 2
+    with conn.cursor() as cur:
+        cur.execute(f"SELECT COUNT(*) FROM {QUARANTINE_TABLE} WHERE batch_id = %s", (result.batch_id,))
+        assert cur.fetchone()[0] == 1
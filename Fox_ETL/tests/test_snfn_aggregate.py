@@ -0,0 +1,56 @@
+from datetime import date
+
+import pytest
+
+pytest.importorskip('psycopg2')
+
+from ingest.report_specs import get_spec
+from ingest.snfn_aggregate import CREATE_TABLE_SQL, SNFN_TABLE, upsert_snfn
+
+
+def insert_failures(conn, rows):
+    with conn.cursor() as cur:
+        cur.execute(get_spec('testboard').create_sql)
+        cur.executemany("""
+            INSERT INTO testboard_master_log (
+                sn, model, workstation_name, history_station_start_time, history_station_end_time,
+                history_station_passing_status, failure_reasons, failure_note, fixture_no, data_source
+            ) VALUES (%s, %s, 'FT', %s, %s, 'Fail', 'ERR001', 'note', 'FX1', 'testboard')
+        """, [(sn, model, end, end) for sn, model, end in rows])
+        cur.execute(CREATE_TABLE_SQL)
+
+
+def snfn_rows(conn):
+    with conn.cursor() as cur:
+        cur.execute(f"SELECT sn, error_code FROM {SNFN_TABLE} ORDER BY sn")
+        return cur.fetchall()
+
+
+def test_bulk_upsert(conn):
+    insert_failures(conn, [('SN1', 'M1', '2024-01-01 10:00'), ('SN2', 'M1', '2024-01-02 10:00')])
+    assert upsert_snfn(conn, log=lambda message: None) == (2, 0)
+    assert snfn_rows(conn) == [('SN1', 'EC001'), ('SN2', 'EC001')]
+    # Unchanged rows are not rewritten
+    assert upsert_snfn(conn, log=lambda message: None) == (0, 0)
+
+
+def test_failed_bulk_upsert_falls_back_to_dates_then_rows(conn):
+    insert_failures(conn, [
+        ('SN1', 'M1', '2024-01-01 10:00'),
+        ('SN2', 'M1', '2024-01-02 10:00'),
+        ('SN3', None, '2024-01-02 11:00'),  # NULL model violates the SNFN key
+        ('SN4', 'M1', '2024-01-02 12:00'),
+    ])
+    messages = []
+    assert upsert_snfn(conn, log=messages.append) == (3, 1)
+    assert snfn_rows(conn) == [('SN1', 'EC001'), ('SN2', 'EC001'), ('SN4', 'EC001')]
+    assert sum('row by row' in message for message in messages) == 1
+    # The transaction is still usable and commits what was written
+    conn.commit()
+    assert len(snfn_rows(conn)) == 3
+
+
+def test_fallback_is_limited_to_the_given_dates(conn):
+    insert_failures(conn, [('SN1', None, '2024-01-01 10:00'), ('SN2', 'M1', '2024-01-02 10:00')])
+    assert upsert_snfn(conn, [date(2024, 1, 2)], log=lambda message: None) == (1, 0)
+    assert upsert_snfn(conn, [date(2024, 1, 1), date(2024, 1, 2)], log=lambda message: None) == (0, 1)